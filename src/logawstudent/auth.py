@@ -1,43 +1,66 @@
 # src/logawstudent/auth.py
-import time
+import weakref
+from urllib.parse import urlparse
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.chrome.webdriver import WebDriver
-from webdriver_manager.chrome import ChromeDriverManager
-from rich.console import Console
-from rich.panel import Panel
-from .utils import validate_credentials
+from selenium.common.exceptions import JavascriptException
+from .utils import validate_credentials, CANVAS_URL
+from .logs import log
+from .session import save_session, load_session, clear_session, COOKIE_FIELDS
+from .chromedriver import resolve_chromedriver
+from .profiling import phase, traced, instrument_driver
+from .schedule import WaitScheduler
+from .lab import preload_lab, get_frame_locator, forget_frame_locator
+from .probes import probe, load_selectors
+from .intercept import InterceptionPolicy, block_with_patterns, start_interception, stop_interception
+from .browser_profile import acquire_profile, profile_arguments
 
-console = Console()
 
-def log(msg, status="info"):
-    """Función de logging con iconos y formato Rich."""
-    icons = {"ok": "✅", "info": "🔎", "wait": "⏳", "error": "❌", "done": "🚀"}
-    colors = {"ok": "green", "info": "blue", "wait": "yellow", "error": "red", "done": "green"}
-    
-    icon = icons.get(status, "ℹ️")
-    color = colors.get(status, "white")
-    
-    console.print(f"[{color}]{icon} {msg}[/{color}]")
+LOGIN_URL = f"{CANVAS_URL}/login/canvas"
+CANVAS_HOST = urlparse(CANVAS_URL).netloc
+
+# Plazo global del login y presupuestos de sus etapas
+LOGIN_BUDGET = 25
+LOGIN_FORM_TIMEOUT = 5
+LOGIN_TIMEOUT = 15
+
+# Orígenes a los que conviene abrir conexión (DNS/TCP/TLS) antes de entrar al lab:
+# el de LAB_URL y el del iframe del Learner Lab
+LAB_FRAME_ORIGINS = ("https://labs.vocareum.com",)
+
+PRECONNECT_JS = """
+arguments[0].forEach(function(origin) {
+  var link = document.createElement('link');
+  link.rel = 'preconnect';
+  link.href = origin;
+  link.crossOrigin = 'anonymous';
+  document.head.appendChild(link);
+  var plain = link.cloneNode();
+  plain.removeAttribute('crossorigin');
+  document.head.appendChild(plain);
+});
+"""
+
+# Lock del perfil persistente de cada driver; se libera en quit_driver
+_profile_locks = weakref.WeakKeyDictionary()
 
 
 def block_heavy_resources(driver: WebDriver):
-    """Bloquea recursos pesados (imágenes, fuentes, CSS) para optimizar carga."""
-    try:
-        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": [
-            "*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.svg",
-            "*.woff", "*.woff2", "*.ttf", "*.css"
-        ]})
-        driver.execute_cdp_cmd("Network.enable", {})
-    except Exception:
-        pass
+    """Bloquea por patrones de URL los recursos que descarta la política de interceptación."""
+    block_with_patterns(driver, InterceptionPolicy.load())
+
 
+@traced("setup_driver")
+def setup_driver(persist_profile: bool = False):
+    """
+    Configura y retorna un driver de Chrome optimizado.
 
-def setup_driver():
-    """Configura y retorna un driver de Chrome optimizado."""
+    Args:
+        persist_profile: Usa el perfil persistente (caché de disco entre
+            ejecuciones); si otro proceso lo tiene, se usa uno temporal
+    """
     options = webdriver.ChromeOptions()
     options.add_argument("--headless=new")
     options.add_argument("--no-sandbox")
@@ -45,17 +68,96 @@ def setup_driver():
     options.add_argument("--disable-gpu")
     options.add_argument("--disable-extensions")
     options.add_argument("--disable-logging")
+    # Los comandos esperan solo a DOMContentLoaded; los frames del lab se esperan aparte
+    options.page_load_strategy = "eager"
+
+    profile_lock = None
+    if persist_profile:
+        profile_lock = acquire_profile()
+        if profile_lock:
+            for argument in profile_arguments():
+                options.add_argument(argument)
+        else:
+            log("El perfil persistente está en uso por otra ejecución, usando uno temporal", "info")
+
+    with phase("driver_resolution"):
+        driver_path = resolve_chromedriver()
 
-    driver = webdriver.Chrome(
-        service=Service(ChromeDriverManager().install()),
-        options=options
-    )
+    try:
+        with phase("chrome_launch"):
+            driver = webdriver.Chrome(
+                service=Service(driver_path),
+                options=options
+            )
+    except Exception:
+        if profile_lock:
+            profile_lock.release()
+        raise
+    if profile_lock:
+        _profile_locks[driver] = profile_lock
     
-    block_heavy_resources(driver)
+    # Si falla la preparación, Chrome se cierra y el perfil queda libre
+    try:
+        instrument_driver(driver)
+        with phase("interception"):
+            policy = InterceptionPolicy.load()
+            mode = start_interception(driver, policy)
+    except BaseException:
+        quit_driver(driver)
+        raise
+    if mode != policy.mode:
+        log(f"Interceptación '{policy.mode}' no disponible, usando modo '{mode}'", "info")
     return driver
 
 
-def perform_login(driver: WebDriver, email: str, password: str) -> bool:
+def quit_driver(driver: WebDriver):
+    """
+    Detiene la interceptación, cierra Chrome y libera el perfil persistente
+    si lo estaba usando. También descarta el estado guardado por driver.
+    """
+    try:
+        try:
+            stop_interception(driver)
+        finally:
+            driver.quit()
+    finally:
+        forget_frame_locator(driver)
+        lock = _profile_locks.pop(driver, None)
+        if lock:
+            lock.release()
+
+
+def login_outcome(driver: WebDriver):
+    """
+    Condición de espera combinada para el resultado del login, resuelta con
+    una sola sonda (URL actual y mensaje de error visible).
+
+    Returns:
+        str | bool: "success" si se navegó fuera del login, "error" si aparece
+        el mensaje de error, False mientras no haya desenlace
+    """
+    result = probe(driver, "login_outcome", host=CANVAS_HOST)
+    return (result or {}).get("outcome") or False
+
+
+def preconnect(driver: WebDriver, urls):
+    """Inyecta <link rel=preconnect> para los orígenes de `urls` en la página actual."""
+    origins = []
+    for url in urls:
+        parsed = urlparse(url or "")
+        origin = f"{parsed.scheme}://{parsed.netloc}" if parsed.netloc else None
+        if origin and origin not in origins and parsed.netloc != CANVAS_HOST:
+            origins.append(origin)
+    if origins:
+        try:
+            driver.execute_script(PRECONNECT_JS, origins)
+        except Exception:
+            pass
+
+
+@traced("perform_login")
+def perform_login(driver: WebDriver, email: str, password: str, scheduler: WaitScheduler = None,
+                  next_url: str = None) -> bool:
     """
     Realiza el proceso de login en AWS Academy.
     
@@ -63,59 +165,60 @@ def perform_login(driver: WebDriver, email: str, password: str) -> bool:
         driver: WebDriver configurado
         email: Email del usuario
         password: Contraseña del usuario
+        scheduler: Plazo global del login (por defecto, LOGIN_BUDGET)
+        next_url: Página a cargar en cuanto exista la cookie de sesión (LAB_URL)
         
     Returns:
         bool: True si el login fue exitoso, False en caso contrario
     """
+    scheduler = scheduler or WaitScheduler(LOGIN_BUDGET)
     try:
-        wait = WebDriverWait(driver, 5)
-        
         log("Abriendo página de login...", "wait")
-        driver.get("https://awsacademy.instructure.com/login/canvas")
+        with phase("login_page_load"):
+            driver.get(LOGIN_URL)
+        if next_url:
+            preconnect(driver, (next_url,) + LAB_FRAME_ORIGINS)
 
         log("Ingresando credenciales...", "wait")
-        wait.until(EC.presence_of_element_located((By.ID, "pseudonym_session_unique_id"))).send_keys(email)
-        driver.find_element(By.ID, "pseudonym_session_password").send_keys(password)
-        driver.find_element(By.CLASS_NAME, "Button--login").click()
+        with phase("credential_submit"):
+            selectors = load_selectors()["login"]
+            fields = scheduler.until(
+                lambda: driver.find_elements(By.CSS_SELECTOR, selectors["email"]),
+                limit=LOGIN_FORM_TIMEOUT
+            )
+            if not fields:
+                log("No se encontró el formulario de login", "error")
+                return False
+            fields[0].send_keys(email)
+            driver.find_element(By.CSS_SELECTOR, selectors["password"]).send_keys(password)
+            driver.find_element(By.CSS_SELECTOR, selectors["submit"]).click()
+            scheduler.mark("submit")
         
-        # Verificar si el login fue exitoso
+        # Esperar a que ocurra el primer desenlace: redirección o mensaje de error
         log("Verificando resultado del login...", "wait")
+        with phase("login_verification"):
+            outcome = scheduler.until(
+                lambda: login_outcome(driver), limit=LOGIN_TIMEOUT,
+                ignored=(JavascriptException,)
+            ) or None
         
-        # Esperar un momento para que la página se redirija
-        time.sleep(3)
-        
-        # Verificar la URL actual para detectar login exitoso
         current_url = driver.current_url
         log(f"URL actual después del login: {current_url}", "info")
         
-        # Verificar si la URL contiene login_success=1 (indicador de login exitoso)
-        if "login_success=1" in current_url:
-            log("Login exitoso detectado por URL", "ok")
+        if outcome == "success":
+            log("Login exitoso - redirigido fuera de la página de login", "ok")
+            if next_url:
+                # No esperar al dashboard: la cookie ya existe, empezar a cargar el lab
+                with phase("lab_preload"):
+                    preload_lab(driver, next_url)
             return True
         
-        # Verificar si estamos en la página principal de AWS Academy
-        if "awsacademy.instructure.com" in current_url and "login" not in current_url:
-            log("Login exitoso - redirigido a página principal", "ok")
-            return True
-            
-        # Verificar si hay mensaje de error
-        try:
-            error_element = driver.find_element(By.CLASS_NAME, "error_message")
-            if error_element.is_displayed():
-                log("Credenciales incorrectas. Verifica tu email y contraseña.", "error")
-                return False
-        except:
-            pass
-        
-        # Verificar si hay error 400 o similar en la URL o contenido
-        page_source = driver.page_source.lower()
+        if outcome == "error":
+            log("Credenciales incorrectas. Verifica tu email y contraseña.", "error")
+            return False
         
-        # Detectar errores comunes de autenticación
-        if ("error" in current_url or 
-            "400" in page_source or 
-            "unauthorized" in page_source or
-            "invalid" in page_source or
-            "incorrect" in page_source):
+        # Detectar errores de autenticación en la URL
+        if "error" in current_url:
             log("Error de autenticación detectado. Credenciales incorrectas.", "error")
             return False
         
@@ -128,6 +231,20 @@ def perform_login(driver: WebDriver, email: str, password: str) -> bool:
         return False
 
 
+def auth_state(driver: WebDriver):
+    """
+    Sonda de autenticación de la página actual: URL, si es la página de
+    login y si hay un error de autenticación (en la URL o en un mensaje visible).
+
+    Returns:
+        dict | None: error, reason, url y login_page; None si no se pudo evaluar
+    """
+    try:
+        return probe(driver, "auth_error", host=CANVAS_HOST)
+    except Exception:
+        return None
+
+
 def detect_auth_error(driver: WebDriver) -> bool:
     """
     Detecta si hay errores de autenticación en la página actual.
@@ -138,83 +255,148 @@ def detect_auth_error(driver: WebDriver) -> bool:
     Returns:
         bool: True si hay error de autenticación, False en caso contrario
     """
+    state = auth_state(driver)
+    return bool(state and state["error"])
+
+
+def export_cookies(driver: WebDriver) -> list:
+    """Obtiene las cookies del navegador en formato CDP para poder restaurarlas luego."""
     try:
-        current_url = driver.current_url.lower()
-        
-        # Si la URL contiene login_success=1, no hay error de autenticación
-        if "login_success=1" in current_url:
-            return False
-            
-        # Si estamos en la página principal de AWS Academy (sin login), no hay error
-        if "awsacademy.instructure.com" in current_url and "login" not in current_url:
-            return False
-        
-        # Detectar errores específicos de autenticación en la URL
-        url_auth_errors = [
-            "error", "400", "401", "403", "unauthorized", "forbidden",
-            "login_failed", "authentication_failed", "access_denied"
-        ]
-        
-        # Verificar solo en la URL para errores específicos
-        for error in url_auth_errors:
-            if error in current_url:
-                return True
-        
-        # Verificar elementos específicos de error de autenticación
-        try:
-            error_selectors = [
-                ".error_message", ".alert-error", 
-                ".login-error", ".auth-error", ".invalid-credentials",
-                "[class*='error']", "[class*='invalid']"
-            ]
-            
-            for selector in error_selectors:
-                try:
-                    error_element = driver.find_element(By.CSS_SELECTOR, selector)
-                    if error_element.is_displayed() and error_element.text.strip():
-                        # Verificar que el texto del error sea relevante para autenticación
-                        error_text = error_element.text.lower()
-                        auth_error_indicators = [
-                            "invalid", "incorrect", "wrong", "failed", "denied",
-                            "login failed", "authentication failed", "access denied",
-                            "credentials", "password", "username"
-                        ]
-                        
-                        if any(indicator in error_text for indicator in auth_error_indicators):
-                            return True
-                except:
-                    continue
-        except:
-            pass
-        
-        return False
-        
+        cookies = driver.execute_cdp_cmd("Network.getAllCookies", {}).get("cookies", [])
     except Exception:
-        return False
+        cookies = []
+        for cookie in driver.get_cookies():
+            cookie = dict(cookie)
+            if "expiry" in cookie:
+                cookie["expires"] = cookie.pop("expiry")
+            cookies.append(cookie)
+    return [{k: c[k] for k in COOKIE_FIELDS if k in c} for c in cookies]
 
 
-def authenticate_user() -> tuple[WebDriver, bool]:
+def restore_session(driver: WebDriver, email: str) -> bool:
     """
-    Autentica al usuario y retorna el driver configurado.
-    
+    Inyecta en el driver las cookies guardadas de una sesión anterior.
+
+    Args:
+        driver: WebDriver recién creado
+        email: Email del usuario cuya sesión se quiere restaurar
+
     Returns:
-        tuple: (driver, success) donde success indica si la autenticación fue exitosa
+        bool: True si se inyectó una sesión guardada (aún no verificada)
     """
+    cookies = load_session(email)
+    if not cookies:
+        return False
+
+    params = []
+    for cookie in cookies:
+        cookie = {k: cookie[k] for k in COOKIE_FIELDS if k in cookie}
+        if cookie.get("expires", -1) <= 0:
+            cookie.pop("expires", None)
+        params.append(cookie)
+
     try:
-        creds = validate_credentials()
-        email = creds["EMAIL"]
-        password = creds["PASSWORD"]
-    except ValueError as e:
-        log(f"Error de credenciales: {e}", "error")
-        log("Usa 'awstudent login' y 'awstudent url --set' para configurar", "info")
-        return None, False
-
-    driver = setup_driver()
-    success = perform_login(driver, email, password)
-    
+        driver.execute_cdp_cmd("Network.setCookies", {"cookies": params})
+    except Exception:
+        return False
+
+    log("Sesión restaurada desde caché, omitiendo login", "ok")
+    return True
+
+
+def session_expired(driver: WebDriver) -> bool:
+    """Indica si la sesión actual ya no es válida (redirección a /login o error de auth)."""
+    try:
+        # Las sondas leen la URL del contexto actual, que puede ser el frame del lab
+        get_frame_locator(driver).leave()
+    except Exception:
+        return True
+    state = auth_state(driver)
+    return state is None or state["login_page"] or state["error"]
+
+
+def verify_session(driver: WebDriver, lab_url: str = None) -> bool:
+    """
+    Carga LAB_URL (o Canvas) con la sesión restaurada y confirma que sigue
+    vigente. navigate_to_lab reutiliza esa carga en vez de repetirla.
+    """
+    locator = get_frame_locator(driver)
+    with phase("session_check"):
+        try:
+            locator.reset()
+            driver.get(lab_url or CANVAS_URL)
+        except Exception:
+            return False
+        if lab_url:
+            locator.pending_url = lab_url
+        return not session_expired(driver)
+
+
+def login_and_save(driver: WebDriver, email: str, password: str, lab_url: str = None) -> bool:
+    """
+    Hace login completo y guarda la sesión en caché si fue exitoso. Con
+    `lab_url`, el lab empieza a cargar apenas el login se confirma.
+    """
+    success = perform_login(driver, email, password, next_url=lab_url)
+
     # Verificación adicional de errores de autenticación
     if success and detect_auth_error(driver):
         log("Error de autenticación detectado después del login", "error")
         success = False
+
+    if success:
+        save_session(email, export_cookies(driver))
+    return success
+
+
+def relogin(driver: WebDriver, email: str = None, password: str = None) -> bool:
+    """Descarta la sesión guardada y repite el login en el mismo driver."""
+    if email is None or password is None:
+        try:
+            creds = validate_credentials()
+        except ValueError as e:
+            log(f"Error de credenciales: {e}", "error")
+            return False
+        email, password = creds["EMAIL"], creds["PASSWORD"]
+
+    log("La sesión guardada expiró, iniciando sesión de nuevo...", "wait")
+    clear_session(email)
+    return login_and_save(driver, email, password)
+
+
+def authenticate_user(email: str = None, password: str = None, driver: WebDriver = None,
+                      persist_profile: bool = False, lab_url: str = None) -> tuple[WebDriver, bool]:
+    """
+    Autentica al usuario y retorna el driver configurado.
     
-    return driver, success
+    Args:
+        email: Email del usuario (por defecto, el de .env)
+        password: Contraseña del usuario (por defecto, la de .env)
+        driver: WebDriver ya creado a reutilizar (por defecto, uno nuevo)
+        persist_profile: Si se crea un driver nuevo, usa el perfil persistente
+        lab_url: Si hay que hacer login, empieza a cargar esta URL en cuanto se
+            confirme; con una sesión restaurada, es la página con que se verifica
+        
+    Returns:
+        tuple: (driver, success) donde success indica si la autenticación fue
+        exitosa (una sesión restaurada solo cuenta si sigue vigente)
+    """
+    if email is None or password is None:
+        try:
+            creds = validate_credentials()
+            email = creds["EMAIL"]
+            password = creds["PASSWORD"]
+        except ValueError as e:
+            log(f"Error de credenciales: {e}", "error")
+            log("Usa 'awstudent login' y 'awstudent url --set' para configurar", "info")
+            return None, False
+
+    driver = driver or setup_driver(persist_profile)
+    if restore_session(driver, email):
+        if verify_session(driver, lab_url):
+            return driver, True
+        log("La sesión guardada expiró, iniciando sesión de nuevo...", "wait")
+        clear_session(email)
+        get_frame_locator(driver).pending_url = None
+
+    return driver, login_and_save(driver, email, password, lab_url)
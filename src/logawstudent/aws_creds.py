@@ -0,0 +1,208 @@
+# src/logawstudent/aws_creds.py
+import configparser
+import io
+import os
+import re
+import threading
+import time
+from pathlib import Path
+from .utils import CONFIG_DIR, FileLock, load_env, load_json, update_json, atomic_write
+from .logs import log
+from .probes import probe_frame
+
+# Selenium (lab, intercept) se importa solo al capturar, para que
+# 'awstudent creds' responda desde la caché sin cargar el navegador.
+
+CREDS_CACHE_FILE = CONFIG_DIR / "aws_creds.json"
+# Mismo archivo que usa AWS CLI, incluida su variable AWS_SHARED_CREDENTIALS_FILE
+AWS_CREDENTIALS_FILE = Path(os.environ.get("AWS_SHARED_CREDENTIALS_FILE") or Path.home() / ".aws" / "credentials")
+AWS_CREDENTIALS_LOCK = CONFIG_DIR / ".aws_credentials.lock"
+DEFAULT_PROFILE = "awsacademy"
+
+# Duración asumida si la página no muestra el tiempo restante de la sesión
+DEFAULT_VALIDITY = 3600
+
+# Margen antes del vencimiento a partir del cual la caché deja de usarse
+EXPIRY_MARGIN = 300
+
+_KEY_PATTERNS = {
+    "aws_access_key_id": re.compile(r"aws_access_key_id\s*[=:]\s*[\"']?([A-Z0-9]{16,128})"),
+    "aws_secret_access_key": re.compile(r"aws_secret_access_key\s*[=:]\s*[\"']?([A-Za-z0-9/+=]{30,})"),
+    "aws_session_token": re.compile(r"aws_session_token\s*[=:]\s*[\"']?([A-Za-z0-9/+=]{100,})"),
+}
+_CONSOLE_URL = re.compile(
+    r"https://(?:signin\.aws\.amazon\.com/federation|[\w.-]*console\.aws\.amazon\.com)[^\s\"'<>\\]*"
+)
+
+def parse_credentials(text: str) -> dict:
+    """Extrae las claves de AWS CLI y la URL de la consola presentes en un texto."""
+    found = {}
+    for key, pattern in _KEY_PATTERNS.items():
+        match = pattern.search(text)
+        if match:
+            found[key] = match.group(1)
+    match = _CONSOLE_URL.search(text)
+    if match:
+        found["console_url"] = match.group(0).replace("&amp;", "&")
+    return found
+
+
+class CredentialCapture:
+    """Acumula credenciales vistas en las respuestas de red del lab."""
+
+    def __init__(self):
+        self.values = {}
+        self.lock = threading.Lock()
+        self.complete = threading.Event()
+        self.watching = False
+
+    def feed(self, url, body):
+        if "aws_" not in body and "amazon.com" not in body:
+            return
+        found = parse_credentials(body)
+        if not found:
+            return
+        with self.lock:
+            self.values.update(found)
+            if has_keys(self.values):
+                self.complete.set()
+
+
+def has_keys(creds) -> bool:
+    """Indica si `creds` trae las tres claves de AWS CLI."""
+    return all(creds.get(key) for key in _KEY_PATTERNS)
+
+
+def load_cached(email: str):
+    """
+    Credenciales cacheadas de la cuenta si aún no vencen.
+
+    Returns:
+        dict | None: aws_access_key_id, aws_secret_access_key,
+        aws_session_token, console_url, expires_at y profile
+    """
+    entry = (load_json(CREDS_CACHE_FILE, {}) or {}).get(email)
+    if not entry or entry.get("expires_at", 0) - EXPIRY_MARGIN <= time.time():
+        return None
+    return entry
+
+
+def profile_for(email: str) -> str:
+    """
+    Perfil de ~/.aws/credentials para una cuenta: DEFAULT_PROFILE para la
+    cuenta configurada con 'awstudent login' y uno propio para las demás
+    (p. ej. las de un lote), para que no se pisen entre sí.
+    """
+    configured = load_env().get("EMAIL")
+    if not email or not configured or email.lower() == configured.lower():
+        return DEFAULT_PROFILE
+    return f"{DEFAULT_PROFILE}-{re.sub(r'[^a-z0-9]+', '-', email.lower()).strip('-')}"
+
+
+def write_aws_profile(creds: dict, profile: str = DEFAULT_PROFILE, path: Path = None):
+    """Escribe (o reemplaza) el perfil en ~/.aws/credentials conservando los demás."""
+    path = Path(path or AWS_CREDENTIALS_FILE)
+    with FileLock(AWS_CREDENTIALS_LOCK):
+        parser = configparser.RawConfigParser()
+        parser.read(path)
+        parser[profile] = {key: creds[key] for key in _KEY_PATTERNS if creds.get(key)}
+        buffer = io.StringIO()
+        parser.write(buffer)
+        atomic_write(path, buffer.getvalue())
+
+
+def save_credentials(email: str, creds: dict, remaining=None, profile: str = None) -> dict:
+    """
+    Guarda las credenciales en la caché con su vencimiento y en ~/.aws/credentials.
+
+    Args:
+        remaining: Segundos restantes de la sesión del lab (None si se desconoce)
+        profile: Perfil de AWS CLI a escribir (por defecto, profile_for(email))
+    """
+    profile = profile or profile_for(email)
+    now = time.time()
+    entry = dict(creds)
+    entry.update({
+        "profile": profile,
+        "captured_at": now,
+        "expires_at": now + (remaining if remaining is not None else DEFAULT_VALIDITY),
+    })
+    if has_keys(creds):
+        write_aws_profile(creds, profile)
+    update_json(CREDS_CACHE_FILE, lambda cache: {**(cache or {}), email: entry}, {})
+    return entry
+
+
+def report_credentials(entry):
+    """Informa el perfil y el vencimiento de las credenciales guardadas y la URL de la consola."""
+    if not entry:
+        log("No se encontraron credenciales de AWS en el laboratorio", "info")
+        return
+    if entry.get("aws_session_token"):
+        expires = time.strftime("%H:%M", time.localtime(entry["expires_at"]))
+        log(f"Credenciales de AWS guardadas en el perfil '{entry['profile']}' (vencen a las {expires})", "ok")
+    if entry.get("console_url"):
+        log(f"Consola de AWS: {entry['console_url']}", "done")
+
+
+def clear_cached(email: str = None):
+    """Olvida las credenciales cacheadas de una cuenta, o todas."""
+    def forget(cache):
+        if email is None:
+            return {}
+        cache = cache or {}
+        cache.pop(email, None)
+        return cache
+
+    update_json(CREDS_CACHE_FILE, forget, {})
+
+
+def watch_credentials(driver) -> CredentialCapture:
+    """Empieza a escanear las respuestas de red del driver en busca de credenciales."""
+    from .intercept import add_response_watcher
+    capture = CredentialCapture()
+    capture.watching = add_response_watcher(driver, capture.feed)
+    return capture
+
+
+def collect_credentials(driver, email: str, capture: CredentialCapture = None,
+                        timeout: float = 8, profile: str = None, remaining=None):
+    """
+    Obtiene las credenciales del lab ya listo: de las respuestas de red
+    capturadas y, si no llegaron, abriendo el panel 'AWS Details' por JS y
+    leyendo su contenido del DOM como último recurso.
+
+    Args:
+        remaining: Segundos restantes de la sesión ya leídos (por defecto, se leen)
+        profile: Perfil de AWS CLI a escribir (por defecto, profile_for(email))
+
+    Returns:
+        dict | None: Entrada guardada en la caché, o None si no se encontraron
+    """
+    from .intercept import remove_response_watcher
+    from .lab import get_frame_locator, read_session_remaining
+
+    capture = capture or watch_credentials(driver)
+    locator = get_frame_locator(driver)
+    deadline = time.time() + timeout
+    try:
+        if not capture.complete.is_set():
+            probe_frame(locator, "show_details")
+        while True:
+            with capture.lock:
+                creds = dict(capture.values)
+            if not has_keys(creds):
+                found = probe_frame(locator, "credentials_text")
+                dom = parse_credentials(found["text"] if found else "")
+                creds = {**dom, **creds}
+            if has_keys(creds) or time.time() >= deadline:
+                break
+            capture.complete.wait(0.5)
+    finally:
+        remove_response_watcher(driver, capture.feed)
+
+    if not creds:
+        return None
+    if remaining is None:
+        remaining = read_session_remaining(driver)
+    return save_credentials(email, creds, remaining, profile)
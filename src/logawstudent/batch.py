@@ -0,0 +1,123 @@
+# src/logawstudent/batch.py
+import csv
+import threading
+import time
+import concurrent.futures
+from .auth import authenticate_user, setup_driver, quit_driver
+from .logs import log, log_context
+from .core import run_lab
+
+REQUIRED_COLUMNS = ("email", "password", "lab_url")
+DEFAULT_WORKERS = 3
+
+
+def load_accounts(path) -> list:
+    """
+    Lee un CSV con columnas email, password y lab_url.
+
+    Returns:
+        list: Diccionarios con las claves email, password y lab_url
+
+    Raises:
+        ValueError: Si faltan columnas o alguna fila está incompleta
+    """
+    with open(path, newline="", encoding="utf-8") as f:
+        reader = csv.DictReader(f)
+        columns = [c.strip().lower() for c in reader.fieldnames or []]
+        missing = [c for c in REQUIRED_COLUMNS if c not in columns]
+        if missing:
+            raise ValueError(f"Faltan columnas en {path}: {', '.join(missing)}")
+
+        accounts = []
+        for line, row in enumerate(reader, start=2):
+            row = {k.strip().lower(): (v or "").strip() for k, v in row.items() if k}
+            if not any(row.values()):
+                continue
+            empty = [c for c in REQUIRED_COLUMNS if not row.get(c)]
+            if empty:
+                raise ValueError(f"Fila {line} incompleta: falta {', '.join(empty)}")
+            accounts.append({c: row[c] for c in REQUIRED_COLUMNS})
+    return accounts
+
+
+def run_account(account: dict, timeout: float) -> dict:
+    """
+    Autentica una cuenta y procesa su laboratorio con su propio navegador.
+    Si se supera `timeout`, se cierra el navegador para abortar la cuenta.
+
+    Returns:
+        dict: email, status ('ready', 'failed', 'auth', 'timeout' o 'error'), seconds y error
+    """
+    result = {"email": account["email"], "status": "failed", "seconds": 0.0, "error": None}
+    holder = {"driver": None, "quit": False}
+    lock = threading.Lock()
+    start = time.perf_counter()
+
+    def release():
+        # Cierra el navegador una sola vez, lo pida el temporizador o el finally
+        with lock:
+            driver = holder["driver"]
+            if driver is None or holder["quit"]:
+                return
+            holder["quit"] = True
+        try:
+            quit_driver(driver)
+        except Exception:
+            pass
+
+    def expire():
+        result["status"] = "timeout"
+        release()
+
+    def expired() -> bool:
+        return result["status"] == "timeout"
+
+    timer = threading.Timer(timeout, expire)
+    timer.daemon = True
+    timer.start()
+    with log_context(account=account["email"]):
+        try:
+            driver = setup_driver()
+            with lock:
+                holder["driver"] = driver
+            if expired():
+                return result
+            driver, success = authenticate_user(account["email"], account["password"], driver,
+                                                lab_url=account["lab_url"])
+            if expired():
+                pass
+            elif not success:
+                result["status"] = "auth"
+            elif run_lab(driver, account["lab_url"], account["email"], account["password"]):
+                result["status"] = "ready"
+        except Exception as e:
+            if not expired():
+                result["status"] = "error"
+                result["error"] = str(e)
+        finally:
+            timer.cancel()
+            release()
+            result["seconds"] = time.perf_counter() - start
+    return result
+
+
+def run_batch(accounts: list, workers: int = DEFAULT_WORKERS, timeout: float = 300) -> list:
+    """
+    Procesa varias cuentas en paralelo con un máximo de `workers` navegadores.
+
+    Returns:
+        list: Resultados de run_account en el mismo orden que `accounts`
+    """
+    results = [None] * len(accounts)
+    log(f"Procesando {len(accounts)} cuentas con {workers} en paralelo...", "wait")
+    with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {
+            executor.submit(run_account, account, timeout): index
+            for index, account in enumerate(accounts)
+        }
+        for future in concurrent.futures.as_completed(futures):
+            index = futures[future]
+            results[index] = future.result()
+            status = "ok" if results[index]["status"] == "ready" else "error"
+            log(f"{accounts[index]['email']}: {results[index]['status']}", status)
+    return results
@@ -0,0 +1,249 @@
+# src/logawstudent/bench.py
+"""
+Benchmarks de LogAWStudent.
+
+    python -m logawstudent.bench imports [--runs N] [--budget SEGUNDOS]
+    python -m logawstudent.bench e2e [--runs N] [--engine selenium|http|cdp ...]
+                                     [--initial Terminated] [--init-seconds S]
+                                     [--latency S] [--warm] [--persist-profile]
+                                     [--json]
+
+'imports' mide el tiempo de importar el CLI en un intérprete nuevo y falla
+(código de salida 1) si supera el presupuesto o si carga módulos del
+navegador, que solo deben importarse al lanzar Chrome.
+
+'e2e' ejecuta launch_lab de punta a punta contra el servidor simulado de
+mock_server y reporta percentiles de latencia, comandos WebDriver (o CDP)
+y peticiones HTTP por corrida. Con varios --engine, mide cada motor contra
+el mismo servidor y compara sus medianas. Las corridas usan un directorio
+de configuración y un archivo de credenciales de AWS temporales, así no
+alteran las cachés, el historial ni el perfil 'awsacademy' del usuario.
+"""
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+# Módulos que un comando solo de configuración no debe cargar
+BROWSER_MODULES = ("selenium", "webdriver_manager", "logawstudent.auth", "logawstudent.lab",
+                   "logawstudent.cdp_engine")
+
+# Presupuesto por defecto para importar el CLI (mediana, en segundos)
+IMPORT_BUDGET = 0.25
+
+_IMPORT_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import logawstudent.cli
+elapsed = time.perf_counter() - start
+print(json.dumps({"seconds": elapsed, "modules": sorted(sys.modules)}))
+"""
+
+
+def measure_cli_import(runs=5) -> dict:
+    """
+    Importa logawstudent.cli en `runs` intérpretes nuevos.
+
+    Returns:
+        dict: median, min y max en segundos, y los módulos del navegador cargados
+    """
+    samples = []
+    loaded = set()
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, "-c", _IMPORT_PROBE],
+            capture_output=True, text=True, check=True
+        ).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        samples.append(result["seconds"])
+        loaded.update(m for m in result["modules"]
+                      if any(m == b or m.startswith(b + ".") for b in BROWSER_MODULES))
+    return {
+        "median": statistics.median(samples),
+        "min": min(samples),
+        "max": max(samples),
+        "browser_modules": sorted(loaded),
+    }
+
+
+def _imports(args) -> int:
+    result = measure_cli_import(args.runs)
+    print(f"Importar logawstudent.cli: mediana {result['median'] * 1000:.1f} ms "
+          f"(min {result['min'] * 1000:.1f} ms, max {result['max'] * 1000:.1f} ms)")
+
+    failed = False
+    if result["browser_modules"]:
+        print(f"❌ Módulos del navegador cargados al importar: {', '.join(result['browser_modules'])}")
+        failed = True
+    if result["median"] > args.budget:
+        print(f"❌ Supera el presupuesto de {args.budget * 1000:.0f} ms")
+        failed = True
+    if not failed:
+        print("✅ Dentro del presupuesto de arranque")
+    return 1 if failed else 0
+
+
+def percentile(samples, pct):
+    """Percentil por rango más cercano (pct entre 0 y 100)."""
+    ordered = sorted(samples)
+    index = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered) + 0.5)) - 1))
+    return ordered[index]
+
+
+def _isolate_config() -> str:
+    """
+    Redirige la configuración y ~/.aws/credentials a un directorio temporal,
+    para que las corridas no toquen la sesión, el historial de Ready (que
+    usan WaitScheduler y prewarm) ni el perfil de AWS reales del usuario.
+
+    Returns:
+        str: Directorio temporal a eliminar al terminar
+    """
+    if "logawstudent.utils" in sys.modules:
+        raise RuntimeError("run_e2e debe ejecutarse antes de importar logawstudent.utils")
+    workdir = tempfile.mkdtemp(prefix="logawstudent-bench-")
+    os.environ["LOGAWSTUDENT_CONFIG_DIR"] = os.path.join(workdir, "config")
+    os.environ["AWS_SHARED_CREDENTIALS_FILE"] = os.path.join(workdir, "aws", "credentials")
+    return workdir
+
+
+def _start_server(initial, init_seconds, latency):
+    """Arranca el MockServer y apunta CANVAS_URL a él (antes de importar utils)."""
+    from .mock_server import MockServer
+
+    server = MockServer(initial=initial, init_seconds=init_seconds, latency=latency).start()
+    os.environ["LOGAWSTUDENT_CANVAS_URL"] = server.url
+    return server
+
+
+def _run_engine(server, engine, runs, warm=False, persist_profile=False) -> dict:
+    """Ejecuta launch_lab `runs` veces con `engine` contra un MockServer ya iniciado."""
+    from .core import launch_lab
+    from .profiling import start_trace, stop_trace
+    from .session import clear_session
+
+    results = []
+    try:
+        for _ in range(runs):
+            server.reset(sessions=not warm)
+            if not warm:
+                clear_session(server.email)
+            tracer = start_trace()
+            start = time.perf_counter()
+            try:
+                ok = launch_lab(engine, server.email, server.password, server.lab_url, persist_profile)
+            finally:
+                elapsed = time.perf_counter() - start
+                stop_trace()
+            results.append({
+                "ok": bool(ok),
+                "seconds": elapsed,
+                "webdriver_commands": tracer.commands,
+                "http_requests": server.requests,
+            })
+    finally:
+        clear_session(server.email)
+
+    seconds = [r["seconds"] for r in results]
+    return {
+        "engine": engine,
+        "runs": results,
+        "succeeded": sum(r["ok"] for r in results),
+        "p50": percentile(seconds, 50),
+        "p90": percentile(seconds, 90),
+        "p99": percentile(seconds, 99),
+        "mean": statistics.mean(seconds),
+        "webdriver_commands": statistics.mean(r["webdriver_commands"] for r in results),
+        "http_requests": statistics.mean(r["http_requests"] for r in results),
+    }
+
+
+def run_e2e(runs=5, engine="selenium", initial="Terminated", init_seconds=5.0,
+            latency=0.0, warm=False, persist_profile=False) -> dict:
+    """
+    Ejecuta launch_lab `runs` veces contra un MockServer local.
+
+    Args:
+        warm: Conserva la sesión guardada entre corridas en vez de empezar en frío
+        persist_profile: Usa el perfil persistente de Chrome (caché de disco
+            caliente desde la segunda corrida, dentro del directorio temporal)
+
+    Returns:
+        dict: Resultados por corrida y percentiles de latencia
+    """
+    return compare_e2e(runs, [engine], initial, init_seconds, latency, warm, persist_profile)[0]
+
+
+def compare_e2e(runs=5, engines=("selenium", "cdp"), initial="Terminated", init_seconds=5.0,
+                latency=0.0, warm=False, persist_profile=False) -> list:
+    """
+    Como run_e2e, pero con cada motor de `engines` en turno contra el mismo
+    MockServer (CANVAS_URL y el directorio de configuración temporal se fijan
+    una sola vez por proceso).
+
+    Returns:
+        list: Un reporte de run_e2e por motor, en el mismo orden
+    """
+    workdir = _isolate_config()
+    server = _start_server(initial, init_seconds, latency)
+    try:
+        return [_run_engine(server, engine, runs, warm, persist_profile) for engine in engines]
+    finally:
+        server.stop()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def _e2e(args) -> int:
+    reports = compare_e2e(args.runs, args.engine or ["selenium"], args.initial, args.init_seconds,
+                          args.latency, args.warm, args.persist_profile)
+    if args.json:
+        print(json.dumps(reports[0] if len(reports) == 1 else reports))
+    else:
+        for report in reports:
+            print(f"Motor: {report['engine']}  corridas exitosas: {report['succeeded']}/{len(report['runs'])}")
+            print(f"Latencia: p50 {report['p50']:.2f} s  p90 {report['p90']:.2f} s  "
+                  f"p99 {report['p99']:.2f} s  media {report['mean']:.2f} s")
+            print(f"Comandos WebDriver/CDP por corrida: {report['webdriver_commands']:.1f}")
+            print(f"Peticiones HTTP al servidor por corrida: {report['http_requests']:.1f}")
+        base = reports[0]
+        for report in reports[1:]:
+            if not (report["succeeded"] and base["succeeded"]):
+                continue
+            print(f"{report['engine']} frente a {base['engine']}: p50 {report['p50'] - base['p50']:+.2f} s "
+                  f"({report['p50'] / base['p50']:.2f}x)")
+    return 0 if all(r["succeeded"] == len(r["runs"]) for r in reports) else 1
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m logawstudent.bench")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    imports = commands.add_parser("imports", help="Tiempo de importación del CLI")
+    imports.add_argument("--runs", type=int, default=5)
+    imports.add_argument("--budget", type=float, default=IMPORT_BUDGET)
+    imports.set_defaults(func=_imports)
+
+    e2e = commands.add_parser("e2e", help="launch_lab de punta a punta contra el servidor simulado")
+    e2e.add_argument("--runs", type=int, default=5)
+    e2e.add_argument("--engine", action="append", choices=["selenium", "http", "cdp"],
+                     help="Motor a medir; repetir para compararlos en la misma corrida")
+    e2e.add_argument("--initial", default="Terminated", choices=["Terminated", "Initializing", "Ready"])
+    e2e.add_argument("--init-seconds", type=float, default=5.0)
+    e2e.add_argument("--latency", type=float, default=0.0)
+    e2e.add_argument("--warm", action="store_true", help="Reutiliza la sesión guardada entre corridas")
+    e2e.add_argument("--persist-profile", action="store_true",
+                     help="Reutiliza el perfil de Chrome y su caché entre corridas")
+    e2e.add_argument("--json", action="store_true", help="Imprime el reporte como JSON")
+    e2e.set_defaults(func=_e2e)
+
+    args = parser.parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,138 @@
+# src/logawstudent/browser_profile.py
+import os
+import shutil
+import time
+from pathlib import Path
+from .utils import CONFIG_DIR, FileLock, load_json, save_json
+
+# Perfil de Chrome persistente (opt-in con 'start --persist-profile')
+PROFILE_DIR = CONFIG_DIR / "profile"
+PROFILE_LOCK = CONFIG_DIR / "profile.lock"
+PROFILE_STATE_FILE = CONFIG_DIR / "profile.json"
+
+# Tamaño máximo de la caché de disco de Chrome (--disk-cache-size)
+DISK_CACHE_SIZE = 200 * 1024 * 1024
+
+# Tamaño total del perfil a partir del cual se poda aunque no toque por fecha
+PROFILE_MAX_SIZE = 2 * DISK_CACHE_SIZE
+
+# Días entre podas periódicas
+PRUNE_INTERVAL = 7 * 24 * 3600
+
+# Datos regenerables que no aceleran la carga de Canvas ni del lab
+PRUNABLE = (
+    "Crashpad", "ShaderCache", "GrShaderCache", "GraphiteDawnCache", "component_crx_cache",
+    "Default/GPUCache", "Default/DawnCache", "Default/Service Worker/CacheStorage",
+    "Default/blob_storage", "Default/Download Service", "Default/optimization_guide_hint_cache_store",
+)
+
+# Caché HTTP y de código compilado: solo se borran si el perfil sigue sobre el límite
+CACHE_DIRS = ("Default/Cache", "Default/Code Cache")
+
+
+def _dir_size(path: Path) -> int:
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.lstat(os.path.join(root, name)).st_size
+            except OSError:
+                pass
+    return total
+
+
+def profile_size() -> int:
+    """Tamaño en bytes del perfil persistente (0 si no existe)."""
+    return _dir_size(PROFILE_DIR) if PROFILE_DIR.exists() else 0
+
+
+def prune_profile(force=False) -> int:
+    """
+    Borra los datos regenerables del perfil y, si aún supera
+    PROFILE_MAX_SIZE, también la caché HTTP. Debe llamarse con el lock tomado.
+
+    Args:
+        force: Poda aunque no haya pasado PRUNE_INTERVAL
+
+    Returns:
+        int: Bytes liberados
+    """
+    state = load_json(PROFILE_STATE_FILE, {})
+    if not force and time.time() - state.get("pruned_at", 0) < PRUNE_INTERVAL:
+        return 0
+
+    before = profile_size()
+    for relative in PRUNABLE:
+        shutil.rmtree(PROFILE_DIR / relative, ignore_errors=True)
+    if profile_size() > PROFILE_MAX_SIZE:
+        for relative in CACHE_DIRS:
+            shutil.rmtree(PROFILE_DIR / relative, ignore_errors=True)
+
+    after = profile_size()
+    save_json(PROFILE_STATE_FILE, {"pruned_at": time.time(), "size": after})
+    return max(0, before - after)
+
+
+def acquire_profile():
+    """
+    Toma el perfil persistente para un Chrome, podándolo si corresponde.
+
+    Returns:
+        FileLock | None: Lock a liberar al cerrar Chrome, o None si otro
+        proceso está usando el perfil
+    """
+    lock = FileLock(PROFILE_LOCK)
+    if not lock.acquire(blocking=False):
+        return None
+    PROFILE_DIR.mkdir(parents=True, exist_ok=True)
+    prune_profile()
+    return lock
+
+
+def profile_arguments() -> list:
+    """Argumentos de Chrome para usar el perfil persistente con caché acotada."""
+    return [
+        f"--user-data-dir={PROFILE_DIR}",
+        "--profile-directory=Default",
+        f"--disk-cache-size={DISK_CACHE_SIZE}",
+        "--no-first-run",
+        "--no-default-browser-check",
+    ]
+
+
+def profile_in_use() -> bool:
+    lock = FileLock(PROFILE_LOCK)
+    if lock.acquire(blocking=False):
+        lock.release()
+        return False
+    return True
+
+
+def reset_profile() -> bool:
+    """
+    Borra el perfil persistente completo.
+
+    Returns:
+        bool: False si un Chrome lo está usando y no se borró
+    """
+    lock = FileLock(PROFILE_LOCK)
+    if not lock.acquire(blocking=False):
+        return False
+    try:
+        shutil.rmtree(PROFILE_DIR, ignore_errors=True)
+        if PROFILE_STATE_FILE.exists():
+            PROFILE_STATE_FILE.unlink()
+    finally:
+        lock.release()
+    return True
+
+
+def force_prune() -> int:
+    """Poda el perfil ahora; retorna -1 si está en uso."""
+    lock = FileLock(PROFILE_LOCK)
+    if not lock.acquire(blocking=False):
+        return -1
+    try:
+        return prune_profile(force=True)
+    finally:
+        lock.release()
@@ -0,0 +1,812 @@
+# src/logawstudent/cdp_engine.py
+"""
+Backend que controla Chrome directamente por el Chrome DevTools Protocol,
+sin Selenium ni chromedriver: un cliente WebSocket mínimo sobre asyncio y
+una pestaña por cuenta (cada una en su propio contexto de navegador), así
+que varias cuentas avanzan a la vez desde un solo event loop.
+"""
+import asyncio
+import base64
+import hashlib
+import itertools
+import json
+import os
+import shutil
+import struct
+import subprocess
+import tempfile
+import time
+import urllib.parse
+from .utils import validate_credentials, CANVAS_URL
+from .logs import log, log_context
+from .session import save_session, load_session, clear_session, COOKIE_FIELDS
+from .schedule import WaitScheduler, record_ready_time, typical_ready_time
+from .probes import PROBE_JS, load_selectors
+from .lab_state import record_lab_state, clear_lab_state
+from .profiling import current_trace, phase
+
+LOGIN_URL = f"{CANVAS_URL}/login/canvas"
+CANVAS_HOST = urllib.parse.urlparse(CANVAS_URL).netloc
+
+# Plazos (segundos): arranque de Chrome, cada comando CDP y cada navegación
+LAUNCH_TIMEOUT = 20
+COMMAND_TIMEOUT = 30
+NAVIGATION_TIMEOUT = 30
+
+# Mismos presupuestos que el backend Selenium (auth.py / lab.py)
+LOGIN_BUDGET = 25
+LOGIN_FORM_TIMEOUT = 5
+LOGIN_TIMEOUT = 15
+NAVIGATION_BUDGET = 5
+FIRST_READ_BUDGET = 8
+CLICK_BUDGET = 15
+LAB_BUDGET = 240
+CREDENTIALS_TIMEOUT = 8
+
+# Espera máxima de un evento de #vmstatus antes de volver a leer el estado
+STATUS_EVENT_WAIT = 10
+
+# Binding expuesto en el frame del lab para notificar cambios de #vmstatus
+STATUS_BINDING = "__lasStatus"
+
+_WS_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+
+# Observador de #vmstatus en el frame del lab: llama al binding en cada cambio
+WATCH_STATUS_JS = """
+var selector = arguments[0], binding = arguments[1];
+var el = document.querySelector(selector);
+if (!el || typeof window[binding] !== 'function') return null;
+if (window.__lasObserved) return true;
+window.__lasObserved = true;
+var last = null;
+var report = function() {
+  var status = el.getAttribute('aria-label') || el.getAttribute('title') || el.getAttribute('class') || '';
+  if (status !== last) { last = status; window[binding](status); }
+};
+new MutationObserver(report).observe(el, {attributes: true, attributeFilter: ['aria-label', 'title', 'class']});
+report();
+return true;
+"""
+
+FILL_JS = """
+var el = document.querySelector(arguments[0]);
+if (!el) return false;
+el.focus();
+el.value = '';
+return true;
+"""
+
+CLICK_JS = """
+var el = document.querySelector(arguments[0]);
+if (!el) return false;
+el.click();
+return true;
+"""
+
+PAGE_STATE_JS = """
+return {url: location.href, path: location.pathname, frames: document.querySelectorAll('iframe').length};
+"""
+
+
+class CdpError(Exception):
+    """Error devuelto por Chrome a un comando CDP (o excepción de JavaScript)."""
+
+
+def _mask(data: bytes, key: bytes) -> bytes:
+    if not data:
+        return data
+    repeated = (key * (len(data) // 4 + 1))[:len(data)]
+    return (int.from_bytes(data, "big") ^ int.from_bytes(repeated, "big")).to_bytes(len(data), "big")
+
+
+class WebSocket:
+    """Cliente WebSocket mínimo (RFC 6455): mensajes de texto, ping/pong y cierre; sin TLS."""
+
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+
+    @classmethod
+    async def connect(cls, url: str, timeout: float = 10):
+        parsed = urllib.parse.urlparse(url)
+        reader, writer = await asyncio.wait_for(
+            asyncio.open_connection(parsed.hostname, parsed.port or 80, limit=1 << 24), timeout
+        )
+        key = base64.b64encode(os.urandom(16)).decode()
+        path = parsed.path + (f"?{parsed.query}" if parsed.query else "")
+        writer.write(
+            f"GET {path or '/'} HTTP/1.1\r\nHost: {parsed.netloc}\r\nUpgrade: websocket\r\n"
+            f"Connection: Upgrade\r\nSec-WebSocket-Key: {key}\r\nSec-WebSocket-Version: 13\r\n\r\n".encode()
+        )
+        await writer.drain()
+        head = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), timeout)
+        status = head.split(b"\r\n", 1)[0].decode(errors="replace")
+        accept = base64.b64encode(hashlib.sha1((key + _WS_GUID).encode()).digest())
+        if status.split(" ")[1:2] != ["101"] or accept not in head:
+            writer.close()
+            raise ConnectionError(f"Handshake WebSocket rechazado: {status}")
+        return cls(reader, writer)
+
+    async def _send_frame(self, opcode: int, payload: bytes):
+        header = bytearray([0x80 | opcode])
+        length = len(payload)
+        if length < 126:
+            header.append(0x80 | length)
+        elif length < 1 << 16:
+            header.append(0x80 | 126)
+            header += struct.pack("!H", length)
+        else:
+            header.append(0x80 | 127)
+            header += struct.pack("!Q", length)
+        key = os.urandom(4)
+        self.writer.write(bytes(header) + key + _mask(payload, key))
+        await self.writer.drain()
+
+    async def send(self, text: str):
+        await self._send_frame(0x1, text.encode())
+
+    async def recv(self) -> str:
+        """Siguiente mensaje de texto; ConnectionError si el otro extremo cerró."""
+        message = bytearray()
+        while True:
+            first, second = await self.reader.readexactly(2)
+            opcode = first & 0x0F
+            length = second & 0x7F
+            if length == 126:
+                length = struct.unpack("!H", await self.reader.readexactly(2))[0]
+            elif length == 127:
+                length = struct.unpack("!Q", await self.reader.readexactly(8))[0]
+            key = await self.reader.readexactly(4) if second & 0x80 else None
+            payload = await self.reader.readexactly(length)
+            if key:
+                payload = _mask(payload, key)
+
+            if opcode == 0x8:
+                raise ConnectionError("El WebSocket se cerró")
+            if opcode == 0x9:
+                await self._send_frame(0xA, payload)
+                continue
+            if opcode == 0xA:
+                continue
+            message += payload
+            if first & 0x80:
+                return message.decode()
+
+    def close(self):
+        self.writer.close()
+
+
+class CdpConnection:
+    """Multiplexa comandos CDP (por id) y eventos sobre un WebSocket del navegador."""
+
+    def __init__(self, websocket: WebSocket):
+        self.websocket = websocket
+        self.ids = itertools.count(1)
+        self.pending = {}
+        self.listeners = []
+        self.reader = asyncio.ensure_future(self._read())
+
+    async def send(self, method: str, params: dict = None, session_id: str = None,
+                   timeout: float = COMMAND_TIMEOUT) -> dict:
+        if self.reader.done():
+            raise ConnectionError("Chrome cerró la conexión DevTools")
+        message_id = next(self.ids)
+        future = asyncio.get_running_loop().create_future()
+        self.pending[message_id] = future
+        message = {"id": message_id, "method": method, "params": params or {}}
+        if session_id:
+            message["sessionId"] = session_id
+        tracer = current_trace()
+        if tracer is not None:
+            tracer.count_command()
+        try:
+            await self.websocket.send(json.dumps(message))
+            return await asyncio.wait_for(future, timeout)
+        finally:
+            self.pending.pop(message_id, None)
+
+    async def _read(self):
+        try:
+            while True:
+                message = json.loads(await self.websocket.recv())
+                if "id" in message:
+                    future = self.pending.get(message["id"])
+                    if future is None or future.done():
+                        continue
+                    if "error" in message:
+                        future.set_exception(CdpError(message["error"].get("message", "Error CDP")))
+                    else:
+                        future.set_result(message.get("result", {}))
+                else:
+                    for listener in list(self.listeners):
+                        # Un observador con error no debe detener la lectura
+                        try:
+                            listener(message)
+                        except Exception as e:
+                            log(f"Error al procesar el evento CDP {message.get('method')}: {e}", "debug")
+        except (ConnectionError, asyncio.IncompleteReadError, OSError):
+            pass
+        finally:
+            for future in self.pending.values():
+                if not future.done():
+                    future.set_exception(ConnectionError("Chrome cerró la conexión DevTools"))
+
+    def on(self, listener):
+        self.listeners.append(listener)
+        return listener
+
+    def off(self, listener):
+        if listener in self.listeners:
+            self.listeners.remove(listener)
+
+    async def wait_event(self, method: str, sessions=None, predicate=None, timeout: float = None):
+        """
+        Espera el próximo evento `method` de alguna de `sessions` (todas si es
+        None) que cumpla `predicate`.
+
+        Returns:
+            dict | None: Parámetros del evento, o None si venció `timeout`
+        """
+        future = asyncio.get_running_loop().create_future()
+
+        def listener(message):
+            if future.done() or message.get("method") != method:
+                return
+            if sessions is not None and message.get("sessionId") not in sessions:
+                return
+            if predicate is None or predicate(message.get("params", {})):
+                future.set_result(message.get("params", {}))
+
+        self.on(listener)
+        try:
+            return await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            return None
+        finally:
+            self.off(listener)
+
+    async def close(self):
+        self.reader.cancel()
+        self.websocket.close()
+
+
+class CdpPage:
+    """
+    Pestaña de una cuenta en su propio contexto de navegador. Sigue los iframes
+    de otro origen (targets adjuntos) y sus contextos de ejecución, para poder
+    evaluar scripts en el frame del lab como FrameLocator en el backend Selenium.
+    """
+
+    def __init__(self, browser, session_id: str, target_id: str, context_id: str):
+        self.browser = browser
+        self.connection = browser.connection
+        self.session_id = session_id
+        self.target_id = target_id
+        self.context_id = context_id
+        self.sessions = {session_id}
+        self.contexts = {}
+        self.frame_hint = None
+        self.tasks = set()
+        self.connection.on(self._on_event)
+
+    async def setup(self, blocked_urls=()):
+        await self._enable(self.session_id)
+        if blocked_urls:
+            await self.send("Network.setBlockedURLs", {"urls": list(blocked_urls)})
+
+    def send(self, method: str, params: dict = None, session_id: str = None):
+        return self.connection.send(method, params, session_id or self.session_id)
+
+    async def _enable(self, session_id: str):
+        await asyncio.gather(
+            self.send("Page.enable", session_id=session_id),
+            self.send("Runtime.enable", session_id=session_id),
+            self.send("Network.enable", session_id=session_id),
+            self.send("Target.setAutoAttach", {"autoAttach": True, "waitForDebuggerOnStart": True,
+                                               "flatten": True}, session_id=session_id),
+        )
+
+    async def _attach_child(self, session_id: str, target_type: str):
+        try:
+            if target_type == "iframe":
+                await self._enable(session_id)
+            await self.send("Runtime.runIfWaitingForDebugger", session_id=session_id)
+        except (CdpError, ConnectionError, asyncio.TimeoutError):
+            pass
+
+    def _on_event(self, message):
+        session_id = message.get("sessionId")
+        if session_id not in self.sessions:
+            return
+        method, params = message.get("method"), message.get("params", {})
+        if method == "Runtime.executionContextCreated":
+            context = params["context"]
+            if context.get("auxData", {}).get("isDefault"):
+                self.contexts[(session_id, context["id"])] = context["auxData"].get("frameId")
+        elif method == "Runtime.executionContextDestroyed":
+            self.contexts.pop((session_id, params.get("executionContextId")), None)
+        elif method == "Runtime.executionContextsCleared":
+            for key in [k for k in self.contexts if k[0] == session_id]:
+                del self.contexts[key]
+        elif method == "Target.attachedToTarget":
+            child = params["sessionId"]
+            target_type = params.get("targetInfo", {}).get("type")
+            if target_type == "iframe":
+                self.sessions.add(child)
+            task = asyncio.ensure_future(self._attach_child(child, target_type))
+            self.tasks.add(task)
+            task.add_done_callback(self.tasks.discard)
+        elif method == "Target.detachedFromTarget":
+            child = params.get("sessionId")
+            self.sessions.discard(child)
+            for key in [k for k in self.contexts if k[0] == child]:
+                del self.contexts[key]
+
+    async def navigate(self, url: str, timeout: float = NAVIGATION_TIMEOUT):
+        """Navega y espera DOMContentLoaded del documento principal."""
+        self.frame_hint = None
+        loaded = asyncio.ensure_future(self.connection.wait_event(
+            "Page.domContentEventFired", {self.session_id}, timeout=timeout
+        ))
+        result = await self.send("Page.navigate", {"url": url})
+        if result.get("errorText"):
+            loaded.cancel()
+            raise CdpError(f"No se pudo abrir {url}: {result['errorText']}")
+        await loaded
+
+    async def evaluate(self, script: str, *args, session_id: str = None, context_id: int = None):
+        """
+        Ejecuta `script` (cuerpo de función con arguments y return, como
+        execute_script) y retorna su valor. Sin `context_id`, en el frame principal.
+        """
+        params = {
+            "expression": f"(function() {{{script}\n}}).apply(null, {json.dumps(list(args))})",
+            "returnByValue": True,
+            "awaitPromise": True,
+        }
+        if context_id is not None:
+            params["contextId"] = context_id
+        result = await self.send("Runtime.evaluate", params, session_id=session_id)
+        if result.get("exceptionDetails"):
+            details = result["exceptionDetails"]
+            raise CdpError(details.get("exception", {}).get("description") or details.get("text"))
+        return result.get("result", {}).get("value")
+
+    async def evaluate_frames(self, script: str, *args):
+        """
+        Ejecuta `script` en cada frame (empezando por el último que respondió)
+        hasta que uno retorne algo distinto de None.
+        """
+        candidates = list(self.contexts)
+        if self.frame_hint in self.contexts:
+            candidates.remove(self.frame_hint)
+            candidates.insert(0, self.frame_hint)
+        for session_id, context_id in candidates:
+            try:
+                value = await self.evaluate(script, *args, session_id=session_id, context_id=context_id)
+            except (CdpError, asyncio.TimeoutError):
+                continue
+            if value is not None:
+                self.frame_hint = (session_id, context_id)
+                return value
+        return None
+
+    async def probe(self, name: str, **options):
+        """Sonda de probes.py en el frame principal."""
+        return await self.evaluate(PROBE_JS, name, load_selectors(), options)
+
+    async def probe_frames(self, name: str, **options):
+        """Sonda del lab en el primer frame que la resuelva."""
+        return await self.evaluate_frames(PROBE_JS, name, load_selectors(), options)
+
+    async def fill(self, selector: str, text: str) -> bool:
+        """Enfoca el campo y escribe `text` como entrada de teclado real (Input.insertText)."""
+        if not await self.evaluate(FILL_JS, selector):
+            return False
+        await self.send("Input.insertText", {"text": text})
+        return True
+
+    async def click(self, selector: str) -> bool:
+        return bool(await self.evaluate(CLICK_JS, selector))
+
+    async def wait_event(self, method: str, predicate=None, timeout: float = None):
+        """Espera un evento de esta pestaña o de sus iframes."""
+        return await self.connection.wait_event(method, set(self.sessions), predicate, timeout)
+
+    async def watch_status(self) -> bool:
+        """Instala en el frame del lab el observador de #vmstatus que emite Runtime.bindingCalled."""
+        if self.frame_hint is None:
+            return False
+        session_id, context_id = self.frame_hint
+        try:
+            await self.send("Runtime.addBinding", {"name": STATUS_BINDING}, session_id=session_id)
+            return bool(await self.evaluate(WATCH_STATUS_JS, load_selectors()["lab"]["status"], STATUS_BINDING,
+                                            session_id=session_id, context_id=context_id))
+        except (CdpError, asyncio.TimeoutError):
+            return False
+
+    async def cookies(self) -> list:
+        result = await self.connection.send("Storage.getCookies", {"browserContextId": self.context_id})
+        return [{k: c[k] for k in COOKIE_FIELDS if k in c} for c in result.get("cookies", [])]
+
+    async def set_cookies(self, cookies: list):
+        params = []
+        for cookie in cookies:
+            cookie = {k: cookie[k] for k in COOKIE_FIELDS if k in cookie}
+            if cookie.get("expires", -1) <= 0:
+                cookie.pop("expires", None)
+            params.append(cookie)
+        await self.connection.send("Storage.setCookies", {"cookies": params, "browserContextId": self.context_id})
+
+    async def close(self):
+        self.connection.off(self._on_event)
+        for task in list(self.tasks):
+            task.cancel()
+        try:
+            await self.connection.send("Target.disposeBrowserContext", {"browserContextId": self.context_id})
+        except (CdpError, ConnectionError, asyncio.TimeoutError):
+            pass
+
+
+class CdpBrowser:
+    """Proceso de Chrome headless controlado por su WebSocket de DevTools."""
+
+    def __init__(self, process, user_data_dir, connection):
+        self.process = process
+        self.user_data_dir = user_data_dir
+        self.connection = connection
+
+    @classmethod
+    async def launch(cls):
+        from .chromedriver import find_chrome_binary
+        binary = find_chrome_binary()
+        if binary is None:
+            raise FileNotFoundError("No se encontró Chrome (define CHROME_PATH)")
+        user_data_dir = tempfile.mkdtemp(prefix="logawstudent-cdp-")
+        process = subprocess.Popen(
+            [binary, "--headless=new", "--remote-debugging-port=0", f"--user-data-dir={user_data_dir}",
+             "--no-sandbox", "--disable-dev-shm-usage", "--disable-gpu", "--disable-extensions",
+             "--no-first-run", "--no-default-browser-check", "about:blank"],
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        )
+        try:
+            url = await cls._devtools_url(process, user_data_dir)
+            connection = CdpConnection(await WebSocket.connect(url))
+        except BaseException:
+            process.kill()
+            shutil.rmtree(user_data_dir, ignore_errors=True)
+            raise
+        return cls(process, user_data_dir, connection)
+
+    @staticmethod
+    async def _devtools_url(process, user_data_dir) -> str:
+        """Lee el puerto y la ruta que Chrome escribe en DevToolsActivePort."""
+        port_file = os.path.join(user_data_dir, "DevToolsActivePort")
+        deadline = time.monotonic() + LAUNCH_TIMEOUT
+        while time.monotonic() < deadline:
+            if process.poll() is not None:
+                raise ConnectionError(f"Chrome terminó al arrancar (código {process.returncode})")
+            try:
+                with open(port_file) as f:
+                    lines = f.read().split()
+                if len(lines) >= 2:
+                    return f"ws://127.0.0.1:{lines[0]}{lines[1]}"
+            except OSError:
+                pass
+            await asyncio.sleep(0.05)
+        raise asyncio.TimeoutError("Chrome no abrió el puerto de DevTools a tiempo")
+
+    async def new_page(self, blocked_urls=()) -> CdpPage:
+        """Pestaña nueva en un contexto aislado (cookies y caché propias)."""
+        context = await self.connection.send("Target.createBrowserContext", {"disposeOnDetach": True})
+        target = await self.connection.send("Target.createTarget", {
+            "url": "about:blank", "browserContextId": context["browserContextId"]
+        })
+        attached = await self.connection.send("Target.attachToTarget", {
+            "targetId": target["targetId"], "flatten": True
+        })
+        page = CdpPage(self, attached["sessionId"], target["targetId"], context["browserContextId"])
+        await page.setup(blocked_urls)
+        return page
+
+    async def close(self):
+        try:
+            await self.connection.send("Browser.close", timeout=5)
+        except (CdpError, ConnectionError, asyncio.TimeoutError):
+            pass
+        await self.connection.close()
+        try:
+            self.process.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+        shutil.rmtree(self.user_data_dir, ignore_errors=True)
+
+
+async def until(scheduler: WaitScheduler, condition, limit=None):
+    """Versión asíncrona de WaitScheduler.until: `condition` es una corrutina."""
+    scheduler = scheduler.child(limit) if limit is not None else scheduler
+    while True:
+        try:
+            result = await condition()
+        except (CdpError, asyncio.TimeoutError):
+            result = None
+        if result or scheduler.expired:
+            return result
+        await asyncio.sleep(scheduler.interval())
+
+
+async def open_lab(page: CdpPage, lab_url: str) -> str:
+    """
+    Navega al lab y espera sus iframes.
+
+    Returns:
+        str: "ok", "login" si la sesión no es válida o "error"
+    """
+    log("Entrando al laboratorio...", "wait")
+    await page.navigate(lab_url)
+    scheduler = WaitScheduler(NAVIGATION_BUDGET, fast=0.25)
+
+    async def loaded():
+        state = await page.evaluate(PAGE_STATE_JS)
+        return state if state["frames"] or state["path"].startswith("/login") else None
+
+    state = await until(scheduler, loaded)
+    if not state:
+        log("La página del lab no cargó sus iframes a tiempo", "error")
+        return "error"
+    if state["path"].startswith("/login"):
+        return "login"
+    log("Página del lab cargada", "ok")
+    return "ok"
+
+
+async def login(page: CdpPage, email: str, password: str) -> bool:
+    """Login en Canvas con el formulario real, equivalente a auth.perform_login."""
+    scheduler = WaitScheduler(LOGIN_BUDGET)
+    selectors = load_selectors()["login"]
+    log("Abriendo página de login...", "wait")
+    with phase("login_page_load"):
+        await page.navigate(LOGIN_URL)
+
+    log("Ingresando credenciales...", "wait")
+    with phase("credential_submit"):
+        form = await until(scheduler, lambda: page.evaluate(
+            "return !!document.querySelector(arguments[0]);", selectors["email"]
+        ), limit=LOGIN_FORM_TIMEOUT)
+        if not form:
+            log("No se encontró el formulario de login", "error")
+            return False
+        await page.fill(selectors["email"], email)
+        await page.fill(selectors["password"], password)
+        await page.click(selectors["submit"])
+        scheduler.mark("submit")
+
+    log("Verificando resultado del login...", "wait")
+    with phase("login_verification"):
+        async def outcome():
+            return ((await page.probe("login_outcome", host=CANVAS_HOST)) or {}).get("outcome")
+        result = await until(scheduler, outcome, limit=LOGIN_TIMEOUT)
+
+    if result == "error":
+        log("Credenciales incorrectas. Verifica tu email y contraseña.", "error")
+        return False
+    state = await page.probe("auth_error", host=CANVAS_HOST)
+    if state and state["error"]:
+        log("Error de autenticación detectado después del login", "error")
+        return False
+    if result != "success":
+        log("No se pudo verificar el login completamente, pero continuando...", "info")
+    else:
+        log("Login exitoso - redirigido fuera de la página de login", "ok")
+    save_session(email, await page.cookies())
+    return True
+
+
+async def lab_status(page: CdpPage):
+    return ((await page.probe_frames("lab_status")) or {}).get("status") or None
+
+
+async def wait_until_ready(page: CdpPage, scheduler: WaitScheduler) -> bool:
+    """
+    Espera 'Ready' reaccionando a los eventos del observador de #vmstatus;
+    relee el estado cada STATUS_EVENT_WAIT por si el frame se recargó.
+    """
+    def is_ready(params):
+        return params.get("name") == STATUS_BINDING and "Ready" in params.get("payload", "")
+
+    while not scheduler.expired:
+        status = await lab_status(page)
+        if status and "Ready" in status:
+            break
+        if await page.watch_status():
+            event = await page.wait_event("Runtime.bindingCalled", is_ready,
+                                          timeout=scheduler.budget(STATUS_EVENT_WAIT))
+            if event:
+                break
+        else:
+            await asyncio.sleep(scheduler.interval())
+    else:
+        return False
+
+    if scheduler.marked == "start_lab":
+        record_ready_time(scheduler.since_mark())
+    return True
+
+
+async def manage_lab(page: CdpPage) -> bool:
+    """Lee el estado del lab, pulsa Start Lab si está detenido y espera 'Ready'."""
+    scheduler = WaitScheduler(LAB_BUDGET, fast=0.25)
+    log("Verificando estado del laboratorio...", "wait")
+    with phase("first_status_read"):
+        status = await until(scheduler, lambda: lab_status(page), limit=FIRST_READ_BUDGET)
+
+    if not status:
+        log("No se pudo detectar el estado del laboratorio", "error")
+        return False
+    if "Ready" in status:
+        log("Laboratorio ya está iniciado y listo", "ok")
+        return True
+    if "Terminated" in status:
+        log("Laboratorio detenido, intentando iniciarlo...", "wait")
+        with phase("start_lab_click"):
+            async def clicked():
+                return ((await page.probe_frames("click_start")) or {}).get("clicked")
+            if not await until(scheduler, clicked, limit=CLICK_BUDGET):
+                log("No se pudo iniciar el laboratorio", "error")
+                return False
+        log("Botón Start Lab clickeado", "ok")
+        scheduler.mark("start_lab", expected=typical_ready_time())
+    elif "Initializing" in status:
+        log("Laboratorio se está iniciando, esperando a que esté listo...", "wait")
+    else:
+        log(f"Estado desconocido detectado: {status}", "info")
+        return False
+
+    with phase("ready_wait"):
+        ready = await wait_until_ready(page, scheduler)
+    log("Laboratorio ya está iniciado y listo" if ready else "El laboratorio no pasó a 'Ready' en el tiempo esperado",
+        "ok" if ready else "error")
+    return ready
+
+
+async def collect_credentials(page: CdpPage, email: str, remaining=None):
+    """Abre 'AWS Details' y guarda las credenciales leídas del frame del lab."""
+    from .aws_creds import parse_credentials, save_credentials, has_keys, report_credentials
+    await page.probe_frames("show_details")
+    scheduler = WaitScheduler(CREDENTIALS_TIMEOUT)
+
+    async def found():
+        text = ((await page.probe_frames("credentials_text")) or {}).get("text") or ""
+        creds = parse_credentials(text)
+        return creds if has_keys(creds) else None
+
+    creds = await until(scheduler, found)
+    entry = save_credentials(email, creds, remaining) if creds else None
+    report_credentials(entry)
+    return entry
+
+
+async def run_account(browser: CdpBrowser, email: str, password: str, lab_url: str,
+                      blocked_urls=()) -> str:
+    """
+    Flujo completo de una cuenta en su propia pestaña.
+
+    Returns:
+        str: "ready", "auth" (login fallido) o "failed"
+    """
+    with log_context(account=email):
+        page = await browser.new_page(blocked_urls)
+        try:
+            cookies = load_session(email)
+            if cookies:
+                await page.set_cookies(cookies)
+                log("Sesión restaurada desde caché, omitiendo login", "ok")
+            opened = await open_lab(page, lab_url)
+            if opened == "login":
+                if cookies:
+                    log("La sesión guardada expiró, iniciando sesión de nuevo...", "wait")
+                    clear_session(email)
+                if not await login(page, email, password):
+                    return "auth"
+                opened = await open_lab(page, lab_url)
+            if opened != "ok" or not await manage_lab(page):
+                log("Error: No se pudo iniciar el laboratorio", "error")
+                clear_lab_state(email, lab_url)
+                return "failed"
+
+            log("Laboratorio iniciado exitosamente", "done")
+            remaining = ((await page.probe_frames("session_remaining")) or {}).get("seconds")
+            remaining = remaining if remaining is not None and remaining >= 0 else None
+            record_lab_state(email, lab_url, "Ready", remaining)
+            try:
+                await collect_credentials(page, email, remaining)
+            except (CdpError, asyncio.TimeoutError) as e:
+                log(f"No se pudieron leer las credenciales de AWS: {e}", "error")
+            return "ready"
+        finally:
+            await page.close()
+
+
+async def _run_accounts(accounts: list, timeout: float, workers: int = None) -> list:
+    """
+    Lanza un Chrome y procesa las cuentas en un solo event loop, con a lo
+    sumo `workers` pestañas a la vez (todas si es None). El `timeout` de
+    cada cuenta corre desde que obtiene su turno.
+
+    Returns:
+        list | None: Resultados por cuenta, o None si Chrome no pudo arrancar
+    """
+    from .intercept import InterceptionPolicy
+    try:
+        with phase("chrome_launch"):
+            browser = await CdpBrowser.launch()
+    except (OSError, ConnectionError, asyncio.TimeoutError) as e:
+        log(f"No se pudo iniciar Chrome por DevTools: {e}", "error")
+        return None
+
+    policy = InterceptionPolicy.load()
+    blocked = policy.url_patterns() if policy.mode != "off" else ()
+    slots = asyncio.Semaphore(workers or len(accounts) or 1)
+
+    async def one(account):
+        result = {"email": account["email"], "status": "failed", "seconds": 0.0, "error": None}
+        async with slots:
+            start = time.perf_counter()
+            try:
+                result["status"] = await asyncio.wait_for(
+                    run_account(browser, account["email"], account["password"], account["lab_url"], blocked),
+                    timeout
+                )
+            except asyncio.TimeoutError:
+                result["status"] = "timeout"
+            except Exception as e:
+                result.update(status="error", error=str(e))
+            result["seconds"] = time.perf_counter() - start
+        return result
+
+    try:
+        return await asyncio.gather(*(one(account) for account in accounts))
+    finally:
+        await browser.close()
+
+
+def launch_lab_cdp(email=None, password=None, lab_url=None, timeout: float = LOGIN_BUDGET + LAB_BUDGET + 60):
+    """
+    Lanza el laboratorio con el backend CDP.
+
+    Returns:
+        bool | None: True si el lab quedó listo, False si falló, o None si
+        Chrome no pudo arrancar por DevTools (para recurrir a Selenium)
+    """
+    if not (email and password and lab_url):
+        try:
+            creds = validate_credentials()
+        except ValueError as e:
+            log(f"Error de credenciales: {e}", "error")
+            return False
+        email, password = email or creds["EMAIL"], password or creds["PASSWORD"]
+        lab_url = lab_url or creds["LAB_URL"]
+
+    results = asyncio.run(_run_accounts([{"email": email, "password": password, "lab_url": lab_url}], timeout))
+    if results is None:
+        return None
+    if results[0]["status"] == "error":
+        log(f"Error inesperado: {results[0]['error']}", "error")
+    elif results[0]["status"] == "timeout":
+        log(f"Tiempo agotado: el laboratorio no quedó listo en {timeout:.0f} s", "error")
+    return results[0]["status"] == "ready"
+
+
+def run_batch_cdp(accounts: list, workers: int = 3, timeout: float = 300) -> list:
+    """
+    Procesa las cuentas concurrentemente con un solo Chrome y un solo event
+    loop (una pestaña y un contexto aislado por cuenta), con a lo sumo
+    `workers` cuentas en curso a la vez.
+
+    Returns:
+        list | None: Resultados con el mismo formato que batch.run_account, o
+        None si Chrome no pudo arrancar por DevTools (para recurrir a Selenium)
+    """
+    log(f"Procesando {len(accounts)} cuentas por DevTools en un solo navegador "
+        f"({workers} en paralelo)...", "wait")
+    return asyncio.run(_run_accounts(accounts, timeout, workers))
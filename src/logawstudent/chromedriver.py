@@ -0,0 +1,167 @@
+# src/logawstudent/chromedriver.py
+import hashlib
+import os
+import re
+import shutil
+import subprocess
+import sys
+import time
+from pathlib import Path
+from .utils import CONFIG_DIR, load_json, save_json
+
+DRIVER_CACHE_FILE = CONFIG_DIR / "chromedriver.json"
+
+# Ejecutables de Chrome a probar según el sistema operativo
+CHROME_COMMANDS = {
+    "linux": [
+        ["google-chrome", "--version"],
+        ["google-chrome-stable", "--version"],
+        ["chromium", "--version"],
+        ["chromium-browser", "--version"],
+    ],
+    "darwin": [
+        ["/Applications/Google Chrome.app/Contents/MacOS/Google Chrome", "--version"],
+        ["/Applications/Chromium.app/Contents/MacOS/Chromium", "--version"],
+    ],
+    "win32": [
+        ["reg", "query", r"HKEY_CURRENT_USER\Software\Google\Chrome\BLBeacon", "/v", "version"],
+        ["reg", "query", r"HKEY_LOCAL_MACHINE\Software\Google\Chrome\BLBeacon", "/v", "version"],
+    ],
+}
+
+# Ejecutables de Chrome para lanzarlo sin chromedriver (backend CDP)
+CHROME_BINARIES = {
+    "linux": ["google-chrome", "google-chrome-stable", "chromium", "chromium-browser"],
+    "darwin": [
+        "/Applications/Google Chrome.app/Contents/MacOS/Google Chrome",
+        "/Applications/Chromium.app/Contents/MacOS/Chromium",
+    ],
+    "win32": [
+        os.path.expandvars(r"%ProgramFiles%\Google\Chrome\Application\chrome.exe"),
+        os.path.expandvars(r"%ProgramFiles(x86)%\Google\Chrome\Application\chrome.exe"),
+        os.path.expandvars(r"%LocalAppData%\Google\Chrome\Application\chrome.exe"),
+    ],
+}
+
+_VERSION_RE = re.compile(r"(\d+)\.(\d+)\.(\d+)\.(\d+)")
+
+
+def detect_chrome_version():
+    """Detecta la versión local de Chrome sin usar la red; None si no se encuentra."""
+    platform = "linux" if sys.platform.startswith("linux") else sys.platform
+    for command in CHROME_COMMANDS.get(platform, []):
+        try:
+            result = subprocess.run(command, capture_output=True, text=True, timeout=5)
+        except (OSError, subprocess.SubprocessError):
+            continue
+        match = _VERSION_RE.search(result.stdout)
+        if match:
+            return match.group(0)
+    return None
+
+
+def find_chrome_binary():
+    """Ruta del ejecutable de Chrome (CHROME_PATH tiene prioridad); None si no se encuentra."""
+    pinned = os.environ.get("CHROME_PATH")
+    if pinned:
+        return pinned if Path(pinned).is_file() else None
+    platform = "linux" if sys.platform.startswith("linux") else sys.platform
+    for candidate in CHROME_BINARIES.get(platform, []):
+        path = shutil.which(candidate) or (candidate if Path(candidate).is_file() else None)
+        if path:
+            return path
+    return None
+
+
+def _major(version):
+    return version.split(".", 1)[0] if version else None
+
+
+def _sha256(path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _cached_driver(cache, chrome_version):
+    """Retorna la ruta cacheada si sigue siendo válida para la versión de Chrome."""
+    if not cache:
+        return None
+    path = cache.get("driver_path")
+    if not path or not Path(path).is_file():
+        return None
+    if chrome_version and _major(chrome_version) != _major(cache.get("chrome_version")):
+        return None
+    if _sha256(path) != cache.get("sha256"):
+        return None
+    return path
+
+
+def resolve_chromedriver() -> str:
+    """
+    Resuelve la ruta del chromedriver usando, en orden:
+    CHROMEDRIVER_PATH, la caché local y, solo si cambió la versión mayor de
+    Chrome (o no hay caché), ChromeDriverManager.
+
+    Returns:
+        str: Ruta al ejecutable de chromedriver
+    """
+    pinned = os.environ.get("CHROMEDRIVER_PATH")
+    if pinned:
+        if not Path(pinned).is_file():
+            raise FileNotFoundError(f"CHROMEDRIVER_PATH no existe: {pinned}")
+        return pinned
+
+    chrome_version = detect_chrome_version()
+    cache = load_json(DRIVER_CACHE_FILE)
+    path = _cached_driver(cache, chrome_version)
+    if path:
+        return path
+
+    from webdriver_manager.chrome import ChromeDriverManager
+
+    start = time.perf_counter()
+    try:
+        path = ChromeDriverManager().install()
+    except Exception:
+        # Sin red: usar el driver cacheado aunque no se pudo validar la versión
+        if cache and cache.get("driver_path") and Path(cache["driver_path"]).is_file():
+            return cache["driver_path"]
+        raise
+    install_seconds = time.perf_counter() - start
+
+    save_json(DRIVER_CACHE_FILE, {
+        "chrome_version": chrome_version,
+        "driver_path": path,
+        "sha256": _sha256(path),
+        "install_seconds": install_seconds,
+        "resolved_at": time.time(),
+    })
+    return path
+
+
+def driver_timings() -> dict:
+    """
+    Mide cuánto tarda resolver el driver con la caché frente al último
+    ChromeDriverManager().install() registrado.
+    """
+    cache = load_json(DRIVER_CACHE_FILE) or {}
+    start = time.perf_counter()
+    path = resolve_chromedriver()
+    resolve_seconds = time.perf_counter() - start
+    cache = load_json(DRIVER_CACHE_FILE) or cache
+    return {
+        "driver_path": path,
+        "chrome_version": cache.get("chrome_version"),
+        "pinned": bool(os.environ.get("CHROMEDRIVER_PATH")),
+        "resolve_seconds": resolve_seconds,
+        "install_seconds": cache.get("install_seconds"),
+    }
+
+
+def clear_driver_cache():
+    """Elimina la caché del chromedriver resuelto."""
+    if DRIVER_CACHE_FILE.exists():
+        DRIVER_CACHE_FILE.unlink()
@@ -1,12 +1,15 @@
 # src/logawstudent/cli.py
+import sys
+import time
 import typer
 from rich.console import Console
 from rich.panel import Panel
 from rich.table import Table
 from rich.text import Text
 from rich import box
-from .utils import set_env, unset_env, load_env, clear_env, update_env, get_credentials_status, get_env_file
-from .core import launch_lab
+from .utils import set_env, set_envs, unset_env, load_env, clear_env, update_env, update_envs, get_credentials_status, get_env_file
+from .session import clear_session
+from .logs import configure as configure_logs, flush as flush_logs, LEVELS as LOG_LEVELS
 
 console = Console()
 
@@ -17,8 +20,22 @@ app = typer.Typer(
 )
 
 @app.callback(invoke_without_command=True)
-def main(ctx: typer.Context):
+def main(
+    ctx: typer.Context,
+    quiet: bool = typer.Option(False, "--quiet", "-q", help="Muestra solo resultados finales y errores"),
+    log_json: str = typer.Option(None, "--log-json", help="Escribe los logs como líneas JSON en este archivo ('-' para stdout)"),
+    log_level: str = typer.Option(None, "--log-level", help=f"Nivel mínimo en consola: {', '.join(LOG_LEVELS)}")
+):
     """LogAWStudent - CLI para automatizar login y labs de AWS Academy"""
+    if log_level and log_level not in LOG_LEVELS:
+        console.print(Panel(f"❌ Nivel de log inválido. Usa: {', '.join(LOG_LEVELS)}", 
+                           title="❌ Error", border_style="red"))
+        raise typer.Exit(1)
+    if quiet or log_json or log_level:
+        configure_logs(quiet=quiet, json_path=log_json, level=log_level)
+    if log_json == "-":
+        # stdout queda solo para las líneas JSON
+        console.file = sys.stderr
     if ctx.invoked_subcommand is None:
         show_main_info()
 
@@ -100,6 +117,12 @@ def show_main_info():
         "• awstudent login     - Gestiona credenciales de login\n"
         "• awstudent url       - Configura URL del laboratorio\n"
         "• awstudent start     - Inicia el laboratorio automáticamente\n"
+        "• awstudent daemon    - Mantiene un navegador listo en segundo plano\n"
+        "• awstudent watch     - Mantiene el lab listo y extiende su sesión antes de que venza\n"
+        "• awstudent extend    - Extiende ahora la sesión del lab en ejecución\n"
+        "• awstudent driver    - Muestra la caché del chromedriver (--timings, --reset)\n"
+        "• awstudent browser-profile - Perfil persistente de Chrome (--prune, --reset)\n"
+        "• awstudent creds     - Credenciales de AWS y URL de la consola del lab\n"
         "• awstudent status    - Muestra estado de credenciales\n"
         "• awstudent clean     - Limpia credenciales específicas\n\n"
         "🧹 Opciones de limpieza:\n"
@@ -131,15 +154,17 @@ def login(
     if clean:
         if clean == "email":
             unset_env("EMAIL")
+            clear_session()
             console.print(Panel("🧹 Email eliminado.", 
                                title="🧹 Limpieza", border_style="yellow"))
         elif clean == "password":
             unset_env("PASSWORD")
+            clear_session()
             console.print(Panel("🧹 Password eliminada.", 
                                title="🧹 Limpieza", border_style="yellow"))
         elif clean == "all":
-            unset_env("EMAIL")
-            unset_env("PASSWORD")
+            unset_env("EMAIL", "PASSWORD")
+            clear_session()
             console.print(Panel("🧹 Todas las credenciales de login eliminadas.", 
                                title="🧹 Limpieza Completa", border_style="yellow"))
         else:
@@ -148,8 +173,8 @@ def login(
         return
     
     if delete:
-        unset_env("EMAIL")
-        unset_env("PASSWORD")
+        unset_env("EMAIL", "PASSWORD")
+        clear_session()
         console.print(Panel("🧹 Credenciales de login eliminadas.", 
                            title="🧹 Eliminado", border_style="yellow"))
         return
@@ -158,8 +183,8 @@ def login(
         try:
             email = typer.prompt("Ingrese su nuevo EMAIL")
             password = typer.prompt("Ingrese su nueva PASSWORD", hide_input=True)
-            update_env("EMAIL", email)
-            update_env("PASSWORD", password)
+            update_envs({"EMAIL": email, "PASSWORD": password})
+            clear_session()
             console.print(Panel("✅ Credenciales actualizadas exitosamente.", 
                                title="✅ Éxito", border_style="green"))
         except ValueError as e:
@@ -179,8 +204,8 @@ def login(
         
         email = typer.prompt("Ingrese su EMAIL")
         password = typer.prompt("Ingrese su PASSWORD", hide_input=True)
-        set_env("EMAIL", email)
-        set_env("PASSWORD", password)
+        set_envs({"EMAIL": email, "PASSWORD": password})
+        clear_session()
         console.print(Panel("✅ Credenciales guardadas exitosamente.", 
                            title="✅ Éxito", border_style="green"))
 
@@ -232,32 +257,381 @@ def url(
                                title="🔗 URL del Laboratorio", border_style="blue"))
 
 
+def start_batch(path, workers, timeout, shared_browser=False, engine="selenium"):
+    """Lanza los laboratorios de todas las cuentas de un CSV y muestra un resumen."""
+    from .batch import DEFAULT_WORKERS, load_accounts, run_batch
+    try:
+        accounts = load_accounts(path)
+    except (OSError, ValueError) as e:
+        console.print(Panel(f"❌ {e}", title="❌ Error", border_style="red"))
+        return
+    if not accounts:
+        console.print(Panel("⚠️  El CSV no contiene cuentas.", 
+                           title="⚠️  Lote Vacío", border_style="yellow"))
+        return
+
+    if shared_browser and workers is not None:
+        console.print(Panel("⚠️  --workers no aplica con --shared-browser: un solo Chrome atiende las cuentas de a una.", 
+                           title="⚠️  Lote", border_style="yellow"))
+    workers = workers or DEFAULT_WORKERS
+
+    console.print(Panel(f"🚀 Iniciando {len(accounts)} laboratorios...", 
+                       title="🚀 Lote", border_style="blue"))
+    results = None
+    if engine == "cdp":
+        from .cdp_engine import run_batch_cdp
+        results = run_batch_cdp(accounts, workers=workers, timeout=timeout)
+        if results is None:
+            flush_logs()
+            console.print(Panel("⚠️  El motor CDP no pudo arrancar Chrome, usando Selenium...", 
+                               title="⚠️  Lote", border_style="yellow"))
+    if results is None and shared_browser:
+        from .contexts import run_batch_shared
+        results = run_batch_shared(accounts, timeout=timeout)
+    elif results is None:
+        results = run_batch(accounts, workers=workers, timeout=timeout)
+
+    flush_logs()
+    labels = {"ready": "✅ Listo", "failed": "❌ Falló", "auth": "🔒 Login", 
+              "timeout": "⏱️  Timeout", "error": "❌ Error"}
+    table = Table(show_header=True, header_style="bold blue", box=box.ROUNDED)
+    table.add_column("Cuenta", style="cyan")
+    table.add_column("Resultado", justify="center")
+    table.add_column("Tiempo", justify="right")
+    table.add_column("Detalle", style="dim")
+    for result in results:
+        table.add_row(result["email"], labels.get(result["status"], result["status"]),
+                      f"{result['seconds']:.1f} s", result["error"] or "")
+    ready = sum(1 for r in results if r["status"] == "ready")
+    console.print(Panel(table, title=f"📊 Resumen del Lote ({ready}/{len(results)} listos)", 
+                       border_style="green" if ready == len(results) else "yellow"))
+
 @app.command()
 def start(
     force: bool = typer.Option(False, "--force", help="Fuerza el inicio sin verificar credenciales"),
-    status: bool = typer.Option(False, "--status", help="Muestra el estado antes de iniciar")
+    status: bool = typer.Option(False, "--status", help="Muestra el estado antes de iniciar"),
+    no_daemon: bool = typer.Option(False, "--no-daemon", help="No usa el daemon aunque esté activo"),
+    engine: str = typer.Option("selenium", "--engine", "--backend", help="Motor a usar: 'selenium', 'http' (sin navegador) o 'cdp' (DevTools con asyncio, sin chromedriver)"),
+    batch: str = typer.Option(None, "--batch", help="CSV con columnas email,password,lab_url para lanzar varias cuentas"),
+    workers: int = typer.Option(None, "--workers", min=1, help="Máximo de cuentas en paralelo con --batch (por defecto 3; no aplica con --shared-browser)"),
+    timeout: int = typer.Option(300, "--timeout", min=1, help="Tiempo máximo por cuenta en segundos con --batch"),
+    shared_browser: bool = typer.Option(False, "--shared-browser", help="Con --batch, usa un solo Chrome con un contexto aislado por cuenta"),
+    profile: bool = typer.Option(False, "--profile", help="Muestra una tabla con el tiempo y los comandos WebDriver de cada fase"),
+    trace_file: str = typer.Option(None, "--trace-file", help="Agrega las fases medidas como líneas JSON a este archivo"),
+    persist_profile: bool = typer.Option(False, "--persist-profile", help="Reutiliza un perfil de Chrome con caché de disco entre ejecuciones"),
+    refresh: bool = typer.Option(False, "--refresh", help="Verifica el lab aunque el último estado guardado sea 'Ready'"),
+    ready_by: str = typer.Option(None, "--ready-by", help="Espera y lanza a tiempo para que el lab esté listo a esta hora (HH:MM)")
 ):
     """Inicia el laboratorio automáticamente."""
     if status:
         show_credentials_status()
         return
     
+    if not (profile or trace_file):
+        run_start(force, no_daemon, engine, batch, workers, timeout, shared_browser, persist_profile, refresh, ready_by)
+        return
+    
+    # El perfilado mide el proceso local, así que no se delega al daemon
+    from .profiling import start_trace, stop_trace
+    start_trace()
+    try:
+        run_start(force, True, engine, batch, workers, timeout, shared_browser, persist_profile, refresh, ready_by)
+    finally:
+        tracer = stop_trace()
+        flush_logs()
+        if trace_file:
+            tracer.write_jsonl(trace_file)
+            console.print(f"📝 Trazas guardadas en {trace_file}", style="dim")
+        if profile:
+            show_profile(tracer)
+
+def show_profile(tracer):
+    """Muestra las fases registradas por el tracer en una tabla."""
+    flush_logs()
+    table = Table(show_header=True, header_style="bold blue", box=box.ROUNDED)
+    table.add_column("Fase", style="cyan")
+    table.add_column("Llamadas", justify="right")
+    table.add_column("Inicio", justify="right")
+    table.add_column("Fin", justify="right")
+    table.add_column("Duración", justify="right")
+    table.add_column("Comandos", justify="right")
+    table.add_column("Hilo", style="dim")
+    for row in tracer.summary():
+        table.add_row(row["phase"], str(row["calls"]), f"{row['start']:.2f} s", f"{row['end']:.2f} s",
+                      f"{row['seconds']:.2f} s", str(row["commands"]), row["thread"])
+    console.print(Panel(table, title="⏱️  Perfil de Ejecución", border_style="blue"))
+
+def run_start(force, no_daemon, engine, batch, workers, timeout, shared_browser,
+              persist_profile=False, refresh=False, ready_by=None):
+    """Ejecuta 'start' con las opciones ya validadas."""
+    if engine not in ("selenium", "http", "cdp"):
+        console.print(Panel("❌ Motor inválido. Usa: 'selenium', 'http' o 'cdp'", 
+                           title="❌ Error", border_style="red"))
+        return
+    
+    if batch:
+        if engine == "http":
+            console.print(Panel("❌ Motor inválido con --batch. Usa: 'selenium' o 'cdp'", 
+                               title="❌ Error", border_style="red"))
+            return
+        start_batch(batch, workers, timeout, shared_browser, engine)
+        return
+    
+    if ready_by:
+        from .prewarm import prewarm
+        console.print(Panel(f"⏰ Preparando el laboratorio para las {ready_by}...", 
+                           title="⏰ Pre-calentado", border_style="blue"))
+        prewarm(ready_by, engine, persist_profile)
+        flush_logs()
+        return
+    
+    if not refresh and show_cached_ready():
+        return
+    
+    # Si hay un daemon activo, delegarle el trabajo
+    if not no_daemon and engine == "selenium":
+        from .daemon import send_job
+        result = send_job("start")
+        if result is not None:
+            flush_logs()
+            if result.get("error"):
+                console.print(Panel(f"❌ {result['error']}", title="❌ Error", border_style="red"))
+            return
+    
+    # Selenium y los módulos del navegador se importan solo al lanzar
+    from .core import launch_lab
+    
     # Verificar credenciales antes de iniciar
     try:
         from .utils import validate_credentials
         validate_credentials()
         console.print(Panel("🚀 Iniciando laboratorio...", 
                            title="🚀 Iniciando", border_style="blue"))
-        launch_lab()
+        launch_lab(engine, persist_profile=persist_profile)
+        flush_logs()
     except ValueError as e:
         if force:
             console.print(Panel("⚠️  Iniciando sin credenciales completas...", 
                                title="⚠️  Modo Forzado", border_style="yellow"))
-            launch_lab()
+            launch_lab(engine, persist_profile=persist_profile)
+            flush_logs()
         else:
             console.print(Panel(f"❌ {e}\n💡 Usa 'awstudent login --status' para ver qué credenciales faltan", 
                                title="❌ Error", border_style="red"))
 
+def show_cached_ready() -> bool:
+    """Si el último estado guardado del lab sigue siendo 'Ready', lo muestra y retorna True."""
+    from .lab_state import cached_ready
+    env = load_env()
+    entry = cached_ready(env.get("EMAIL"), env.get("LAB_URL")) if env.get("EMAIL") else None
+    if not entry:
+        return False
+    minutes = int((time.time() - entry["observed_at"]) // 60)
+    lines = f"✅ El laboratorio ya está listo (verificado hace {minutes} min)"
+    if entry.get("session_ends_at"):
+        lines += f"\n⏳ La sesión termina a las {time.strftime('%H:%M', time.localtime(entry['session_ends_at']))}"
+    lines += "\n💡 Usa 'awstudent start --refresh' para verificarlo de nuevo"
+    console.print(Panel(lines, title="🚀 Laboratorio", border_style="green"))
+    return True
+
+@app.command()
+def daemon(
+    stop: bool = typer.Option(False, "--stop", help="Detiene el daemon en ejecución"),
+    status: bool = typer.Option(False, "--status", help="Muestra si el daemon está activo")
+):
+    """Mantiene un navegador autenticado en segundo plano para acelerar 'start'."""
+    from .daemon import send_job, serve, SOCKET_PATH
+    if stop:
+        if send_job("stop") is None:
+            console.print(Panel("ℹ️  No hay ningún daemon en ejecución.", 
+                               title="🛰️  Daemon", border_style="yellow"))
+        else:
+            console.print(Panel("🛑 Daemon detenido.", 
+                               title="🛰️  Daemon", border_style="green"))
+        return
+
+    if status:
+        result = send_job("ping")
+        if result is None:
+            console.print(Panel("💤 Daemon inactivo.", 
+                               title="🛰️  Daemon", border_style="yellow"))
+        else:
+            browser = "activo" if result.get("browser") else "no iniciado"
+            if result.get("busy"):
+                browser += " (ejecutando un trabajo)"
+            console.print(Panel(f"🟢 Daemon activo en {SOCKET_PATH}\n🌐 Navegador: {browser}", 
+                               title="🛰️  Daemon", border_style="green"))
+        return
+
+    try:
+        from .utils import validate_credentials
+        validate_credentials()
+    except ValueError as e:
+        console.print(Panel(f"❌ {e}\n💡 Usa 'awstudent login --status' para ver qué credenciales faltan", 
+                           title="❌ Error", border_style="red"))
+        return
+    serve()
+
+@app.command()
+def watch(
+    interval: int = typer.Option(5, "--interval", min=1, help="Minutos entre verificaciones con el lab listo"),
+    extend_below: int = typer.Option(15, "--extend-below", min=0, help="Extiende la sesión cuando le queden menos de estos minutos"),
+    persist_profile: bool = typer.Option(False, "--persist-profile", help="Reutiliza un perfil de Chrome con caché de disco entre ejecuciones")
+):
+    """Mantiene el laboratorio listo: extiende la sesión antes de que venza y relanza Chrome si se cae."""
+    from .utils import validate_credentials
+    try:
+        creds = validate_credentials()
+    except ValueError as e:
+        console.print(Panel(f"❌ {e}\n💡 Usa 'awstudent login --status' para ver qué credenciales faltan", 
+                           title="❌ Error", border_style="red"))
+        raise typer.Exit(1)
+
+    from .watch import watch_lab
+    console.print(Panel("👀 Vigilando el laboratorio. Ctrl+C para detener.", 
+                       title="👀 Watch", border_style="blue"))
+    ok = watch_lab(creds["EMAIL"], creds["PASSWORD"], creds["LAB_URL"], interval=interval * 60,
+                   extend_below=extend_below * 60, persist_profile=persist_profile)
+    flush_logs()
+    if not ok:
+        raise typer.Exit(1)
+
+@app.command()
+def extend(
+    below: int = typer.Option(None, "--below", min=0, help="Solo extiende si a la sesión le quedan menos de estos minutos"),
+    persist_profile: bool = typer.Option(False, "--persist-profile", help="Reutiliza un perfil de Chrome con caché de disco entre ejecuciones")
+):
+    """Extiende la sesión del laboratorio en ejecución (para extenderla periódicamente, usa 'watch')."""
+    from .utils import validate_credentials
+    try:
+        validate_credentials()
+    except ValueError as e:
+        console.print(Panel(f"❌ {e}\n💡 Usa 'awstudent login --status' para ver qué credenciales faltan", 
+                           title="❌ Error", border_style="red"))
+        raise typer.Exit(1)
+
+    from .core import extend_lab
+    console.print(Panel("⏳ Extendiendo la sesión del laboratorio...", 
+                       title="⏳ Extender", border_style="blue"))
+    ok = extend_lab(below=below * 60 if below is not None else None, persist_profile=persist_profile)
+    flush_logs()
+    if not ok:
+        raise typer.Exit(1)
+
+@app.command()
+def driver(
+    timings: bool = typer.Option(False, "--timings", help="Compara el tiempo de resolución con caché vs. descarga"),
+    reset: bool = typer.Option(False, "--reset", help="Borra la caché del chromedriver")
+):
+    """Muestra o reinicia la caché del chromedriver."""
+    from .chromedriver import clear_driver_cache, driver_timings, DRIVER_CACHE_FILE
+    from .utils import load_json
+    if reset:
+        clear_driver_cache()
+        console.print(Panel("🧹 Caché del chromedriver eliminada.", 
+                           title="🧹 Limpieza", border_style="yellow"))
+        return
+
+    if timings:
+        try:
+            info = driver_timings()
+        except Exception as e:
+            console.print(Panel(f"❌ {e}", title="❌ Error", border_style="red"))
+            return
+        table = Table(show_header=True, header_style="bold blue", box=box.ROUNDED)
+        table.add_column("Paso", style="cyan")
+        table.add_column("Tiempo", justify="right")
+        table.add_row("Resolución actual", f"{info['resolve_seconds'] * 1000:.1f} ms")
+        install = info["install_seconds"]
+        if install is not None and not info["pinned"]:
+            table.add_row("ChromeDriverManager().install()", f"{install * 1000:.1f} ms")
+            table.add_row("Ahorro por ejecución", f"{(install - info['resolve_seconds']) * 1000:.1f} ms")
+        console.print(Panel(table, title="⏱️  Tiempos del Chromedriver", border_style="blue"))
+        return
+
+    cache = load_json(DRIVER_CACHE_FILE) or {}
+    console.print(Panel(f"🌐 Chrome: {cache.get('chrome_version') or 'desconocido'}\n"
+                       f"🧩 Driver: {cache.get('driver_path') or 'sin caché'}\n"
+                       f"📁 Caché: {DRIVER_CACHE_FILE}", 
+                       title="🧩 Chromedriver", border_style="blue"))
+
+@app.command("browser-profile")
+def browser_profile(
+    reset: bool = typer.Option(False, "--reset", help="Borra el perfil persistente de Chrome"),
+    prune: bool = typer.Option(False, "--prune", help="Poda ahora los datos regenerables del perfil")
+):
+    """Muestra, poda o reinicia el perfil persistente usado con 'start --persist-profile'."""
+    from .browser_profile import (force_prune, profile_in_use, profile_size, reset_profile,
+                                  DISK_CACHE_SIZE, PROFILE_DIR, PROFILE_STATE_FILE)
+    from .utils import load_json
+    if reset:
+        if reset_profile():
+            console.print(Panel("🧹 Perfil persistente eliminado.", 
+                               title="🧹 Limpieza", border_style="yellow"))
+        else:
+            console.print(Panel("❌ El perfil está en uso por otra ejecución.", 
+                               title="❌ Error", border_style="red"))
+        return
+
+    if prune:
+        freed = force_prune()
+        if freed < 0:
+            console.print(Panel("❌ El perfil está en uso por otra ejecución.", 
+                               title="❌ Error", border_style="red"))
+        else:
+            console.print(Panel(f"🧹 Liberados {freed / 1024 / 1024:.1f} MB.", 
+                               title="🧹 Poda", border_style="green"))
+        return
+
+    state = load_json(PROFILE_STATE_FILE, {})
+    pruned_at = state.get("pruned_at")
+    pruned = time.strftime("%Y-%m-%d %H:%M", time.localtime(pruned_at)) if pruned_at else "nunca"
+    console.print(Panel(f"📁 Perfil: {PROFILE_DIR}\n"
+                       f"💾 Tamaño: {profile_size() / 1024 / 1024:.1f} MB "
+                       f"(caché máx. {DISK_CACHE_SIZE / 1024 / 1024:.0f} MB)\n"
+                       f"🧹 Última poda: {pruned}\n"
+                       f"🔒 En uso: {'sí' if profile_in_use() else 'no'}", 
+                       title="🌐 Perfil de Chrome", border_style="blue"))
+
+@app.command()
+def creds(
+    profile: str = typer.Option(None, "--profile", help="Escribe las credenciales cacheadas en este perfil de ~/.aws/credentials"),
+    export: bool = typer.Option(False, "--export", help="Imprime las variables AWS_* listas para 'eval'"),
+    clear: bool = typer.Option(False, "--clear", help="Olvida las credenciales de AWS cacheadas")
+):
+    """Muestra las credenciales de AWS del último lab iniciado sin abrir el navegador."""
+    from .aws_creds import clear_cached, load_cached, write_aws_profile
+    email = load_env().get("EMAIL")
+    if clear:
+        clear_cached(email)
+        console.print(Panel("🧹 Credenciales de AWS cacheadas eliminadas.", 
+                           title="🧹 Limpieza", border_style="yellow"))
+        return
+
+    entry = load_cached(email) if email else None
+    if not entry:
+        console.print(Panel("⚠️  No hay credenciales de AWS vigentes.\n"
+                           "💡 Usa 'awstudent start' para iniciar el laboratorio y capturarlas", 
+                           title="🔑 Credenciales de AWS", border_style="yellow"))
+        raise typer.Exit(1)
+
+    if export:
+        for key in ("aws_access_key_id", "aws_secret_access_key", "aws_session_token"):
+            if entry.get(key):
+                print(f"export {key.upper()}={entry[key]}")
+        return
+
+    if profile:
+        write_aws_profile(entry, profile)
+        entry["profile"] = profile
+    expires = time.strftime("%H:%M", time.localtime(entry["expires_at"]))
+    minutes = int((entry["expires_at"] - time.time()) // 60)
+    console.print(Panel(f"👤 Perfil: {entry['profile']} (usa --profile {entry['profile']} con aws)\n"
+                       f"🔑 Access key: {entry.get('aws_access_key_id') or 'no capturada'}\n"
+                       f"⏳ Vence: {expires} (en {minutes} min)\n"
+                       f"🌐 Consola: {entry.get('console_url') or 'no capturada'}", 
+                       title="🔑 Credenciales de AWS", border_style="green"))
+
 @app.command()
 def status(
     verbose: bool = typer.Option(False, "--verbose", help="Muestra información detallada"),
@@ -287,11 +661,12 @@ def clean(
                 console.print("Operación cancelada.", style="yellow")
                 return
         clear_env()
+        clear_session()
         console.print(Panel("🧹 Todas las credenciales han sido eliminadas.", 
                            title="🧹 Limpieza Completa", border_style="yellow"))
     elif login:
-        unset_env("EMAIL")
-        unset_env("PASSWORD")
+        unset_env("EMAIL", "PASSWORD")
+        clear_session()
         console.print(Panel("🧹 Credenciales de login eliminadas.", 
                            title="🧹 Limpieza de Login", border_style="yellow"))
     elif url:
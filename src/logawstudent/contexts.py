@@ -0,0 +1,179 @@
+# src/logawstudent/contexts.py
+import time
+from selenium.webdriver.chrome.webdriver import WebDriver
+from .auth import (authenticate_user, block_heavy_resources, session_expired, relogin, setup_driver,
+                   quit_driver)
+from .logs import log, log_context
+from .lab import check_lab_status, get_frame_locator, kick_lab, navigate_to_lab
+from .lab_state import clear_lab_state
+from .core import finish_ready_lab, log_interception_stats
+
+
+def create_context(driver: WebDriver) -> tuple[str, str]:
+    """
+    Crea un contexto de navegador aislado (cookies propias) con una pestaña.
+
+    Returns:
+        tuple: (browser_context_id, window_handle) de la nueva pestaña
+    """
+    before = set(driver.window_handles)
+    context_id = driver.execute_cdp_cmd("Target.createBrowserContext", {})["browserContextId"]
+    target_id = driver.execute_cdp_cmd(
+        "Target.createTarget", {"url": "about:blank", "browserContextId": context_id}
+    )["targetId"]
+
+    # chromedriver usa el targetId como window handle; si no, tomar la pestaña nueva
+    handles = driver.window_handles
+    if target_id in handles:
+        return context_id, target_id
+    new_handles = [h for h in handles if h not in before]
+    return context_id, new_handles[0]
+
+
+def switch_to_context(driver: WebDriver, handle: str):
+    """Pasa a la pestaña de un contexto y descarta el frame del lab cacheado."""
+    driver.switch_to.window(handle)
+    get_frame_locator(driver).reset()
+
+
+def dispose_context(driver: WebDriver, context_id: str, home_handle: str):
+    """Cierra un contexto y todas sus pestañas, volviendo a la pestaña principal."""
+    try:
+        driver.switch_to.window(home_handle)
+        driver.execute_cdp_cmd("Target.disposeBrowserContext", {"browserContextId": context_id})
+    except Exception:
+        pass
+
+
+def _open_account(driver: WebDriver, account: dict, deadline: float):
+    """
+    Autentica la cuenta en su contexto y deja el lab arrancando. Cada etapa
+    empieza solo si queda tiempo hasta `deadline` (perf_counter) y sus cargas
+    de página no pueden durar más que lo que queda.
+    """
+    def time_left() -> bool:
+        remaining = deadline - time.perf_counter()
+        if remaining <= 0:
+            return False
+        driver.set_page_load_timeout(max(1, remaining))
+        return True
+
+    if not time_left():
+        return "timeout"
+    driver, success = authenticate_user(account["email"], account["password"], driver,
+                                        lab_url=account["lab_url"])
+    if not time_left():
+        return "timeout"
+    if not success:
+        return "auth"
+
+    navigated = navigate_to_lab(driver, account["lab_url"])
+    if not navigated and time_left() and session_expired(driver):
+        if relogin(driver, account["email"], account["password"]) and time_left():
+            navigated = navigate_to_lab(driver, account["lab_url"])
+    if not time_left():
+        return "timeout"
+    if not navigated:
+        return None
+    return kick_lab(driver)
+
+
+def run_batch_shared(accounts: list, timeout: float = 300, poll_interval: float = 2) -> list:
+    """
+    Procesa varias cuentas con un único Chrome, una por contexto aislado.
+    Primero deja todos los labs arrancando y luego revisa en ronda los que
+    aún no están listos, así las esperas de 'Initializing' se solapan. Los
+    comandos WebDriver van de a uno, así que no hay límite de `workers`.
+
+    Returns:
+        list: Resultados con el mismo formato que batch.run_account
+    """
+    results = [
+        {"email": a["email"], "status": "failed", "seconds": 0.0, "error": None}
+        for a in accounts
+    ]
+    pending = {}
+    starts = {}
+    driver = setup_driver()
+    home_handle = driver.current_window_handle
+    log(f"Procesando {len(accounts)} cuentas en un solo navegador...", "wait")
+
+    def finish(index, ready):
+        # Mismos pasos que core.run_lab, en el contexto activo de la cuenta
+        account = accounts[index]
+        with log_context(account=account["email"]):
+            try:
+                if ready:
+                    finish_ready_lab(driver, account["email"], account["lab_url"])
+                else:
+                    clear_lab_state(account["email"], account["lab_url"])
+            except Exception as e:
+                log(f"No se pudo registrar el estado del laboratorio: {e}", "error")
+
+    try:
+        for index, account in enumerate(accounts):
+            starts[index] = time.perf_counter()
+            context_id = None
+            try:
+                driver.switch_to.window(home_handle)
+                context_id, handle = create_context(driver)
+                switch_to_context(driver, handle)
+                block_heavy_resources(driver)
+                with log_context(account=account["email"]):
+                    status = _open_account(driver, account, starts[index] + timeout)
+            except Exception as e:
+                if time.perf_counter() - starts[index] > timeout:
+                    status = "timeout"
+                else:
+                    results[index].update(status="error", error=str(e))
+                    status = None
+
+            results[index]["seconds"] = time.perf_counter() - starts[index]
+            if status == "Initializing":
+                pending[index] = (context_id, handle)
+                continue
+            if status == "Ready":
+                results[index]["status"] = "ready"
+                finish(index, True)
+            elif status == "auth":
+                results[index]["status"] = "auth"
+            else:
+                if status == "timeout":
+                    results[index]["status"] = "timeout"
+                    log(f"{account['email']}: tiempo agotado", "error")
+                finish(index, False)
+            if context_id:
+                dispose_context(driver, context_id, home_handle)
+
+        while pending:
+            for index, (context_id, handle) in list(pending.items()):
+                result = results[index]
+                try:
+                    switch_to_context(driver, handle)
+                    status = check_lab_status(driver, timeout=1)
+                except Exception as e:
+                    result.update(status="error", error=str(e))
+                    status = None
+
+                result["seconds"] = time.perf_counter() - starts[index]
+                if status and "Ready" in status:
+                    result["status"] = "ready"
+                    log(f"{accounts[index]['email']}: laboratorio listo", "ok")
+                    finish(index, True)
+                elif result["status"] == "error":
+                    finish(index, False)
+                elif result["seconds"] > timeout:
+                    result["status"] = "timeout"
+                    log(f"{accounts[index]['email']}: tiempo agotado", "error")
+                    finish(index, False)
+                else:
+                    continue
+                dispose_context(driver, context_id, home_handle)
+                del pending[index]
+            if pending:
+                time.sleep(poll_interval)
+        log_interception_stats(driver)
+    finally:
+        quit_driver(driver)
+
+    return results
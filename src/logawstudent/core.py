@@ -1,36 +1,244 @@
 # src/logawstudent/core.py
 import concurrent.futures
-from .auth import authenticate_user, log
-from .lab import process_lab
+import socket
+from urllib.parse import urlparse
+from .auth import authenticate_user, session_expired, relogin, setup_driver, quit_driver, LAB_FRAME_ORIGINS
+from .logs import log
+from .lab import process_lab, read_session_remaining, navigate_to_lab, check_lab_status, extend_session
+from .lab_state import record_lab_state, clear_lab_state
+from .intercept import interception_stats
+from .aws_creds import watch_credentials, collect_credentials, report_credentials
+from .utils import validate_credentials, CANVAS_URL
+from .profiling import phase
 
-def launch_lab():
+
+def warm_dns(urls):
+    """Resuelve los hosts de `urls` para dejar caliente la caché DNS del sistema."""
+    hosts = {urlparse(url).hostname for url in urls if url}
+    for host in hosts - {None}:
+        try:
+            socket.getaddrinfo(host, 443, proto=socket.IPPROTO_TCP)
+        except OSError:
+            pass
+
+
+def resolve_account(email=None, lab_url=None):
+    """Completa email y lab_url con los de .env cuando no se indicaron."""
+    if email is None or lab_url is None:
+        try:
+            creds = validate_credentials()
+            email, lab_url = email or creds["EMAIL"], lab_url or creds["LAB_URL"]
+        except ValueError:
+            pass
+    return email, lab_url
+
+
+def run_lab(driver, lab_url=None, email=None, password=None) -> bool:
+    """
+    Procesa el laboratorio con un driver ya autenticado, sin cerrarlo.
+    Si la sesión restaurada expiró, repite el login y reintenta una vez.
+
+    Args:
+        driver: WebDriver autenticado
+        lab_url, email, password: Datos de la cuenta (por defecto, los de .env)
+
+    Returns:
+        bool: True si el lab está listo, False en caso contrario
+    """
+    email, lab_url = resolve_account(email, lab_url)
+    capture = watch_credentials(driver)
+    lab_success = process_lab(driver, lab_url)
+
+    if not lab_success and session_expired(driver):
+        if relogin(driver, email, password):
+            lab_success = process_lab(driver, lab_url)
+
+    if lab_success:
+        log("Laboratorio iniciado exitosamente", "done")
+        finish_ready_lab(driver, email, lab_url, capture)
+    else:
+        log("Error: No se pudo iniciar el laboratorio", "error")
+        if email:
+            clear_lab_state(email, lab_url)
+    log_interception_stats(driver)
+    return lab_success
+
+
+def finish_ready_lab(driver, email=None, lab_url=None, capture=None):
+    """Con el lab ya listo, registra el estado 'Ready' y guarda las credenciales de AWS."""
+    remaining = read_session_remaining(driver)
+    if email:
+        record_lab_state(email, lab_url, "Ready", remaining)
+    capture_aws_credentials(driver, email, capture, remaining)
+
+
+def capture_aws_credentials(driver, email=None, capture=None, remaining=None):
+    """Guarda las credenciales de AWS del lab listo y muestra la URL de la consola."""
+    if email is None:
+        return None
+    try:
+        entry = collect_credentials(driver, email, capture, remaining=remaining)
+    except Exception as e:
+        log(f"No se pudieron leer las credenciales de AWS: {e}", "error")
+        return None
+    report_credentials(entry)
+    return entry
+
+
+def log_interception_stats(driver):
+    """Muestra las peticiones bloqueadas y permitidas desde el último reporte."""
+    stats = interception_stats(driver)
+    if not stats:
+        return
+    reasons = ", ".join(f"{k}: {v}" for k, v in sorted(stats["blocked_by"].items()))
+    log(f"Peticiones bloqueadas: {stats['blocked']}" + (f" ({reasons})" if reasons else "")
+        + f" · permitidas: {stats['allowed']} ({stats['allowed_bytes'] / 1024:.0f} KB)", "info")
+
+
+def launch_lab(engine="selenium", email=None, password=None, lab_url=None,
+               persist_profile=False) -> bool:
     """
     Lanza el laboratorio automáticamente usando módulos separados.
-    Requiere que EMAIL, PASSWORD y LAB_URL estén configurados en .env.
+    Requiere que EMAIL, PASSWORD y LAB_URL estén configurados en .env,
+    salvo que se pasen como argumentos.
+
+    Args:
+        engine: "selenium", "http" o "cdp" (DevTools sin chromedriver); los
+            motores HTTP y CDP recurren a Selenium si no pueden completar el
+            flujo o arrancar Chrome
+        email, password, lab_url: Datos de la cuenta (por defecto, los de .env)
+        persist_profile: Reutiliza el perfil de Chrome (y su caché) entre ejecuciones
+
+    Returns:
+        bool: True si el lab quedó listo
     """
+    if engine == "cdp":
+        from .cdp_engine import launch_lab_cdp
+        result = launch_lab_cdp(email, password, lab_url)
+        if result is not None:
+            return result
+        log("El motor CDP no pudo arrancar Chrome, usando Selenium...", "info")
+
+    if engine == "http":
+        from .http_engine import launch_lab_http
+        result = launch_lab_http(email, password, lab_url)
+        if result is not None:
+            account, url = resolve_account(email, lab_url)
+            if result:
+                log("Laboratorio iniciado exitosamente", "done")
+                if account:
+                    record_lab_state(account, url, "Ready")
+            else:
+                log("Error: No se pudo iniciar el laboratorio", "error")
+            return result
+        log("El motor HTTP no pudo completar el flujo, usando Selenium...", "info")
+
+    # Chrome arranca en segundo plano mientras se validan las credenciales
+    # y se resuelven los DNS de Canvas y del lab
+    pipeline = concurrent.futures.ThreadPoolExecutor(max_workers=2, thread_name_prefix="pipeline")
+    driver_future = pipeline.submit(setup_driver, persist_profile)
     driver = None
     
     try:
-        # Autenticar usuario
-        driver, auth_success = authenticate_user()
+        with phase("credential_check"):
+            if not (email and password and lab_url):
+                try:
+                    creds = validate_credentials()
+                except ValueError as e:
+                    log(f"Error de credenciales: {e}", "error")
+                    log("Usa 'awstudent login' y 'awstudent url --set' para configurar", "info")
+                    return False
+                email, password = email or creds["EMAIL"], password or creds["PASSWORD"]
+                lab_url = lab_url or creds["LAB_URL"]
+
+        pipeline.submit(_traced_warm_dns, (CANVAS_URL, lab_url) + LAB_FRAME_ORIGINS)
+
+        with phase("driver_wait"):
+            driver = driver_future.result()
+
+        # Autenticar usuario; si hace falta login, el lab empieza a cargar al confirmarse
+        driver, auth_success = authenticate_user(email, password, driver, lab_url=lab_url)
         if not auth_success or not driver:
             log("No se pudo autenticar. Deteniendo ejecución.", "error")
-            return
+            return False
         
         # Solo continuar si la autenticación fue exitosa
         log(" Autenticación exitosa. Procediendo con el laboratorio...", "ok")
         
         # Procesar laboratorio
-        lab_success = process_lab(driver)
-        
-        if lab_success:
-            log("Laboratorio iniciado exitosamente", "done")
+        return run_lab(driver, lab_url, email, password)
+
+    except Exception as e:
+        log(f"Error inesperado: {e}", "error")
+        return False
+
+    finally:
+        pipeline.shutdown(wait=False)
+        if driver is None:
+            try:
+                driver = driver_future.result()
+            except Exception:
+                driver = None
+        if driver:
+            quit_driver(driver)
+
+
+def extend_lab(email=None, password=None, lab_url=None, below=None, persist_profile=False) -> bool:
+    """
+    Extiende la sesión de un lab en ejecución para que no llegue a Terminated.
+
+    Args:
+        email, password, lab_url: Datos de la cuenta (por defecto, los de .env)
+        below: Solo extiende si quedan menos de estos segundos (None: siempre)
+        persist_profile: Reutiliza el perfil de Chrome (y su caché) entre ejecuciones
+
+    Returns:
+        bool: True si la sesión quedó extendida o no hacía falta extenderla
+    """
+    if not (email and password and lab_url):
+        try:
+            creds = validate_credentials()
+        except ValueError as e:
+            log(f"Error de credenciales: {e}", "error")
+            return False
+        email, password = email or creds["EMAIL"], password or creds["PASSWORD"]
+        lab_url = lab_url or creds["LAB_URL"]
+
+    driver = None
+    try:
+        driver, auth_success = authenticate_user(email, password, persist_profile=persist_profile,
+                                                 lab_url=lab_url)
+        if not auth_success:
+            log("No se pudo autenticar. Deteniendo ejecución.", "error")
+            return False
+
+        opened = navigate_to_lab(driver, lab_url)
+        if not opened and session_expired(driver) and relogin(driver, email, password):
+            opened = navigate_to_lab(driver, lab_url)
+        status = check_lab_status(driver) if opened else None
+        if not status or "Ready" not in status:
+            log(f"El laboratorio no está en ejecución ({status or 'desconocido'}); usa 'awstudent start'", "error")
+            return False
+
+        remaining = read_session_remaining(driver)
+        if below is not None and remaining is not None and remaining > below:
+            log(f"A la sesión le quedan {remaining // 60} min, no hace falta extenderla", "ok")
         else:
-            log("Error: No se pudo iniciar el laboratorio", "error")
+            remaining = extend_session(driver, lab_url)
+            if remaining is None:
+                return False
+        record_lab_state(email, lab_url, "Ready", remaining)
+        return True
 
     except Exception as e:
         log(f"Error inesperado: {e}", "error")
+        return False
 
     finally:
         if driver:
-            driver.quit()
+            quit_driver(driver)
+
+
+def _traced_warm_dns(urls):
+    with phase("dns_warmup"):
+        warm_dns(urls)
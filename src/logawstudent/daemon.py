@@ -0,0 +1,214 @@
+# src/logawstudent/daemon.py
+import json
+import os
+import socket
+import socketserver
+import threading
+import time
+from .utils import CONFIG_DIR
+from .logs import log, emit, log_context, add_sink, remove_sink
+
+# auth, lab y core (Selenium) se importan solo en el lado del servidor para que
+# los clientes ligeros (start, daemon --status/--stop) arranquen rápido.
+
+SOCKET_PATH = CONFIG_DIR / "daemon.sock"
+
+
+class _JobSink:
+    """Destino de logs que reenvía cada registro al cliente del trabajo en curso."""
+
+    level = 0
+
+    def __init__(self, wfile):
+        self.wfile = wfile
+
+    def write(self, record):
+        if not record.get("via"):
+            _send(self.wfile, {"record": record})
+
+    def flush(self):
+        pass
+
+
+def _send(wfile, message):
+    """Envía un mensaje JSON por línea; ignora clientes desconectados."""
+    try:
+        wfile.write((json.dumps(message) + "\n").encode())
+        wfile.flush()
+    except OSError:
+        pass
+
+
+class _JobHandler(socketserver.StreamRequestHandler):
+    """
+    Atiende un trabajo por conexión: {"cmd": "start" | "ping" | "stop"}. Cada
+    conexión tiene su hilo, así ping y stop responden durante un 'start'.
+    """
+
+    def handle(self):
+        try:
+            request = json.loads(self.rfile.readline() or b"{}")
+        except ValueError:
+            request = {}
+        self.server.daemon_state.dispatch(request, self.wfile)
+
+
+class DaemonState:
+    """Mantiene un único WebDriver autenticado entre invocaciones del CLI."""
+
+    def __init__(self):
+        self.driver = None
+        self.lock = threading.Lock()
+        self.server = None
+
+    def _driver_alive(self) -> bool:
+        if not self.driver:
+            return False
+        try:
+            self.driver.current_url
+            return True
+        except Exception:
+            return False
+
+    def ensure_driver(self):
+        """Retorna el driver vivo y autenticado, relanzando Chrome si murió."""
+        if self._driver_alive():
+            return self.driver
+        from .auth import authenticate_user, quit_driver
+        self.shutdown_driver()
+        driver, success = authenticate_user()
+        if not success:
+            if driver:
+                quit_driver(driver)
+            return None
+        self.driver = driver
+        return driver
+
+    def shutdown_driver(self):
+        if self.driver:
+            from .auth import quit_driver
+            try:
+                quit_driver(self.driver)
+            except Exception:
+                pass
+            self.driver = None
+
+    def dispatch(self, request, wfile):
+        cmd = request.get("cmd")
+        if cmd == "ping":
+            # Con un trabajo en curso no se toca el driver (lo está usando otro hilo)
+            if self.lock.acquire(blocking=False):
+                try:
+                    _send(wfile, {"done": True, "ok": True, "browser": self._driver_alive(), "busy": False})
+                finally:
+                    self.lock.release()
+            else:
+                _send(wfile, {"done": True, "ok": True, "browser": self.driver is not None, "busy": True})
+        elif cmd == "stop":
+            _send(wfile, {"done": True, "ok": True})
+            threading.Thread(target=self.server.shutdown, daemon=True).start()
+        elif cmd == "start":
+            _send(wfile, {"done": True, "ok": self._run_job(request, wfile)})
+        else:
+            _send(wfile, {"done": True, "ok": False, "error": f"Comando desconocido: {cmd}"})
+
+    def _run_job(self, request, wfile) -> bool:
+        """Ejecuta el flujo del lab reenviando sus logs al cliente."""
+        from .core import run_lab
+        sink = _JobSink(wfile)
+        if not self.lock.acquire(blocking=False):
+            _send(wfile, {"record": {"ts": round(time.time(), 3), "level": "wait", "msg": "Esperando a que termine el trabajo en curso..."}})
+            self.lock.acquire()
+        with log_context(job=request.get("cmd")):
+            add_sink(sink)
+            try:
+                driver = self.ensure_driver()
+                if not driver:
+                    log("No se pudo autenticar. Deteniendo ejecución.", "error")
+                    return False
+                return run_lab(driver)
+            except Exception as e:
+                log(f"Error inesperado: {e}", "error")
+                self.shutdown_driver()
+                return False
+            finally:
+                remove_sink(sink)
+                self.lock.release()
+
+
+def _connect():
+    """Abre una conexión al daemon o retorna None si no está corriendo."""
+    if not hasattr(socket, "AF_UNIX") or not SOCKET_PATH.exists():
+        return None
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(str(SOCKET_PATH))
+    except OSError:
+        sock.close()
+        return None
+    return sock
+
+
+def send_job(cmd: str):
+    """
+    Envía un trabajo al daemon y reemite sus registros en los destinos de
+    log locales (consola, --quiet, --log-json).
+
+    Returns:
+        dict | None: Mensaje final del daemon, o None si no hay daemon activo
+    """
+    sock = _connect()
+    if sock is None:
+        return None
+
+    request = {"cmd": cmd}
+    with sock, sock.makefile("rwb") as conn:
+        conn.write((json.dumps(request) + "\n").encode())
+        conn.flush()
+        for raw in conn:
+            message = json.loads(raw)
+            if "record" in message:
+                emit(message["record"], via="daemon")
+            elif message.get("done"):
+                return message
+    return {"done": True, "ok": False, "error": "El daemon cerró la conexión"}
+
+
+def serve():
+    """Arranca el daemon en primer plano hasta recibir 'stop' o Ctrl+C."""
+    if _connect() is not None:
+        log("Ya hay un daemon en ejecución", "error")
+        return False
+    if SOCKET_PATH.exists():
+        SOCKET_PATH.unlink()
+    SOCKET_PATH.parent.mkdir(parents=True, exist_ok=True)
+
+    state = DaemonState()
+    # El socket nace con permisos 0600: sin ventana para otros usuarios locales
+    previous_umask = os.umask(0o077)
+    try:
+        server = socketserver.ThreadingUnixStreamServer(str(SOCKET_PATH), _JobHandler)
+    finally:
+        os.umask(previous_umask)
+    server.daemon_threads = True
+    server.daemon_state = state
+    state.server = server
+
+    log("Preparando navegador...", "wait")
+    with state.lock:
+        state.ensure_driver()
+    log(f"Daemon escuchando en {SOCKET_PATH}", "ok")
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        # Un trabajo en curso termina antes de cerrar su navegador
+        with state.lock:
+            state.shutdown_driver()
+        if SOCKET_PATH.exists():
+            SOCKET_PATH.unlink()
+        log("Daemon detenido", "done")
+    return True
@@ -0,0 +1,289 @@
+# src/logawstudent/http_engine.py
+import http.cookiejar
+import urllib.error
+import urllib.parse
+import urllib.request
+from html.parser import HTMLParser
+from .utils import validate_credentials, CANVAS_URL
+from .logs import log
+from .schedule import WaitScheduler, record_ready_time, typical_ready_time
+
+
+LOGIN_URL = f"{CANVAS_URL}/login/canvas"
+CANVAS_HOST = urllib.parse.urlparse(CANVAS_URL).netloc
+USER_AGENT = (
+    "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 "
+    "(KHTML, like Gecko) Chrome/120.0 Safari/537.36"
+)
+
+# Saltos máximos (formularios LTI / iframes) hasta llegar al frame del lab
+MAX_LTI_HOPS = 5
+
+# Mismo presupuesto que el backend Selenium (lab.py); cada sondeo es una
+# petición completa de la página, así que el intervalo mínimo es mayor
+LAB_BUDGET = 240
+LAB_POLL_FAST = 1.0
+
+
+class _PageParser(HTMLParser):
+    """Extrae de una página los elementos con id, formularios e iframes."""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.elements = {}
+        self.forms = []
+        self.iframes = []
+        self.classes = set()
+        self._form = None
+
+    def handle_starttag(self, tag, attrs):
+        attrs = {k: v or "" for k, v in attrs}
+        self.classes.update(attrs.get("class", "").split())
+
+        if tag == "form":
+            self._form = {"attrs": attrs, "inputs": {}}
+            self.forms.append(self._form)
+        elif tag in ("input", "button", "textarea", "select") and self._form is not None:
+            name = attrs.get("name")
+            unchecked = attrs.get("type") in ("checkbox", "radio") and "checked" not in attrs
+            if name and not unchecked and tag != "button":
+                self._form["inputs"][name] = attrs.get("value", "")
+        elif tag == "iframe":
+            self.iframes.append(attrs)
+
+        if "id" in attrs:
+            self.elements.setdefault(attrs["id"], {"tag": tag, "attrs": attrs, "form": self._form})
+
+    def handle_endtag(self, tag):
+        if tag == "form":
+            self._form = None
+
+
+class Page:
+    """Respuesta HTTP ya parseada."""
+
+    def __init__(self, url, status, html):
+        self.url = url
+        self.status = status
+        parser = _PageParser()
+        parser.feed(html)
+        self.elements = parser.elements
+        self.forms = parser.forms
+        self.iframes = parser.iframes
+        self.classes = parser.classes
+
+    def form_with(self, field):
+        """Retorna el primer formulario que contiene el campo indicado."""
+        for form in self.forms:
+            if field in form["inputs"]:
+                return form
+        return None
+
+    @property
+    def has_lab_controls(self) -> bool:
+        return any(key in self.elements for key in ("vmBtn", "vmstatus", "launchclabsbtn"))
+
+    def lab_status(self):
+        """Lee el estado del lab desde #vmstatus (aria-label, title o class)."""
+        element = self.elements.get("vmstatus")
+        if not element:
+            return None
+        attrs = element["attrs"]
+        status = attrs.get("aria-label") or attrs.get("title") or attrs.get("class")
+        return status.strip() if status else None
+
+
+class HttpSession:
+    """Sesión HTTP con cookies persistentes entre peticiones."""
+
+    def __init__(self, timeout=15):
+        self.timeout = timeout
+        self.cookies = http.cookiejar.CookieJar()
+        self.opener = urllib.request.build_opener(urllib.request.HTTPCookieProcessor(self.cookies))
+        self.opener.addheaders = [("User-Agent", USER_AGENT)]
+
+    def request(self, url, data=None, referer=None) -> Page:
+        body = urllib.parse.urlencode(data).encode() if data is not None else None
+        headers = {"Referer": referer} if referer else {}
+        req = urllib.request.Request(url, data=body, headers=headers)
+        try:
+            with self.opener.open(req, timeout=self.timeout) as resp:
+                charset = resp.headers.get_content_charset() or "utf-8"
+                return Page(resp.geturl(), resp.status, resp.read().decode(charset, "replace"))
+        except urllib.error.HTTPError as e:
+            return Page(e.geturl(), e.code, e.read().decode("utf-8", "replace"))
+
+    def submit(self, page: Page, form) -> Page:
+        """Envía un formulario tal como lo haría el navegador."""
+        attrs = form["attrs"]
+        action = urllib.parse.urljoin(page.url, attrs.get("action") or page.url)
+        if attrs.get("method", "get").lower() == "post":
+            return self.request(action, form["inputs"], referer=page.url)
+        query = urllib.parse.urlencode(form["inputs"])
+        return self.request(f"{action}{'&' if '?' in action else '?'}{query}", referer=page.url)
+
+
+def http_login(session: HttpSession, email: str, password: str):
+    """
+    Envía el formulario de login de Canvas con su token CSRF.
+
+    Returns:
+        bool | None: True/False según el resultado, None si el formulario no es reconocible
+    """
+    log("Abriendo página de login (HTTP)...", "wait")
+    page = session.request(LOGIN_URL)
+    form = page.form_with("pseudonym_session[unique_id]")
+    if not form or "authenticity_token" not in form["inputs"]:
+        log("Formulario de login no reconocido", "error")
+        return None
+
+    log("Enviando credenciales...", "wait")
+    form["inputs"]["pseudonym_session[unique_id]"] = email
+    form["inputs"]["pseudonym_session[password]"] = password
+    result = session.submit(page, form)
+
+    parsed = urllib.parse.urlparse(result.url)
+    if "login_success=1" in result.url or (
+        parsed.netloc == CANVAS_HOST and not parsed.path.startswith("/login") and result.status < 400
+    ):
+        log("Login exitoso", "ok")
+        return True
+
+    log("Credenciales incorrectas. Verifica tu email y contraseña.", "error")
+    return False
+
+
+def open_lab(session: HttpSession, lab_url: str):
+    """
+    Abre LAB_URL y sigue el lanzamiento LTI (formularios autoenviados e
+    iframes) hasta la página que contiene los controles del lab.
+
+    Returns:
+        Page | None: Página del lab, o None si no se pudo llegar a ella
+    """
+    log("Entrando al laboratorio (HTTP)...", "wait")
+    page = session.request(lab_url)
+
+    for _ in range(MAX_LTI_HOPS):
+        if urllib.parse.urlparse(page.url).path.startswith("/login"):
+            log("La sesión no es válida: redirigido a la página de login", "error")
+            return None
+        if page.has_lab_controls:
+            log("Página del lab cargada", "ok")
+            return page
+
+        form = next((f for f in page.forms
+                     if f["attrs"].get("id") == "tool_form"
+                     or f["attrs"].get("target") == "tool_content"), None)
+        if form:
+            page = session.submit(page, form)
+            continue
+
+        frames = [f for f in page.iframes if f.get("src")]
+        frame = next((f for f in frames if "tool_content" in (f.get("name"), f.get("id"))),
+                     frames[0] if frames else None)
+        if frame:
+            page = session.request(urllib.parse.urljoin(page.url, frame["src"]), referer=page.url)
+            continue
+        break
+
+    log("No se encontró el frame del laboratorio", "error")
+    return None
+
+
+def click_start_lab(session: HttpSession, page: Page) -> bool:
+    """
+    Ejecuta la acción de #launchclabsbtn: su enlace, su data-url o el
+    formulario que lo contiene.
+
+    Returns:
+        bool | None: True si se envió la acción, None si no se puede replicar sin navegador
+    """
+    button = page.elements.get("launchclabsbtn")
+    if not button:
+        return None
+
+    attrs = button["attrs"]
+    target = attrs.get("data-url") or attrs.get("formaction") or attrs.get("href")
+    if target and not target.startswith(("#", "javascript:")):
+        session.request(urllib.parse.urljoin(page.url, target), referer=page.url)
+        return True
+    if button["form"] is not None:
+        session.submit(page, button["form"])
+        return True
+    return None
+
+
+def wait_for_ready(session: HttpSession, page: Page, scheduler: WaitScheduler) -> bool:
+    """
+    Vuelve a pedir la página del lab, con el sondeo adaptativo del
+    scheduler, hasta que #vmstatus indique Ready. Si la espera sigue a un
+    Start Lab, registra cuánto tardó.
+    """
+    def ready():
+        status = session.request(page.url, referer=page.url).lab_status()
+        return bool(status and "Ready" in status)
+
+    log(" Esperando que el laboratorio se inicie...", "wait")
+    if not scheduler.until(ready):
+        log("El laboratorio no se inició en el tiempo esperado", "error")
+        return False
+    if scheduler.marked == "start_lab":
+        record_ready_time(scheduler.since_mark())
+    log("Laboratorio ya está iniciado y listo", "ok")
+    return True
+
+
+def launch_lab_http(email=None, password=None, lab_url=None):
+    """
+    Login y arranque del lab usando solo peticiones HTTP, sin Chrome.
+
+    Args:
+        email, password, lab_url: Datos de la cuenta (por defecto, los de .env)
+
+    Returns:
+        bool | None: Resultado del flujo, o None si alguna página no es
+        reconocible y se debe recurrir a Selenium
+    """
+    if not (email and password and lab_url):
+        try:
+            creds = validate_credentials()
+        except ValueError as e:
+            log(f"Error de credenciales: {e}", "error")
+            return False
+        email, password = email or creds["EMAIL"], password or creds["PASSWORD"]
+        lab_url = lab_url or creds["LAB_URL"]
+
+    session = HttpSession()
+    try:
+        logged_in = http_login(session, email, password)
+        if not logged_in:
+            return logged_in
+
+        page = open_lab(session, lab_url)
+        if page is None:
+            return None
+
+        log("Verificando estado del laboratorio...", "wait")
+        scheduler = WaitScheduler(LAB_BUDGET, fast=LAB_POLL_FAST)
+        status = page.lab_status()
+        if not status:
+            return None
+        if "Ready" in status:
+            log("Laboratorio ya está iniciado y listo", "ok")
+            return True
+        if "Initializing" in status:
+            return wait_for_ready(session, page, scheduler)
+        if "Terminated" in status:
+            log("Laboratorio detenido, intentando iniciarlo...", "wait")
+            if not click_start_lab(session, page):
+                return None
+            log("Botón Start Lab clickeado", "ok")
+            scheduler.mark("start_lab", expected=typical_ready_time())
+            return wait_for_ready(session, page, scheduler)
+
+        log(f"Estado desconocido detectado: {status}", "info")
+        return None
+    except (OSError, urllib.error.URLError) as e:
+        log(f"Error de red: {e}", "error")
+        return None
@@ -0,0 +1,361 @@
+# src/logawstudent/intercept.py
+import threading
+import weakref
+from urllib.parse import urlparse
+from .utils import CONFIG_DIR, CANVAS_URL, load_json
+
+# Política opcional del usuario; sus claves reemplazan las de DEFAULT_POLICY
+POLICY_FILE = CONFIG_DIR / "intercept.json"
+
+DEFAULT_POLICY = {
+    # "fetch" (Fetch.requestPaused), "blocklist" (Network.setBlockedURLs) u "off"
+    "mode": "fetch",
+    # Tipos de recurso CDP que nunca hacen falta para arrancar el lab
+    "block_types": ["Image", "Media", "Font", "Stylesheet", "Ping", "CSPViolationReport"],
+    # Analítica, telemetría y video de terceros
+    "block_domains": [
+        "google-analytics.com", "googletagmanager.com", "doubleclick.net",
+        "segment.io", "segment.com", "mixpanel.com", "heapanalytics.com",
+        "pendo.io", "hotjar.com", "fullstory.com", "clarity.ms", "intercom.io",
+        "sentry.io", "newrelic.com", "nr-data.net", "datadoghq.com",
+        "cloudflareinsights.com", "facebook.net",
+        "youtube.com", "ytimg.com", "vimeo.com", "vimeocdn.com",
+        "kaltura.com", "brightcove.net",
+    ],
+    # Dominios que Canvas y el iframe del lab necesitan; nunca se bloquean por dominio
+    "allow_domains": [
+        "instructure.com", "canvaslms.com", "inscloudgate.net",
+        "vocareum.com", "awsacademy.com", "amazonaws.com", "aws.amazon.com",
+        "cloudfront.net",
+    ],
+    # Bloquea también scripts y XHR de cualquier dominio fuera de allow_domains
+    "block_third_party": False,
+}
+
+# Extensiones equivalentes a cada tipo, para el modo "blocklist"
+_TYPE_PATTERNS = {
+    "Image": ["*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.svg", "*.ico"],
+    "Font": ["*.woff", "*.woff2", "*.ttf", "*.otf"],
+    "Stylesheet": ["*.css"],
+    "Media": ["*.mp4", "*.webm", "*.m3u8", "*.mp3"],
+}
+
+# Tipos que block_third_party no bloquea (navegaciones de la página y sus iframes)
+_ESSENTIAL_TYPES = ("Document",)
+
+# Capacidad de la cola de eventos CDP; si se llena, Selenium descarta eventos
+# y la petición correspondiente quedaría pausada para siempre
+_EVENT_BUFFER = 4096
+
+# Respuestas cuyo cuerpo se entrega a los observadores (add_response_watcher)
+_WATCHED_TYPES = ("Document", "XHR", "Fetch")
+_WATCHED_MIME = ("text/", "application/json", "application/javascript", "application/xhtml")
+
+# Interceptor activo de cada driver; el interceptor retiene al driver, así que
+# la entrada se quita explícitamente con stop_interception (auth.quit_driver)
+_interceptors = weakref.WeakKeyDictionary()
+
+
+def _matches(host, domains) -> bool:
+    return any(host == d or host.endswith("." + d) for d in domains)
+
+
+class InterceptionPolicy:
+    """Decide qué peticiones se bloquean según tipo de recurso y dominio."""
+
+    def __init__(self, mode="fetch", block_types=(), block_domains=(), allow_domains=(),
+                 block_third_party=False):
+        self.mode = mode
+        self.block_types = set(block_types)
+        self.block_domains = tuple(block_domains)
+        self.allow_domains = tuple(allow_domains) + (urlparse(CANVAS_URL).hostname,)
+        self.block_third_party = block_third_party
+
+    @classmethod
+    def load(cls):
+        """Política por defecto combinada con ~/.config/logawstudent/intercept.json."""
+        policy = dict(DEFAULT_POLICY)
+        user = load_json(POLICY_FILE, {})
+        if isinstance(user, dict):
+            policy.update({k: v for k, v in user.items() if k in DEFAULT_POLICY})
+        return cls(**policy)
+
+    def decide(self, url: str, resource_type: str):
+        """
+        Returns:
+            str | None: Motivo del bloqueo ("type", "domain", "third-party"),
+            o None si la petición debe continuar
+        """
+        parsed = urlparse(url)
+        if parsed.scheme not in ("http", "https"):
+            return None
+        if resource_type in self.block_types:
+            return "type"
+
+        host = parsed.hostname or ""
+        if _matches(host, self.allow_domains):
+            return None
+        if _matches(host, self.block_domains):
+            return "domain"
+        if self.block_third_party and resource_type not in _ESSENTIAL_TYPES:
+            return "third-party"
+        return None
+
+    def url_patterns(self) -> list:
+        """Patrones equivalentes para Network.setBlockedURLs (sin allowlist)."""
+        patterns = []
+        for resource_type in self.block_types:
+            patterns.extend(_TYPE_PATTERNS.get(resource_type, []))
+        for domain in self.block_domains:
+            patterns.extend([f"*://{domain}/*", f"*://*.{domain}/*"])
+        return patterns
+
+
+class InterceptionStats:
+    """Contadores de peticiones bloqueadas y permitidas desde la última lectura."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.blocked = {}
+        self.allowed = 0
+        self.allowed_bytes = 0
+
+    def count(self, reason):
+        with self.lock:
+            if reason:
+                self.blocked[reason] = self.blocked.get(reason, 0) + 1
+            else:
+                self.allowed += 1
+
+    def add_bytes(self, size):
+        with self.lock:
+            self.allowed_bytes += int(size)
+
+    def take(self) -> dict:
+        """Retorna los contadores acumulados y los pone a cero."""
+        with self.lock:
+            snapshot = {
+                "blocked": sum(self.blocked.values()),
+                "blocked_by": dict(self.blocked),
+                "allowed": self.allowed,
+                "allowed_bytes": self.allowed_bytes,
+            }
+            self.reset()
+        return snapshot
+
+
+class RequestInterceptor:
+    """
+    Atiende Fetch.requestPaused en un hilo propio con una conexión CDP
+    (driver.bidi_connection) a la pestaña actual y a sus iframes fuera de
+    proceso, que se adjuntan con Target.setAutoAttach.
+    """
+
+    def __init__(self, driver, policy: InterceptionPolicy):
+        self.driver = driver
+        self.policy = policy
+        self.stats = InterceptionStats()
+        self.error = None
+        self.watchers = []
+        self._responses = {}
+        self._ready = threading.Event()
+        self._token = None
+        self._scope = None
+        self._thread = None
+
+    def start(self, timeout=10) -> bool:
+        """Arranca el hilo y espera a que Fetch esté habilitado."""
+        self._thread = threading.Thread(target=self._thread_main, name="cdp-intercept", daemon=True)
+        self._thread.start()
+        self._ready.wait(timeout)
+        return self._token is not None and self.error is None
+
+    def stop(self):
+        import trio
+        if self._token is not None and self._scope is not None:
+            try:
+                trio.from_thread.run_sync(self._scope.cancel, trio_token=self._token)
+            except (RuntimeError, trio.RunFinishedError):
+                pass
+        if self._thread:
+            self._thread.join(timeout=2)
+
+    def _thread_main(self):
+        import trio
+        try:
+            trio.run(self._main)
+        except Exception as e:
+            self.error = e
+        finally:
+            self._ready.set()
+
+    async def _main(self):
+        import trio
+        from selenium.webdriver.common.bidi import cdp
+
+        async with self.driver.bidi_connection() as connection:
+            conn = cdp.get_connection_context("intercept")
+            devtools = connection.devtools
+            with trio.CancelScope() as scope:
+                async with trio.open_nursery() as nursery:
+                    await nursery.start(self._serve, nursery, conn, connection.session, devtools, False)
+                    self._scope = scope
+                    self._token = trio.lowlevel.current_trio_token()
+                    self._ready.set()
+
+    async def _serve(self, nursery, conn, session, devtools, resume, task_status=None):
+        """Habilita Fetch/Network en una sesión y atiende sus eventos."""
+        from selenium.webdriver.common.bidi import cdp
+
+        events = session.listen(
+            devtools.fetch.RequestPaused,
+            devtools.network.ResponseReceived,
+            devtools.network.LoadingFinished,
+            devtools.target.AttachedToTarget,
+            buffer_size=_EVENT_BUFFER,
+        )
+        await session.execute(devtools.fetch.enable(patterns=[devtools.fetch.RequestPattern(url_pattern="*")]))
+        await session.execute(devtools.network.enable())
+        await session.execute(devtools.target.set_auto_attach(
+            auto_attach=True, wait_for_debugger_on_start=True, flatten=True))
+        if resume:
+            await session.execute(devtools.runtime.run_if_waiting_for_debugger())
+        if task_status is not None:
+            task_status.started()
+
+        async for event in events:
+            if isinstance(event, devtools.fetch.RequestPaused):
+                nursery.start_soon(self._decide, session, devtools, event)
+            elif isinstance(event, devtools.network.ResponseReceived):
+                self._track_response(session, event)
+            elif isinstance(event, devtools.network.LoadingFinished):
+                self.stats.add_bytes(event.encoded_data_length)
+                url = self._responses.pop((session.session_id, event.request_id), None)
+                if url and self.watchers:
+                    nursery.start_soon(self._read_body, session, devtools, event.request_id, url)
+            elif event.target_info.type_ in ("iframe", "page"):
+                child = cdp.CdpSession(conn.ws, event.session_id, event.target_info.target_id)
+                conn.sessions[event.session_id] = child
+                nursery.start_soon(self._serve, nursery, conn, child, devtools, True)
+            else:
+                # Workers y demás destinos: se reanudan sin interceptar
+                nursery.start_soon(self._resume_target, conn, event, devtools)
+
+    def _track_response(self, session, event):
+        if not self.watchers or event.type_.value not in _WATCHED_TYPES:
+            return
+        if event.response.mime_type.startswith(_WATCHED_MIME):
+            self._responses[(session.session_id, event.request_id)] = event.response.url
+
+    async def _read_body(self, session, devtools, request_id, url):
+        """Lee el cuerpo de una respuesta ya descargada y lo pasa a los observadores."""
+        import base64
+        try:
+            body, encoded = await session.execute(devtools.network.get_response_body(request_id))
+        except Exception:
+            return
+        if encoded:
+            body = base64.b64decode(body).decode("utf-8", "replace")
+        for watcher in list(self.watchers):
+            try:
+                watcher(url, body)
+            except Exception:
+                pass
+
+    async def _resume_target(self, conn, event, devtools):
+        from selenium.webdriver.common.bidi import cdp
+        child = cdp.CdpSession(conn.ws, event.session_id, event.target_info.target_id)
+        conn.sessions[event.session_id] = child
+        try:
+            await child.execute(devtools.runtime.run_if_waiting_for_debugger())
+        except Exception:
+            pass
+
+    async def _decide(self, session, devtools, event):
+        resource_type = event.resource_type.value if event.resource_type else "Other"
+        reason = self.policy.decide(event.request.url, resource_type)
+        self.stats.count(reason)
+        try:
+            if reason:
+                await session.execute(devtools.fetch.fail_request(
+                    request_id=event.request_id,
+                    error_reason=devtools.network.ErrorReason.BLOCKED_BY_CLIENT))
+            else:
+                await session.execute(devtools.fetch.continue_request(request_id=event.request_id))
+        except Exception:
+            # La petición ya no existe (navegación cancelada, frame cerrado)
+            pass
+
+
+def block_with_patterns(driver, policy: InterceptionPolicy) -> bool:
+    """Bloqueo por patrones de URL con Network.setBlockedURLs (sin estadísticas)."""
+    try:
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": policy.url_patterns()})
+        driver.execute_cdp_cmd("Network.enable", {})
+        return True
+    except Exception:
+        return False
+
+
+def start_interception(driver, policy: InterceptionPolicy = None):
+    """
+    Activa la interceptación configurada en la pestaña actual del driver.
+
+    Returns:
+        str: Modo efectivo: "fetch", "blocklist" u "off"
+    """
+    policy = policy or InterceptionPolicy.load()
+    if policy.mode == "off":
+        return "off"
+
+    if policy.mode == "fetch":
+        interceptor = RequestInterceptor(driver, policy)
+        if interceptor.start():
+            _interceptors[driver] = interceptor
+            return "fetch"
+        interceptor.stop()
+
+    return "blocklist" if block_with_patterns(driver, policy) else "off"
+
+
+def interception_stats(driver):
+    """
+    Contadores del interceptor del driver desde la última llamada.
+
+    Returns:
+        dict | None: blocked, blocked_by, allowed y allowed_bytes, o None si
+        el driver no usa Fetch
+    """
+    interceptor = _interceptors.get(driver)
+    return interceptor.stats.take() if interceptor else None
+
+
+def add_response_watcher(driver, watcher) -> bool:
+    """
+    Registra `watcher(url, body)` para los documentos, XHR y fetch de texto
+    que descargue el driver. Se llama desde el hilo del interceptor.
+
+    Returns:
+        bool: False si el driver no usa el interceptor Fetch
+    """
+    interceptor = _interceptors.get(driver)
+    if not interceptor:
+        return False
+    interceptor.watchers.append(watcher)
+    return True
+
+
+def remove_response_watcher(driver, watcher):
+    interceptor = _interceptors.get(driver)
+    if interceptor and watcher in interceptor.watchers:
+        interceptor.watchers.remove(watcher)
+
+
+def stop_interception(driver):
+    """Detiene el interceptor del driver (su hilo y su conexión CDP) y lo olvida."""
+    interceptor = _interceptors.pop(driver, None)
+    if interceptor:
+        interceptor.stop()
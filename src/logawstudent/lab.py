@@ -1,119 +1,376 @@
 # src/logawstudent/lab.py
-import time
+import weakref
 from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.chrome.webdriver import WebDriver
-from rich.console import Console
-from rich.panel import Panel
+from selenium.common.exceptions import WebDriverException
 from .utils import validate_credentials
+from .logs import log
+from .profiling import phase, traced
+from .schedule import WaitScheduler, record_ready_time, typical_ready_time
+from .probes import probe, probe_frame
 
-console = Console()
 
-def log(msg, status="info"):
-    """Función de logging con iconos y formato Rich."""
-    icons = {"ok": "✅", "info": "🔎", "wait": "⏳", "error": "❌", "done": "🚀"}
-    colors = {"ok": "green", "info": "blue", "wait": "yellow", "error": "red", "done": "green"}
-    
-    icon = icons.get(status, "ℹ️")
-    color = colors.get(status, "white")
-    
-    console.print(f"[{color}]{icon} {msg}[/{color}]")
+# Plazo global para dejar el lab listo (lectura inicial, clic y arranque)
+LAB_BUDGET = 240
+
+# Presupuestos por etapa dentro del plazo global
+NAVIGATION_BUDGET = 5
+FIRST_READ_BUDGET = 8
+CLICK_BUDGET = 15
+
+# Plazo para confirmar que Start Lab reinició el temporizador de una sesión activa
+EXTEND_BUDGET = 30
+
+# Aumento mínimo del tiempo restante para dar por extendida la sesión
+EXTEND_MIN_GAIN = 60
+
+# Cada lectura es un round-trip, así que el sondeo rápido es algo más lento que en el login
+LAB_POLL_FAST = 0.25
+
+# Script asíncrono: instala (una vez por documento) un MutationObserver sobre
+# #vmstatus que guarda cada transición con su marca de tiempo, y responde en
+# cuanto hay transiciones nuevas o vence el plazo.
+WATCH_STATUS_JS = """
+var since = arguments[0], epoch = arguments[1], limit = arguments[2];
+var done = arguments[arguments.length - 1];
+if (!(document.getElementById('vmBtn') || document.getElementById('vmstatus')
+      || document.getElementById('launchclabsbtn'))) { done(null); return; }
 
+function read() {
+  var btn = document.getElementById('vmBtn');
+  var el = (btn && btn.querySelector('#vmstatus')) || document.getElementById('vmstatus');
+  if (!el) return null;
+  return el.getAttribute('aria-label') || el.getAttribute('title') || el.getAttribute('class') || null;
+}
+
+var w = window.__lasStatusWatch;
+if (!w) {
+  w = window.__lasStatusWatch = {epoch: Date.now() + '-' + Math.random(), events: [], waiters: []};
+  var record = function() {
+    var status = read();
+    var last = w.events.length ? w.events[w.events.length - 1].status : undefined;
+    if (status === last) return;
+    w.events.push({status: status, t: Date.now()});
+    var waiters = w.waiters;
+    w.waiters = [];
+    waiters.forEach(function(wake) { wake(); });
+  };
+  record();
+  new MutationObserver(record).observe(document.documentElement, {
+    subtree: true, childList: true, attributes: true,
+    attributeFilter: ['aria-label', 'title', 'class']
+  });
+}
+if (epoch !== w.epoch) since = 0;
+
+var reply = function() {
+  done({epoch: w.epoch, events: w.events.slice(since), total: w.events.length});
+};
+if (w.events.length > since) { reply(); return; }
+var wake = function() { clearTimeout(timer); reply(); };
+var timer = setTimeout(function() {
+  w.waiters = w.waiters.filter(function(f) { return f !== wake; });
+  reply();
+}, limit);
+w.waiters.push(wake);
+"""
+
+
+class FrameLocator:
+    """
+    Localiza una sola vez el iframe que contiene #vmBtn/#vmstatus/#launchclabsbtn
+    y lo reutiliza mientras siga vigente. Solo vuelve a escanear los iframes si el
+    frame guardado quedó obsoleto.
+    """
 
-def check_lab_status(driver: WebDriver, timeout=5):
-    """Consulta el estado del laboratorio leyendo #vmstatus dentro de #vmBtn si existe."""
-    start = time.time()
+    def __init__(self, driver: WebDriver):
+        self.driver = driver
+        self.frame = None
+        self.inside = False
+        self.script_timeout = None
+        self.watch_epoch = None
+        self.watch_seen = 0
+        self.pending_url = None
 
-    while time.time() - start < timeout:
-        frames = driver.find_elements(By.TAG_NAME, "iframe")
+    def reset(self):
+        """Olvida el frame guardado (por ejemplo, tras navegar a otra página)."""
+        self.frame = None
+        self.inside = False
 
-        for frame in frames:
+    def _scan(self) -> bool:
+        driver = self.driver
+        driver.switch_to.default_content()
+        self.inside = False
+        for frame in driver.find_elements(By.TAG_NAME, "iframe"):
             try:
                 driver.switch_to.frame(frame)
+                if probe(driver, "lab_markers"):
+                    self.frame = frame
+                    self.inside = True
+                    return True
+            except WebDriverException:
+                pass
+            driver.switch_to.default_content()
+        self.frame = None
+        return False
+
+    def leave(self):
+        """Vuelve al documento principal conservando el frame guardado."""
+        self.driver.switch_to.default_content()
+        self.inside = False
+
+    def set_script_timeout(self, seconds):
+        """Ajusta el timeout de scripts asíncronos solo si hace falta ampliarlo."""
+        if self.script_timeout is None or self.script_timeout < seconds:
+            self.driver.set_script_timeout(seconds)
+            self.script_timeout = seconds
 
-                # Caso 1: el botón de AWS existe
-                try:
-                    vm_btn = driver.find_element(By.ID, "vmBtn")
-                    vm_status = vm_btn.find_element(By.ID, "vmstatus")
-                    status_text = (
-                        vm_status.get_attribute("aria-label")
-                        or vm_status.get_attribute("title")
-                        or vm_status.get_attribute("class")
-                    )
-                    driver.switch_to.default_content()
-                    return status_text.strip()
-                except:
-                    pass
-
-                # Caso 2: buscar vmstatus directamente
-                try:
-                    vm_status = driver.find_element(By.ID, "vmstatus")
-                    status_text = (
-                        vm_status.get_attribute("aria-label")
-                        or vm_status.get_attribute("title")
-                        or vm_status.get_attribute("class")
-                    )
-                    driver.switch_to.default_content()
-                    return status_text.strip()
-                except:
-                    pass
-
-            except:
+    def run(self, script, *args, asynchronous=False):
+        """
+        Ejecuta un script en el frame del lab. Con el frame ya localizado cuesta
+        un solo round-trip; retorna None si no se encontró el frame.
+        """
+        execute = self.driver.execute_async_script if asynchronous else self.driver.execute_script
+        for step in ("current", "cached", "scan"):
+            try:
+                if step == "current":
+                    if not self.inside:
+                        continue
+                elif step == "cached":
+                    if self.frame is None:
+                        continue
+                    self.driver.switch_to.default_content()
+                    self.driver.switch_to.frame(self.frame)
+                elif not self._scan():
+                    return None
+
+                self.inside = True
+                result = execute(script, *args)
+                if result is not None:
+                    return result
+            except WebDriverException:
                 pass
-            finally:
-                driver.switch_to.default_content()
+            self.inside = False
+        return None
+
+
+# FrameLocator de cada driver; retiene al driver, así que auth.quit_driver
+# quita la entrada con forget_frame_locator
+_locators = weakref.WeakKeyDictionary()
+
+
+def get_frame_locator(driver: WebDriver) -> FrameLocator:
+    """Retorna el FrameLocator asociado al driver, creándolo si no existe."""
+    locator = _locators.get(driver)
+    if locator is None:
+        locator = _locators[driver] = FrameLocator(driver)
+    return locator
+
+
+def forget_frame_locator(driver: WebDriver):
+    """Descarta el FrameLocator del driver (retiene al driver, así que no se libera solo)."""
+    _locators.pop(driver, None)
+
 
-        time.sleep(1)
+def watch_lab_status(driver: WebDriver, timeout=30):
+    """
+    Espera, con un único script asíncrono, a que #vmstatus cambie.
+    
+    Args:
+        driver: WebDriver en la página del lab
+        timeout: Segundos máximos a bloquear esperando una transición
+        
+    Returns:
+        list | None: Transiciones nuevas [{"status", "t"}] (vacía si no hubo
+        cambios), o None si no se pudo instalar el observador
+    """
+    locator = get_frame_locator(driver)
+    try:
+        locator.set_script_timeout(timeout + 5)
+    except WebDriverException:
+        return None
+
+    result = locator.run(
+        WATCH_STATUS_JS, locator.watch_seen, locator.watch_epoch, int(timeout * 1000),
+        asynchronous=True
+    )
+    if not result:
+        return None
+    locator.watch_epoch = result["epoch"]
+    locator.watch_seen = result["total"]
+    return result["events"]
+
+
+@traced("ready_wait")
+def wait_until_ready(driver: WebDriver, scheduler: WaitScheduler, waiting_msg):
+    """
+    Espera a que el lab pase a 'Ready' reaccionando a las transiciones de
+    #vmstatus; si no se puede observar el frame, recurre al sondeo adaptativo
+    del scheduler. Si la espera sigue a un Start Lab, registra cuánto tardó.
+    
+    Returns:
+        bool: True si el lab llegó a 'Ready' antes del plazo del scheduler
+    """
+    while not scheduler.expired:
+        events = watch_lab_status(driver, timeout=scheduler.budget(30))
+        if events is None:
+            # Sin observador: un solo sondeo adaptativo con el plazo restante
+            log(waiting_msg, "wait")
+            locator = get_frame_locator(driver)
+
+            def ready():
+                status = (probe_frame(locator, "lab_status") or {}).get("status")
+                return bool(status and "Ready" in status)
+
+            if scheduler.until(ready):
+                break
+            continue
+
+        for event in events:
+            log(f"Estado del laboratorio: {event['status']}", "info")
+        if events and events[-1]["status"] and "Ready" in events[-1]["status"]:
+            break
+        if not events:
+            log(waiting_msg, "wait")
+    else:
+        return False
 
-    return None
+    if scheduler.marked == "start_lab":
+        record_ready_time(scheduler.since_mark())
+    return True
+
+
+@traced("check_lab_status")
+def check_lab_status(driver: WebDriver, timeout=5, scheduler: WaitScheduler = None):
+    """
+    Consulta el estado del laboratorio leyendo #vmstatus dentro de #vmBtn si existe.
+
+    Args:
+        timeout: Presupuesto de esta lectura (acotado por el del scheduler)
+        scheduler: Plazo global del que forma parte la lectura
+    """
+    locator = get_frame_locator(driver)
+    scheduler = scheduler or WaitScheduler(timeout, fast=LAB_POLL_FAST)
+    result = scheduler.until(
+        lambda: (probe_frame(locator, "lab_status") or {}).get("status"), limit=timeout
+    )
+    return result or None
 
 
-def click_start_lab_fast(driver: WebDriver, timeout=5):
+@traced("start_lab_click")
+def click_start_lab_fast(driver: WebDriver, timeout=5, scheduler: WaitScheduler = None):
     """Hace clic rápido en el botón Start Lab si está disponible."""
-    start = time.time()
-    while time.time() - start < timeout:
-        frames = driver.find_elements(By.TAG_NAME, "iframe")
-        for frame in frames:
-            try:
-                driver.switch_to.frame(frame)
-                btns = driver.find_elements(By.ID, "launchclabsbtn")
-                if btns:
-                    btn = btns[0]
-                    if btn.is_displayed() and btn.is_enabled():
-                        btn.click()
-                        driver.switch_to.default_content()
-                        return True
-            except:
-                pass
-            finally:
-                driver.switch_to.default_content()
-        time.sleep(1)
+    locator = get_frame_locator(driver)
+    scheduler = scheduler or WaitScheduler(timeout, fast=LAB_POLL_FAST)
+    if scheduler.until(lambda: (probe_frame(locator, "click_start") or {}).get("clicked"), limit=timeout):
+        scheduler.mark("start_lab", expected=typical_ready_time())
+        return True
     return False
 
 
-def navigate_to_lab(driver: WebDriver) -> bool:
+def preload_lab(driver: WebDriver, lab_url: str):
+    """
+    Detiene la carga de la página actual y empieza a cargar LAB_URL sin
+    esperar; navigate_to_lab reutiliza esa navegación en vez de repetirla.
+    """
+    locator = get_frame_locator(driver)
+    locator.reset()
+    driver.execute_script("window.stop(); window.location.assign(arguments[0]);", lab_url)
+    locator.pending_url = lab_url
+
+
+def read_session_remaining(driver: WebDriver):
+    """
+    Lee el tiempo restante de la sesión del lab (#sessiontime o el texto
+    'Remaining session time').
+
+    Returns:
+        int | None: Segundos restantes, o None si la página no lo muestra
+    """
+    result = probe_frame(get_frame_locator(driver), "session_remaining")
+    seconds = result["seconds"] if result else -1
+    return seconds if seconds >= 0 else None
+
+
+@traced("extend_session")
+def extend_session(driver: WebDriver, lab_url: str = None, scheduler: WaitScheduler = None):
+    """
+    Reinicia el temporizador de un lab en ejecución pulsando Start Lab (el
+    mismo botón que lo arranca) y confirma que el tiempo restante aumentó.
+    Si la página no actualiza el temporizador, la recarga para leerlo.
+
+    Args:
+        driver: WebDriver en la página del lab
+        lab_url: URL del laboratorio, para recargarla si hace falta
+        scheduler: Plazo del clic y la confirmación (por defecto, EXTEND_BUDGET)
+
+    Returns:
+        int | None: Segundos restantes tras extender, o None si no se confirmó
+    """
+    scheduler = scheduler or WaitScheduler(CLICK_BUDGET + EXTEND_BUDGET, fast=LAB_POLL_FAST)
+    before = read_session_remaining(driver)
+    if before is None:
+        log("No se pudo leer el tiempo restante de la sesión", "error")
+        return None
+    if not click_start_lab_fast(driver, timeout=CLICK_BUDGET, scheduler=scheduler):
+        log("No se pudo pulsar Start Lab para extender la sesión", "error")
+        return None
+    # Que la espera no cuente como arranque en el historial de tiempos de 'Ready'
+    scheduler.mark("extend")
+
+    def extended():
+        remaining = read_session_remaining(driver)
+        return remaining if remaining is not None and remaining >= before + EXTEND_MIN_GAIN else None
+
+    remaining = scheduler.until(extended, limit=EXTEND_BUDGET / 2)
+    if not remaining and lab_url and navigate_to_lab(driver, lab_url, scheduler.child()):
+        remaining = scheduler.until(extended, limit=scheduler.remaining())
+    if not remaining:
+        log("Start Lab pulsado, pero el temporizador de la sesión no cambió", "error")
+        return None
+    log(f"Sesión extendida: {before // 60} → {remaining // 60} min restantes", "ok")
+    return remaining
+
+
+@traced("lab_navigation")
+def navigate_to_lab(driver: WebDriver, lab_url: str = None, scheduler: WaitScheduler = None) -> bool:
     """
     Navega a la página del laboratorio.
     
     Args:
         driver: WebDriver autenticado
+        lab_url: URL del laboratorio (por defecto, LAB_URL de .env)
+        scheduler: Plazo global del que forma parte la navegación
         
     Returns:
         bool: True si la navegación fue exitosa
     """
-    try:
-        creds = validate_credentials()
-        lab_url = creds["LAB_URL"]
-    except ValueError as e:
-        log(f"Error de credenciales: {e}", "error")
-        return False
+    if lab_url is None:
+        try:
+            creds = validate_credentials()
+            lab_url = creds["LAB_URL"]
+        except ValueError as e:
+            log(f"Error de credenciales: {e}", "error")
+            return False
 
     try:
         log("Entrando al laboratorio...", "wait")
-        driver.get(lab_url)
-        wait = WebDriverWait(driver, 5)
-        wait.until(EC.presence_of_element_located((By.TAG_NAME, "iframe")))
+        locator = get_frame_locator(driver)
+        if locator.pending_url != lab_url:
+            locator.reset()
+            driver.get(lab_url)
+        locator.pending_url = None
+        scheduler = scheduler or WaitScheduler(NAVIGATION_BUDGET, fast=LAB_POLL_FAST)
+        loaded = scheduler.until(
+            lambda: driver.find_elements(By.TAG_NAME, "iframe") or "/login" in driver.current_url,
+            limit=NAVIGATION_BUDGET
+        )
+        if not loaded:
+            log("La página del lab no cargó sus iframes a tiempo", "error")
+            return False
+        if "/login" in driver.current_url:
+            log("La sesión no es válida: redirigido a la página de login", "error")
+            return False
         log("Página del lab cargada", "ok")
         return True
     except Exception as e:
@@ -121,88 +378,86 @@ def navigate_to_lab(driver: WebDriver) -> bool:
         return False
 
 
-def wait_for_lab_ready(driver: WebDriver, max_wait=50):
+def wait_for_lab_ready(driver: WebDriver, max_wait=50, scheduler: WaitScheduler = None):
     """
     Espera a que el laboratorio esté listo.
     
     Args:
         driver: WebDriver en la página del lab
         max_wait: Tiempo máximo de espera en segundos
+        scheduler: Plazo global; la espera usa como mucho max_wait de lo que le queda
         
     Returns:
         bool: True si el lab está listo, False si no se pudo iniciar
     """
-    start_wait = time.time()
-    while time.time() - start_wait < max_wait:
-        status = check_lab_status(driver, timeout=10)
-        if status and "Ready" in status:
-            log("Laboratorio ya está iniciado y listo", "ok")
-            return True
-        log(" Esperando que el laboratorio se inicie...", "wait")
-        time.sleep(2)
+    scheduler = scheduler.child(max_wait) if scheduler else WaitScheduler(max_wait, fast=LAB_POLL_FAST)
+    if wait_until_ready(driver, scheduler, " Esperando que el laboratorio se inicie..."):
+        log("Laboratorio ya está iniciado y listo", "ok")
+        return True
     
     log("El laboratorio no se inició en el tiempo esperado", "error")
     return False
 
 
-def handle_lab_initialization(driver: WebDriver):
+def handle_lab_initialization(driver: WebDriver, scheduler: WaitScheduler = None):
     """
     Maneja el proceso de inicialización del laboratorio.
     
     Args:
         driver: WebDriver en la página del lab
+        scheduler: Plazo global (por defecto, LAB_BUDGET)
         
     Returns:
         bool: True si el lab está listo, False en caso contrario
     """
     log("Laboratorio se está iniciando, esperando a que esté listo...", "wait")
-    max_wait = 35
-    start_wait = time.time()
+    scheduler = scheduler or WaitScheduler(LAB_BUDGET, fast=LAB_POLL_FAST)
     
-    while time.time() - start_wait < max_wait:
-        status = check_lab_status(driver, timeout=10)
-        if status and "Ready" in status:
-            log("Laboratorio ya está iniciado y listo", "ok")
-            return True
-        log("Sigue iniciando...", "wait")
-        time.sleep(2)
+    if wait_until_ready(driver, scheduler, "Sigue iniciando..."):
+        log("Laboratorio ya está iniciado y listo", "ok")
+        return True
     
     log("El laboratorio no pasó a 'Ready' en el tiempo esperado", "error")
     return False
 
 
-def start_terminated_lab(driver: WebDriver):
+def start_terminated_lab(driver: WebDriver, scheduler: WaitScheduler = None):
     """
     Inicia un laboratorio que está terminado.
     
     Args:
         driver: WebDriver en la página del lab
+        scheduler: Plazo global (por defecto, LAB_BUDGET)
         
     Returns:
         bool: True si el lab se inició correctamente, False en caso contrario
     """
     log("Laboratorio detenido, intentando iniciarlo...", "wait")
+    scheduler = scheduler or WaitScheduler(LAB_BUDGET, fast=LAB_POLL_FAST)
     
-    if click_start_lab_fast(driver, timeout=15):
+    if click_start_lab_fast(driver, timeout=CLICK_BUDGET, scheduler=scheduler):
         log("Botón Start Lab clickeado", "ok")
-        return wait_for_lab_ready(driver, max_wait=200)
+        return wait_for_lab_ready(driver, max_wait=scheduler.remaining(), scheduler=scheduler)
     else:
         log("No se pudo iniciar el laboratorio", "error")
         return False
 
 
-def manage_lab_status(driver: WebDriver):
+def manage_lab_status(driver: WebDriver, scheduler: WaitScheduler = None):
     """
     Gestiona el estado del laboratorio y lo inicia si es necesario.
     
     Args:
         driver: WebDriver en la página del lab
+        scheduler: Plazo global (por defecto, LAB_BUDGET)
         
     Returns:
         bool: True si el lab está listo, False en caso contrario
     """
+    scheduler = scheduler or WaitScheduler(LAB_BUDGET, fast=LAB_POLL_FAST)
     log("Verificando estado del laboratorio...", "wait")
-    status = check_lab_status(driver, timeout=8)
+    with phase("first_status_read"):
+        status = check_lab_status(driver, timeout=FIRST_READ_BUDGET, scheduler=scheduler)
 
     if not status:
         log("No se pudo detectar el estado del laboratorio", "error")
@@ -211,27 +466,68 @@ def manage_lab_status(driver: WebDriver):
         log("Laboratorio ya está iniciado y listo", "ok")
         return True
     elif "Initializing" in status:
-        return handle_lab_initialization(driver)
+        return handle_lab_initialization(driver, scheduler)
     elif "Terminated" in status:
-        return start_terminated_lab(driver)
+        return start_terminated_lab(driver, scheduler)
     else:
         log(f"Estado desconocido detectado: {status}", "info")
         return False
 
 
-def process_lab(driver: WebDriver) -> bool:
+def kick_lab(driver: WebDriver, scheduler: WaitScheduler = None):
+    """
+    Verifica el estado del laboratorio y pulsa Start Lab si está detenido,
+    sin esperar a que llegue a 'Ready'.
+    
+    Args:
+        driver: WebDriver en la página del lab
+        scheduler: Plazo de la verificación y el clic
+        
+    Returns:
+        str | None: "Ready", "Initializing" (también tras pulsar Start Lab) o None si falló
+    """
+    scheduler = scheduler or WaitScheduler(FIRST_READ_BUDGET + CLICK_BUDGET, fast=LAB_POLL_FAST)
+    log("Verificando estado del laboratorio...", "wait")
+    with phase("first_status_read"):
+        status = check_lab_status(driver, timeout=FIRST_READ_BUDGET, scheduler=scheduler)
+
+    if not status:
+        log("No se pudo detectar el estado del laboratorio", "error")
+        return None
+    elif "Ready" in status:
+        log("Laboratorio ya está iniciado y listo", "ok")
+        return "Ready"
+    elif "Initializing" in status:
+        return "Initializing"
+    elif "Terminated" in status:
+        log("Laboratorio detenido, intentando iniciarlo...", "wait")
+        if click_start_lab_fast(driver, timeout=CLICK_BUDGET, scheduler=scheduler):
+            log("Botón Start Lab clickeado", "ok")
+            return "Initializing"
+        log("No se pudo iniciar el laboratorio", "error")
+        return None
+    else:
+        log(f"Estado desconocido detectado: {status}", "info")
+        return None
+
+
+def process_lab(driver: WebDriver, lab_url: str = None, scheduler: WaitScheduler = None) -> bool:
     """
     Procesa completamente el laboratorio: navega, verifica estado y lo inicia si es necesario.
     
     Args:
         driver: WebDriver autenticado
+        lab_url: URL del laboratorio (por defecto, LAB_URL de .env)
+        scheduler: Plazo global de todo el proceso (por defecto, navegación + LAB_BUDGET)
         
     Returns:
         bool: True si el lab está listo, False en caso contrario
     """
+    scheduler = scheduler or WaitScheduler(NAVIGATION_BUDGET + LAB_BUDGET, fast=LAB_POLL_FAST)
+
     # Navegar al laboratorio
-    if not navigate_to_lab(driver):
+    if not navigate_to_lab(driver, lab_url, scheduler):
         return False
     
     # Gestionar el estado del laboratorio
-    return manage_lab_status(driver)
+    return manage_lab_status(driver, scheduler)
@@ -0,0 +1,67 @@
+# src/logawstudent/lab_state.py
+import threading
+import time
+from .utils import CONFIG_DIR, load_json, save_json
+
+LAB_STATE_FILE = CONFIG_DIR / "lab_state.json"
+
+# Validez de un 'Ready' observado cuando la página no mostró el fin de la sesión
+LAB_STATE_TTL = 15 * 60
+
+# Margen antes del fin de la sesión a partir del cual se vuelve a verificar
+SESSION_END_MARGIN = 10 * 60
+
+_lock = threading.Lock()
+
+
+def _key(email, lab_url) -> str:
+    return f"{email}|{lab_url}"
+
+
+def record_lab_state(email, lab_url, status, remaining=None):
+    """
+    Guarda el último estado observado del lab de una cuenta.
+
+    Args:
+        remaining: Segundos restantes de la sesión, si la página los muestra
+    """
+    now = time.time()
+    with _lock:
+        states = load_json(LAB_STATE_FILE, {}) or {}
+        states[_key(email, lab_url)] = {
+            "status": status,
+            "observed_at": now,
+            "session_ends_at": now + remaining if remaining is not None else None,
+        }
+        save_json(LAB_STATE_FILE, states)
+
+
+def clear_lab_state(email=None, lab_url=None):
+    """Olvida el estado de un lab, o de todos si no se indica cuenta."""
+    with _lock:
+        states = load_json(LAB_STATE_FILE, {}) or {}
+        if email is None:
+            states = {}
+        else:
+            states.pop(_key(email, lab_url), None)
+        save_json(LAB_STATE_FILE, states)
+
+
+def cached_ready(email, lab_url):
+    """
+    Retorna el estado guardado si el lab se vio 'Ready' y su sesión sigue
+    vigente: hasta SESSION_END_MARGIN antes de su fin, o durante
+    LAB_STATE_TTL si no se conoce el fin.
+
+    Returns:
+        dict | None: status, observed_at y session_ends_at
+    """
+    entry = (load_json(LAB_STATE_FILE, {}) or {}).get(_key(email, lab_url))
+    if not entry or entry.get("status") != "Ready":
+        return None
+    ends = entry.get("session_ends_at")
+    if ends is None:
+        ends = entry["observed_at"] + LAB_STATE_TTL + SESSION_END_MARGIN
+    if ends - SESSION_END_MARGIN <= time.time():
+        return None
+    return entry
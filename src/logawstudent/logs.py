@@ -0,0 +1,218 @@
+# src/logawstudent/logs.py
+import atexit
+import contextlib
+import contextvars
+import json
+import queue
+import sys
+import threading
+import time
+
+# rich se importa solo si la salida es una terminal (ConsoleSink con TTY)
+
+# Niveles por estado; "done" y "error" se muestran también con --quiet
+LEVELS = {"debug": 10, "info": 20, "wait": 20, "ok": 20, "done": 30, "error": 40}
+DEFAULT_LEVEL = 20
+QUIET_LEVEL = 30
+
+ICONS = {"debug": "·", "ok": "✅", "info": "🔎", "wait": "⏳", "error": "❌", "done": "🚀"}
+COLORS = {"debug": "dim", "ok": "green", "info": "blue", "wait": "yellow", "error": "red", "done": "green"}
+
+# Campos de contexto (cuenta, trabajo del daemon...) agregados a cada registro
+_context = contextvars.ContextVar("log_context", default={})
+
+
+class ConsoleSink:
+    """
+    Escribe los registros para personas: con iconos y colores de rich si
+    `stream` es una terminal, y como texto plano si no (tubería, archivo).
+    """
+
+    def __init__(self, stream=None, level=DEFAULT_LEVEL, color=None, width=None):
+        self.stream = stream or sys.stderr
+        self.level = level
+        if color is None:
+            color = hasattr(self.stream, "isatty") and self.stream.isatty()
+        self.console = None
+        if color:
+            from rich.console import Console
+            from rich.text import Text
+            self.console = Console(file=self.stream, force_terminal=True, width=width)
+            self.text = Text
+
+    def write(self, record):
+        status = record["level"]
+        prefix = f"[{record['account']}] " if record.get("account") else ""
+        icon = ICONS.get(status, "ℹ️")
+        if self.console is not None:
+            self.console.print(self.text(f"{icon} {prefix}{record['msg']}", style=COLORS.get(status, "white")))
+        else:
+            self.stream.write(f"{icon} {prefix}{record['msg']}\n")
+
+    def flush(self):
+        try:
+            self.stream.flush()
+        except (OSError, ValueError):
+            pass
+
+
+class JsonLinesSink:
+    """Escribe un objeto JSON por registro, para consumo de otros programas."""
+
+    def __init__(self, target, level=DEFAULT_LEVEL):
+        self.level = level
+        self.stream = open(target, "a", encoding="utf-8") if isinstance(target, str) else target
+
+    def write(self, record):
+        self.stream.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+    def flush(self):
+        try:
+            self.stream.flush()
+        except (OSError, ValueError):
+            pass
+
+
+class _Pipeline:
+    """
+    Cola de registros atendida por un único hilo escritor: log() solo encola,
+    así las esperas de sondeo no bloquean en E/S de consola y las líneas de
+    varias cuentas nunca se mezclan a mitad de línea.
+    """
+
+    def __init__(self):
+        self.sinks = []
+        self.min_level = DEFAULT_LEVEL
+        self.queue = queue.Queue()
+        self.lock = threading.Lock()
+        self.writer = None
+
+    def _refresh_level(self):
+        self.min_level = min((sink.level for sink in self.sinks), default=100)
+
+    def add(self, sink):
+        with self.lock:
+            self.sinks = self.sinks + [sink]
+            self._refresh_level()
+
+    def remove(self, sink):
+        with self.lock:
+            self.sinks = [s for s in self.sinks if s is not sink]
+            self._refresh_level()
+
+    def put(self, record):
+        if self.writer is None:
+            with self.lock:
+                if self.writer is None:
+                    self.writer = threading.Thread(target=self._run, name="log-writer", daemon=True)
+                    self.writer.start()
+        self.queue.put(record)
+
+    def _run(self):
+        while True:
+            batch = [self.queue.get()]
+            while True:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            sinks = self.sinks
+            for record in batch:
+                level = LEVELS.get(record["level"], DEFAULT_LEVEL)
+                for sink in sinks:
+                    if level >= sink.level:
+                        try:
+                            sink.write(record)
+                        except Exception:
+                            pass
+            for sink in sinks:
+                sink.flush()
+            for _ in batch:
+                self.queue.task_done()
+
+    def flush(self):
+        """Espera a que se escriban los registros encolados."""
+        if self.writer is not None and threading.current_thread() is not self.writer:
+            self.queue.join()
+
+
+_pipeline = _Pipeline()
+_pipeline.add(ConsoleSink(sys.stdout))
+atexit.register(_pipeline.flush)
+
+
+def log(msg, status="info", **fields):
+    """
+    Registra un mensaje con su estado ("ok", "info", "wait", "error", "done"
+    o "debug") y el contexto actual. No bloquea: la escritura ocurre en el
+    hilo escritor.
+    """
+    if LEVELS.get(status, DEFAULT_LEVEL) < _pipeline.min_level:
+        return
+    record = {
+        "ts": round(time.time(), 3),
+        "level": status,
+        "msg": str(msg),
+        "thread": threading.current_thread().name,
+    }
+    record.update(_context.get())
+    record.update(fields)
+    _pipeline.put(record)
+
+
+def emit(record: dict, via: str = None):
+    """
+    Reemite un registro ya formado (por ejemplo, recibido del daemon).
+
+    Args:
+        via: Origen del registro; se agrega como campo "via"
+    """
+    if LEVELS.get(record.get("level"), DEFAULT_LEVEL) >= _pipeline.min_level:
+        _pipeline.put({**record, "via": via} if via else dict(record))
+
+
+@contextlib.contextmanager
+def log_context(**fields):
+    """Agrega campos (p. ej. account=email) a los registros emitidos dentro del bloque."""
+    token = _context.set({**_context.get(), **fields})
+    try:
+        yield
+    finally:
+        _context.reset(token)
+
+
+def add_sink(sink):
+    _pipeline.add(sink)
+
+
+def remove_sink(sink):
+    _pipeline.flush()
+    _pipeline.remove(sink)
+
+
+def flush():
+    """Espera a que todos los registros pendientes estén escritos."""
+    _pipeline.flush()
+
+
+def configure(quiet: bool = False, json_path: str = None, level: str = None):
+    """
+    Reemplaza los destinos por defecto según las opciones del CLI.
+
+    Args:
+        quiet: En consola, solo resultados finales ("done") y errores
+        json_path: Archivo de líneas JSON con todos los registros ("-" para
+            stdout, y entonces la consola pasa a stderr)
+        level: Nivel mínimo de consola por nombre ("debug", "info"...)
+    """
+    console_level = LEVELS.get(level, DEFAULT_LEVEL) if level else DEFAULT_LEVEL
+    if quiet:
+        console_level = max(console_level, QUIET_LEVEL)
+    sinks = [ConsoleSink(sys.stderr if json_path == "-" else sys.stdout, console_level)]
+    if json_path:
+        sinks.append(JsonLinesSink(sys.stdout if json_path == "-" else json_path,
+                                   min(console_level, DEFAULT_LEVEL)))
+    _pipeline.flush()
+    with _pipeline.lock:
+        _pipeline.sinks = sinks
+        _pipeline._refresh_level()
@@ -0,0 +1,346 @@
+# src/logawstudent/mock_server.py
+"""
+Servidor local que imita las páginas de AWS Academy usadas por LogAWStudent.
+
+    python -m logawstudent.mock_server [--port 8765] [--initial Terminated]
+                                       [--init-seconds 5] [--latency 0.05]
+
+Sirve un login tipo Canvas (pseudonym_session_unique_id, Button--login,
+error_message), una página de lab con el iframe tool_content, el lanzamiento
+LTI autoenviado y el frame del lab con #vmBtn/#vmstatus/#launchclabsbtn.
+El lab pasa de Terminated a Initializing al pulsar Start Lab y a Ready tras
+`init_seconds`; ya listo, muestra #sessiontime (Start Lab lo reinicia) y sirve credenciales de AWS
+falsas en /lab/aws (cargadas por el panel 'AWS Details'). Para usarlo, exporta LOGAWSTUDENT_CANVAS_URL con su URL.
+"""
+import argparse
+import html
+import http.server
+import secrets
+import threading
+import time
+import urllib.parse
+
+LAB_PATH = "/courses/1/modules/items/1"
+
+# Duración de una sesión del lab una vez lista
+SESSION_SECONDS = 4 * 3600
+
+_LOGIN_PAGE = """<!DOCTYPE html>
+<html><head><title>Log In to Canvas</title></head><body>
+{error}
+<form id="login_form" action="/login/canvas" method="post">
+  <input type="hidden" name="authenticity_token" value="{token}">
+  <input type="text" id="pseudonym_session_unique_id" name="pseudonym_session[unique_id]">
+  <input type="password" id="pseudonym_session_password" name="pseudonym_session[password]">
+  <button type="submit" class="Button Button--login">Log In</button>
+</form>
+</body></html>"""
+
+_LOGIN_ERROR = '<div class="error_message">Invalid username or password</div>'
+
+_DASHBOARD_PAGE = """<!DOCTYPE html>
+<html><head><title>Dashboard</title></head><body><h1>Dashboard</h1></body></html>"""
+
+_MODULE_PAGE = """<!DOCTYPE html>
+<html><head><title>Learner Lab</title></head><body>
+<iframe id="announcements" src="/static/empty"></iframe>
+<iframe id="tool_content" name="tool_content" src="/courses/1/external_tools/1?display=borderless"></iframe>
+</body></html>"""
+
+_LTI_PAGE = """<!DOCTYPE html>
+<html><body>
+<form id="tool_form" action="/lti/launch" method="POST" target="tool_content">
+  <input type="hidden" name="oauth_consumer_key" value="mock">
+  <input type="hidden" name="lti_message_type" value="basic-lti-launch-request">
+  <input type="hidden" name="resource_link_id" value="{resource}">
+</form>
+<script>document.getElementById('tool_form').submit();</script>
+</body></html>"""
+
+_LAB_PAGE = """<!DOCTYPE html>
+<html><head><title>Vocareum</title></head><body>
+<div id="vmBtn"><i id="vmstatus" aria-label="{status}" title="{status}" class="{css}"></i></div>
+<a id="launchclabsbtn" href="/lab/start">Start Lab</a>
+<a id="detailbtn2" href="#">AWS Details</a>
+<span id="sessiontime">{remaining}</span>
+<div id="clikeyboxbtn" style="display: none"></div>
+<iframe id="terminal" src="/static/empty"></iframe>
+<script>
+document.getElementById('launchclabsbtn').onclick = function() {{
+  fetch('/lab/start', {{method: 'POST', credentials: 'same-origin'}});
+  return false;
+}};
+document.getElementById('detailbtn2').onclick = function() {{
+  fetch('/lab/aws', {{credentials: 'same-origin'}}).then(function(r) {{ return r.text(); }})
+    .then(function(text) {{ document.getElementById('clikeyboxbtn').textContent = text; }});
+  return false;
+}};
+setInterval(function() {{
+  fetch('/lab/state', {{credentials: 'same-origin'}}).then(function(r) {{ return r.text(); }})
+    .then(function(status) {{
+      var el = document.getElementById('vmstatus');
+      if (el.getAttribute('aria-label') === status) return;
+      el.setAttribute('aria-label', status);
+      el.setAttribute('title', status);
+      el.setAttribute('class', 'status-' + status.toLowerCase());
+    }});
+  fetch('/lab/session', {{credentials: 'same-origin'}}).then(function(r) {{ return r.text(); }})
+    .then(function(text) {{ document.getElementById('sessiontime').textContent = text; }});
+}}, 500);
+</script>
+</body></html>"""
+
+_AWS_DETAILS = """Cloud Access
+AWS CLI:
+[default]
+aws_access_key_id={key}
+aws_secret_access_key={secret}
+aws_session_token={token}
+
+AWS Console: https://signin.aws.amazon.com/federation?Action=login&Issuer=mock&Destination=https%3A%2F%2Fconsole.aws.amazon.com%2F&SigninToken={signin}
+"""
+
+
+class LabState:
+    """Máquina de estados del lab: Terminated → Initializing → Ready."""
+
+    def __init__(self, initial="Terminated", init_seconds=5.0):
+        self.initial = initial
+        self.init_seconds = init_seconds
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self, status=None):
+        with self.lock:
+            self._status = status or self.initial
+            if self._status == "Initializing":
+                self.ready_at = time.time() + self.init_seconds
+            else:
+                self.ready_at = time.time() if self._status == "Ready" else None
+
+    @property
+    def status(self):
+        with self.lock:
+            if self._status == "Initializing" and time.time() >= self.ready_at:
+                self._status = "Ready"
+            return self._status
+
+    @property
+    def remaining(self):
+        """Segundos que le quedan a la sesión ('Ready'), 0 en otro estado."""
+        if self.status != "Ready":
+            return 0
+        return max(0, int(self.ready_at + SESSION_SECONDS - time.time()))
+
+    def start(self):
+        """Equivale a pulsar Start Lab: arranca si está detenido y reinicia la sesión si está listo."""
+        ready = self.status == "Ready"
+        with self.lock:
+            if self._status == "Terminated":
+                self._status = "Initializing"
+                self.ready_at = time.time() + self.init_seconds
+            elif ready:
+                self.ready_at = time.time()
+
+
+class _Handler(http.server.BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    @property
+    def mock(self):
+        return self.server.mock
+
+    def _cookies(self):
+        cookies = {}
+        for part in (self.headers.get("Cookie") or "").split(";"):
+            if "=" in part:
+                key, value = part.strip().split("=", 1)
+                cookies[key] = value
+        return cookies
+
+    def _form(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        return {k: v[-1] for k, v in urllib.parse.parse_qs(self.rfile.read(length).decode()).items()}
+
+    def _send(self, body="", status=200, headers=(), content_type="text/html; charset=utf-8"):
+        if self.mock.latency:
+            time.sleep(self.mock.latency)
+        self.mock.requests += 1
+        data = body.encode()
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        for key, value in headers:
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _redirect(self, location, headers=()):
+        self._send("", 302, (("Location", location),) + tuple(headers))
+
+    def _logged_in(self):
+        return self._cookies().get("canvas_session") in self.mock.sessions
+
+    def _login_page(self, error=False, status=200):
+        token = secrets.token_hex(16)
+        self.mock.tokens.add(token)
+        self._send(_LOGIN_PAGE.format(token=token, error=_LOGIN_ERROR if error else ""), status)
+
+    def do_GET(self):
+        path = urllib.parse.urlparse(self.path).path
+        if path == "/login/canvas":
+            return self._login_page()
+        if path == "/static/empty":
+            return self._send("<!DOCTYPE html><html><body></body></html>")
+        if path in ("/lab", "/lab/state", "/lab/session", "/lab/start", "/lab/aws"):
+            return self._lab(path)
+        if not self._logged_in():
+            return self._redirect("/login/canvas")
+        if path == "/":
+            return self._send(_DASHBOARD_PAGE)
+        if path == LAB_PATH:
+            return self._send(_MODULE_PAGE)
+        if path == "/courses/1/external_tools/1":
+            return self._send(_LTI_PAGE.format(resource=secrets.token_hex(4)))
+        self._send("Not Found", 404)
+
+    def do_POST(self):
+        path = urllib.parse.urlparse(self.path).path
+        if path == "/login/canvas":
+            form = self._form()
+            valid_token = form.get("authenticity_token") in self.mock.tokens
+            if (valid_token and form.get("pseudonym_session[unique_id]") == self.mock.email
+                    and form.get("pseudonym_session[password]") == self.mock.password):
+                session = secrets.token_hex(16)
+                self.mock.sessions.add(session)
+                return self._redirect("/?login_success=1",
+                                      [("Set-Cookie", f"canvas_session={session}; Path=/; HttpOnly")])
+            return self._login_page(error=True, status=400)
+        if path == "/lti/launch":
+            self._form()
+            if not self._logged_in():
+                return self._send("Unauthorized", 401)
+            lab_session = secrets.token_hex(16)
+            self.mock.lab_sessions.add(lab_session)
+            return self._redirect("/lab", [("Set-Cookie", f"lab_session={lab_session}; Path=/")])
+        if path == "/lab/start":
+            self._form()
+            return self._lab(path)
+        self._send("Not Found", 404)
+
+    def _lab(self, path):
+        if self._cookies().get("lab_session") not in self.mock.lab_sessions:
+            return self._send("Unauthorized", 401)
+        if path == "/lab/start":
+            self.mock.lab.start()
+            return self._send("OK", content_type="text/plain")
+        status = self.mock.lab.status
+        if path == "/lab/state":
+            return self._send(status, content_type="text/plain")
+        if path == "/lab/aws":
+            if status != "Ready":
+                return self._send("Lab not ready", 409, content_type="text/plain")
+            return self._send(_AWS_DETAILS.format(**self.mock.aws), content_type="text/plain")
+        remaining = self.mock.lab.remaining
+        remaining = f"{remaining // 3600:02d}:{remaining % 3600 // 60:02d}:{remaining % 60:02d}"
+        if path == "/lab/session":
+            return self._send(remaining, content_type="text/plain")
+        self._send(_LAB_PAGE.format(
+            status=html.escape(status), css=f"status-{status.lower()}", remaining=remaining,
+        ))
+
+
+class MockServer:
+    """
+    Servidor simulado de AWS Academy en un hilo de fondo.
+
+    Args:
+        email, password: Credenciales aceptadas por el login
+        initial: Estado inicial del lab
+        init_seconds: Segundos que dura 'Initializing'
+        latency: Retraso artificial por respuesta, en segundos
+    """
+
+    def __init__(self, email="student@example.com", password="password", initial="Terminated",
+                 init_seconds=5.0, latency=0.0, host="127.0.0.1", port=0):
+        self.email = email
+        self.password = password
+        self.latency = latency
+        self.lab = LabState(initial, init_seconds)
+        self.tokens = set()
+        self.sessions = set()
+        self.lab_sessions = set()
+        self.requests = 0
+        self.aws = {
+            "key": "ASIA" + secrets.token_hex(8).upper(),
+            "secret": secrets.token_urlsafe(30).replace("-", "+").replace("_", "/"),
+            "token": secrets.token_urlsafe(150).replace("-", "+").replace("_", "/"),
+            "signin": secrets.token_urlsafe(24),
+        }
+        self.httpd = http.server.ThreadingHTTPServer((host, port), _Handler)
+        self.httpd.daemon_threads = True
+        self.httpd.mock = self
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def lab_url(self):
+        return self.url + LAB_PATH
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def reset(self, status=None, sessions=True):
+        """Reinicia el lab (y opcionalmente invalida las sesiones) entre corridas."""
+        self.lab.reset(status)
+        self.requests = 0
+        if sessions:
+            self.sessions.clear()
+            self.lab_sessions.clear()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m logawstudent.mock_server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--email", default="student@example.com")
+    parser.add_argument("--password", default="password")
+    parser.add_argument("--initial", default="Terminated", choices=["Terminated", "Initializing", "Ready"])
+    parser.add_argument("--init-seconds", type=float, default=5.0)
+    parser.add_argument("--latency", type=float, default=0.0)
+    args = parser.parse_args(argv)
+
+    server = MockServer(args.email, args.password, args.initial, args.init_seconds,
+                        args.latency, args.host, args.port)
+    print(f"Servidor simulado en {server.url}")
+    print(f"  LOGAWSTUDENT_CANVAS_URL={server.url}")
+    print(f"  LAB_URL={server.lab_url}")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+# src/logawstudent/prewarm.py
+import datetime
+import statistics
+import time
+from .utils import CONFIG_DIR, load_json, update_json, validate_credentials
+from .logs import log
+from .schedule import typical_ready_time
+from .profiling import current_trace, start_trace, stop_trace, phase
+
+# Selenium (core) se importa recién al lanzar, así la espera no carga el navegador
+
+
+# Segundos desde que se lanza Chrome hasta la primera lectura del estado del lab
+PREWARM_HISTORY_FILE = CONFIG_DIR / "prewarm_history.json"
+PREWARM_HISTORY_SIZE = 20
+
+# Estimaciones sin historial: arranque (Chrome, login, navegación) y Start Lab → Ready
+DEFAULT_STARTUP = 40
+DEFAULT_READY = 180
+
+# El lab debe quedar listo este tiempo antes de la hora objetivo
+READY_MARGIN = 30
+
+# Intervalo máximo de sueño; se recalcula con el reloj por si el equipo se suspende
+MAX_SLEEP = 60
+
+
+def parse_target(text: str, now: float = None) -> float:
+    """
+    Convierte 'HH:MM' en la próxima ocurrencia de esa hora local.
+
+    Returns:
+        float: Timestamp de la hora objetivo (hoy, o mañana si ya pasó)
+
+    Raises:
+        ValueError: Si el texto no tiene el formato HH:MM
+    """
+    try:
+        hour, minute = (int(part) for part in text.strip().split(":"))
+        clock = datetime.time(hour, minute)
+    except (TypeError, ValueError):
+        raise ValueError(f"Hora inválida '{text}', usa el formato HH:MM")
+    current = datetime.datetime.fromtimestamp(now if now is not None else time.time())
+    target = datetime.datetime.combine(current.date(), clock)
+    if target <= current:
+        target += datetime.timedelta(days=1)
+    return target.timestamp()
+
+
+def record_startup_time(seconds: float):
+    """Agrega al historial cuánto tardó el arranque hasta leer el estado del lab."""
+    update_json(PREWARM_HISTORY_FILE,
+                lambda history: ((history or []) + [round(seconds, 2)])[-PREWARM_HISTORY_SIZE:], [])
+
+
+def typical_startup_time():
+    """Mediana del historial de arranque, o None si aún no hay datos."""
+    history = load_json(PREWARM_HISTORY_FILE, []) or []
+    return statistics.median(history) if history else None
+
+
+def plan_launch(target: float) -> dict:
+    """
+    Calcula cuándo lanzar para que el lab quede listo READY_MARGIN antes de
+    `target`, suponiendo que habrá que pulsar Start Lab.
+
+    Returns:
+        dict: target, startup, ready, lead (segundos) y launch_at (timestamp)
+    """
+    startup = typical_startup_time() or DEFAULT_STARTUP
+    ready = typical_ready_time() or DEFAULT_READY
+    lead = startup + ready + READY_MARGIN
+    return {"target": target, "startup": startup, "ready": ready, "lead": lead,
+            "launch_at": target - lead}
+
+
+def sleep_until(timestamp: float):
+    """Duerme hasta `timestamp` en tramos de como mucho MAX_SLEEP segundos."""
+    while True:
+        remaining = timestamp - time.time()
+        if remaining <= 0:
+            return
+        time.sleep(min(remaining, MAX_SLEEP))
+
+
+def _phase_offsets(tracer, since: float) -> dict:
+    """Fin de la primera lectura de estado y del clic en Start Lab, relativos a `since`."""
+    offsets = {}
+    for row in tracer.summary():
+        if row["start"] >= since and row["phase"] in ("first_status_read", "start_lab_click"):
+            offsets[row["phase"]] = row["end"] - since
+    return offsets
+
+
+def _clock(timestamp: float) -> str:
+    return time.strftime("%H:%M:%S", time.localtime(timestamp))
+
+
+def prewarm(ready_by: str, engine: str = "selenium", persist_profile: bool = False) -> bool:
+    """
+    Espera y lanza el laboratorio a tiempo para que esté listo antes de la
+    hora `ready_by` (HH:MM), según el historial de arranque y de Start Lab →
+    Ready. Al terminar, informa la desviación respecto de la predicción.
+
+    Returns:
+        bool: True si el lab quedó listo
+    """
+    from .lab_state import cached_ready
+    try:
+        target = parse_target(ready_by)
+        creds = validate_credentials()
+    except ValueError as e:
+        log(str(e), "error")
+        return False
+
+    entry = cached_ready(creds["EMAIL"], creds["LAB_URL"])
+    if entry and entry.get("session_ends_at") and entry["session_ends_at"] > target:
+        log(f"El laboratorio ya está listo y su sesión dura hasta las {_clock(entry['session_ends_at'])}", "ok")
+        return True
+
+    plan = plan_launch(target)
+    log(f"Objetivo: listo antes de las {_clock(target)} · arranque ~{plan['startup']:.0f} s "
+        f"+ Start Lab → Ready ~{plan['ready']:.0f} s + margen {READY_MARGIN} s", "info")
+    if plan["launch_at"] > time.time():
+        log(f"Esperando hasta las {_clock(plan['launch_at'])} para lanzar...", "wait")
+        sleep_until(plan["launch_at"])
+    else:
+        log("La hora de lanzamiento ya pasó, lanzando ahora", "wait")
+
+    from .core import launch_lab
+    own_trace = current_trace() is None
+    tracer = start_trace() if own_trace else current_trace()
+    launched = time.time()
+    try:
+        with phase("prewarm_launch") as span:
+            success = launch_lab(engine, persist_profile=persist_profile)
+    finally:
+        if own_trace:
+            stop_trace()
+
+    if not success:
+        return False
+
+    # El lab quedó listo cuando se registró 'Ready', no al cerrar Chrome
+    # (después vienen la captura de credenciales y el cierre del navegador)
+    entry = cached_ready(creds["EMAIL"], creds["LAB_URL"])
+    finished = entry["observed_at"] if entry and entry["observed_at"] >= launched else time.time()
+
+    offsets = _phase_offsets(tracer, span.start)
+    if "first_status_read" in offsets:
+        record_startup_time(offsets["first_status_read"])
+
+    # Predicción ajustada a la hora real de lanzamiento, por si se lanzó tarde
+    predicted = launched + plan["startup"] + (plan["ready"] if "start_lab_click" in offsets else 0)
+    error = finished - predicted
+    slack = target - finished
+    log(f"Laboratorio listo a las {_clock(finished)}, "
+        + (f"{slack:.0f} s antes de las {_clock(target)}" if slack >= 0
+           else f"{-slack:.0f} s después de las {_clock(target)}"), "done" if slack >= 0 else "error")
+    log(f"Desviación de la predicción: {error:+.0f} s (previsto {predicted - launched:.0f} s, "
+        f"real {finished - launched:.0f} s"
+        + (f", arranque {offsets['first_status_read']:.0f} s" if "first_status_read" in offsets else "")
+        + ")", "info")
+    return True
@@ -0,0 +1,234 @@
+# src/logawstudent/probes.py
+from .utils import CONFIG_DIR, load_json
+
+# Cada decisión (resultado del login, error de autenticación, estado del lab,
+# botón Start Lab...) es una función de PROBE_JS que se resuelve con un solo
+# execute_script y retorna un objeto con el resultado y la versión de selectores.
+
+# Versión del esquema de selectores; un selectors.json con otra versión se ignora
+SELECTORS_VERSION = 1
+
+# Selectores alternativos (por ejemplo, si Canvas o Vocareum cambian su HTML)
+SELECTORS_FILE = CONFIG_DIR / "selectors.json"
+
+SELECTORS = {
+    "version": SELECTORS_VERSION,
+    "login": {
+        "email": "#pseudonym_session_unique_id",
+        "password": "#pseudonym_session_password",
+        "submit": ".Button--login",
+        "error": ".error_message",
+    },
+    "auth_error": {
+        "elements": [
+            ".error_message", ".alert-error",
+            ".login-error", ".auth-error", ".invalid-credentials",
+            "[class*='error']", "[class*='invalid']",
+        ],
+        "words": [
+            "invalid", "incorrect", "wrong", "failed", "denied",
+            "login failed", "authentication failed", "access denied",
+            "credentials", "password", "username",
+        ],
+        "url_tokens": [
+            "error", "400", "401", "403", "unauthorized", "forbidden",
+            "login_failed", "authentication_failed", "access_denied",
+        ],
+    },
+    "lab": {
+        "button": "#vmBtn",
+        "status": "#vmstatus",
+        "start": "#launchclabsbtn",
+        "details": "#detailbtn2",
+        "session_time": "#sessiontime",
+    },
+}
+
+# Biblioteca de sondas: arguments = (nombre, selectores, opciones). Los
+# documentos de iframes del mismo origen se recorren desde el contexto actual;
+# los de otro origen los resuelve FrameLocator cambiando de frame. Las sondas
+# del lab retornan null si el contexto no contiene sus controles.
+PROBE_JS = """
+var name = arguments[0], S = arguments[1], opts = arguments[2] || {};
+var L = S.lab;
+
+function documents(root, out) {
+  out.push(root);
+  var frames = root.querySelectorAll('iframe, frame');
+  for (var i = 0; i < frames.length; i++) {
+    var child = null;
+    try { child = frames[i].contentDocument; } catch (e) {}
+    if (child && child.documentElement) documents(child, out);
+  }
+  return out;
+}
+
+function visible(el) {
+  if (!el.getClientRects().length) return false;
+  var style = el.ownerDocument.defaultView.getComputedStyle(el);
+  return style.visibility !== 'hidden' && style.display !== 'none';
+}
+
+function text(el) {
+  return (el.innerText || el.textContent || '').trim();
+}
+
+function labDocument() {
+  var docs = documents(document, []);
+  for (var i = 0; i < docs.length; i++) {
+    var d = docs[i];
+    if (d.querySelector(L.button) || d.querySelector(L.status) || d.querySelector(L.start)) return d;
+  }
+  return null;
+}
+
+function labStatus(d) {
+  var btn = d.querySelector(L.button);
+  var el = (btn && btn.querySelector(L.status)) || d.querySelector(L.status);
+  if (!el) return '';
+  return el.getAttribute('aria-label') || el.getAttribute('title') || el.getAttribute('class') || '';
+}
+
+function startState(d) {
+  var btn = d.querySelector(L.start);
+  if (!btn) return 'missing';
+  if (btn.disabled) return 'disabled';
+  return visible(btn) ? 'available' : 'hidden';
+}
+
+var probes = {
+  login_outcome: function() {
+    var url = location.href;
+    if (url.indexOf('login_success=1') >= 0) return {outcome: 'success', url: url};
+    if (location.host === opts.host && location.pathname.indexOf('/login') !== 0) {
+      return {outcome: 'success', url: url};
+    }
+    var docs = documents(document, []);
+    for (var i = 0; i < docs.length; i++) {
+      var errors = docs[i].querySelectorAll(S.login.error);
+      for (var j = 0; j < errors.length; j++) {
+        if (visible(errors[j])) return {outcome: 'error', url: url, text: text(errors[j]).slice(0, 200)};
+      }
+    }
+    return {outcome: null, url: url};
+  },
+
+  auth_error: function() {
+    var A = S.auth_error, url = location.href.toLowerCase();
+    var result = {error: false, reason: null, url: url, login_page: location.pathname.indexOf('/login') === 0};
+    if (url.indexOf('login_success=1') >= 0) return result;
+    if (opts.host && url.indexOf(opts.host.toLowerCase()) >= 0 && url.indexOf('login') < 0) return result;
+    for (var t = 0; t < A.url_tokens.length; t++) {
+      if (url.indexOf(A.url_tokens[t]) >= 0) {
+        result.error = true;
+        result.reason = 'url:' + A.url_tokens[t];
+        return result;
+      }
+    }
+    var docs = documents(document, []);
+    for (var s = 0; s < A.elements.length; s++) {
+      for (var i = 0; i < docs.length; i++) {
+        var found = docs[i].querySelectorAll(A.elements[s]);
+        for (var j = 0; j < found.length; j++) {
+          if (!visible(found[j])) continue;
+          var content = text(found[j]).toLowerCase();
+          for (var w = 0; content && w < A.words.length; w++) {
+            if (content.indexOf(A.words[w]) >= 0) {
+              result.error = true;
+              result.reason = 'element:' + A.elements[s];
+              result.text = content.slice(0, 200);
+              return result;
+            }
+          }
+        }
+      }
+    }
+    return result;
+  },
+
+  lab_markers: function() {
+    return labDocument() ? {lab: true} : null;
+  },
+
+  lab_status: function() {
+    var d = labDocument();
+    return d && {status: labStatus(d).trim(), start: startState(d)};
+  },
+
+  click_start: function() {
+    var d = labDocument();
+    if (!d) return null;
+    var state = startState(d);
+    if (state === 'available') d.querySelector(L.start).click();
+    return {clicked: state === 'available', start: state, status: labStatus(d).trim()};
+  },
+
+  session_remaining: function() {
+    var d = labDocument();
+    if (!d || !(d.querySelector(L.button) || d.querySelector(L.status))) return null;
+    var el = d.querySelector(L.session_time);
+    var raw = el ? el.textContent
+      : ((d.body ? d.body.textContent : '').match(/Remaining session time:?[^0-9]*[0-9:]+/i) || [''])[0];
+    var m = raw.match(/(\\d{1,2}):(\\d{2})(?::(\\d{2}))?/);
+    if (!m) return {seconds: -1};
+    return {seconds: (+m[1]) * 3600 + (+m[2]) * 60 + (m[3] === undefined ? 0 : +m[3])};
+  },
+
+  show_details: function() {
+    var d = labDocument();
+    if (!d || !(d.querySelector(L.button) || d.querySelector(L.status))) return null;
+    var btn = d.querySelector(L.details) || Array.prototype.find.call(
+      d.querySelectorAll('a, button'), function(b) { return /AWS Details/i.test(b.textContent); });
+    if (btn) btn.click();
+    return {clicked: !!btn};
+  },
+
+  credentials_text: function() {
+    var d = labDocument();
+    if (!d || !(d.querySelector(L.button) || d.querySelector(L.status))) return null;
+    var content = d.documentElement.textContent || '';
+    var i = content.indexOf('aws_access_key_id');
+    var links = Array.prototype.map.call(d.querySelectorAll('a[href]'), function(a) { return a.href; });
+    return {text: (i >= 0 ? content.slice(i, i + 4096) : '') + '\\n' + links.join('\\n')};
+  }
+};
+
+var result = probes[name]();
+if (result) result.v = S.version;
+return result;
+"""
+
+_selectors = None
+
+
+def load_selectors() -> dict:
+    """
+    Selectores vigentes: los incorporados, con cada sección reemplazada por la
+    de selectors.json si su versión coincide con SELECTORS_VERSION.
+    """
+    global _selectors
+    if _selectors is None:
+        selectors = {key: value for key, value in SELECTORS.items()}
+        override = load_json(SELECTORS_FILE, {}) or {}
+        if override.get("version") == SELECTORS_VERSION:
+            for section, values in override.items():
+                if isinstance(values, dict) and section in selectors:
+                    selectors[section] = {**selectors[section], **values}
+        _selectors = selectors
+    return _selectors
+
+
+def probe(driver, name: str, **options):
+    """
+    Ejecuta una sonda en el contexto actual del driver (un solo round-trip).
+
+    Returns:
+        dict | None: Resultado estructurado de la sonda (incluye "v", la
+        versión de selectores), o None si no aplica al contexto actual
+    """
+    return driver.execute_script(PROBE_JS, name, load_selectors(), options)
+
+
+def probe_frame(locator, name: str, **options):
+    """Ejecuta una sonda del lab en el frame que localiza `locator` (FrameLocator)."""
+    return locator.run(PROBE_JS, name, load_selectors(), options)
@@ -0,0 +1,158 @@
+# src/logawstudent/profiling.py
+import functools
+import json
+import threading
+import time
+
+# Tracer activo; None cuando el perfilado está desactivado (caso normal)
+_tracer = None
+
+
+class Tracer:
+    """Registra fases con marcas de inicio/fin y los comandos WebDriver de cada una."""
+
+    def __init__(self):
+        self.origin = time.perf_counter()
+        self.started_at = time.time()
+        self.spans = []
+        self.commands = 0
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def _stack(self):
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def count_command(self):
+        """Suma un comando WebDriver a todas las fases abiertas en este hilo."""
+        self.commands += 1
+        for span in self._stack():
+            span.commands += 1
+
+    def record(self, span):
+        with self._lock:
+            self.spans.append(span)
+
+    def summary(self) -> list:
+        """
+        Agrupa las fases por nombre en orden de aparición.
+
+        Returns:
+            list: dicts con phase, calls, start, end, seconds, commands y thread
+        """
+        rows = {}
+        for span in sorted(self.spans, key=lambda s: s.start):
+            row = rows.setdefault(span.name, {
+                "phase": span.name, "calls": 0, "start": span.start,
+                "end": span.end, "seconds": 0.0, "commands": 0, "thread": span.thread,
+            })
+            row["calls"] += 1
+            row["end"] = max(row["end"], span.end)
+            row["seconds"] += span.end - span.start
+            row["commands"] += span.commands
+        return list(rows.values())
+
+    def write_jsonl(self, path):
+        """Escribe una línea JSON por fase, con tiempos relativos al inicio."""
+        with open(path, "a") as f:
+            for span in sorted(self.spans, key=lambda s: s.start):
+                f.write(json.dumps({
+                    "run": self.started_at,
+                    "phase": span.name,
+                    "start": round(span.start, 6),
+                    "end": round(span.end, 6),
+                    "seconds": round(span.end - span.start, 6),
+                    "commands": span.commands,
+                    "thread": span.thread,
+                }) + "\n")
+
+
+class _Span:
+    def __init__(self, tracer, name):
+        self.tracer = tracer
+        self.name = name
+        self.commands = 0
+        self.start = self.end = 0.0
+        self.thread = threading.current_thread().name
+
+    def __enter__(self):
+        self.start = time.perf_counter() - self.tracer.origin
+        self.tracer._stack().append(self)
+        return self
+
+    def __exit__(self, *exc):
+        self.end = time.perf_counter() - self.tracer.origin
+        stack = self.tracer._stack()
+        if stack and stack[-1] is self:
+            stack.pop()
+        self.tracer.record(self)
+
+
+class _NullSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+def phase(name):
+    """Context manager que registra una fase si el perfilado está activo."""
+    tracer = _tracer
+    if tracer is None:
+        return _NULL_SPAN
+    return _Span(tracer, name)
+
+
+def traced(name):
+    """Decorador que registra cada llamada a la función como una fase."""
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            tracer = _tracer
+            if tracer is None:
+                return fn(*args, **kwargs)
+            with _Span(tracer, name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def instrument_driver(driver):
+    """Cuenta los comandos WebDriver del driver mientras haya un tracer activo."""
+    if _tracer is None:
+        return driver
+    execute = driver.execute
+
+    def counted_execute(driver_command, params=None):
+        tracer = _tracer
+        if tracer is not None:
+            tracer.count_command()
+        return execute(driver_command, params)
+
+    driver.execute = counted_execute
+    return driver
+
+
+def start_trace() -> Tracer:
+    """Activa el perfilado para el proceso actual."""
+    global _tracer
+    _tracer = Tracer()
+    return _tracer
+
+
+def current_trace():
+    """Tracer activo, o None si el perfilado está desactivado."""
+    return _tracer
+
+
+def stop_trace():
+    """Desactiva el perfilado y retorna el tracer con las fases registradas."""
+    global _tracer
+    tracer, _tracer = _tracer, None
+    return tracer
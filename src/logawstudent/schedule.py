@@ -0,0 +1,131 @@
+# src/logawstudent/schedule.py
+import statistics
+import time
+from .utils import CONFIG_DIR, load_json, update_json
+
+# Segundos que tardaron los últimos labs en pasar de Start Lab a 'Ready'
+READY_HISTORY_FILE = CONFIG_DIR / "ready_history.json"
+READY_HISTORY_SIZE = 20
+
+# Intervalos de sondeo: rápido tras una acción, lento en esperas largas
+FAST_INTERVAL = 0.1
+SLOW_INTERVAL = 3.0
+
+# Crecimiento del intervalo por segundo transcurrido desde la última acción
+BACKOFF_RATE = 0.1
+
+# Ventana alrededor del tiempo típico de 'Ready' en la que se vuelve a sondear rápido
+READY_WINDOW = 5.0
+
+def record_ready_time(seconds: float):
+    """Agrega al historial cuánto tardó un lab en quedar listo tras Start Lab."""
+    update_json(READY_HISTORY_FILE,
+                lambda history: ((history or []) + [round(seconds, 2)])[-READY_HISTORY_SIZE:], [])
+
+
+def ready_history() -> list:
+    return load_json(READY_HISTORY_FILE, []) or []
+
+
+def typical_ready_time():
+    """Mediana del historial de arranque, o None si aún no hay datos."""
+    history = ready_history()
+    return statistics.median(history) if history else None
+
+
+class WaitScheduler:
+    """
+    Plazo global de una operación que reparte presupuestos a cada etapa.
+
+    Las etapas piden su parte con child(limit), que nunca supera el plazo del
+    padre, y esperan con sleep() o until(), que eligen el intervalo según el
+    tiempo desde la última acción (mark): rápido justo después, cada vez más
+    espaciado en esperas largas y de nuevo rápido cerca del tiempo típico en
+    que la acción suele completarse.
+    """
+
+    def __init__(self, total: float, fast=FAST_INTERVAL, slow=SLOW_INTERVAL, parent=None):
+        now = time.monotonic()
+        self.deadline = now + total
+        if parent is not None:
+            self.deadline = min(self.deadline, parent.deadline)
+        self.fast = fast
+        self.slow = slow
+        self.parent = parent
+        self.marked = parent.marked if parent else None
+        self.marked_at = parent.marked_at if parent else now
+        self.expected = parent.expected if parent else None
+
+    def remaining(self) -> float:
+        return max(0.0, self.deadline - time.monotonic())
+
+    @property
+    def expired(self) -> bool:
+        return self.remaining() <= 0
+
+    def budget(self, limit=None) -> float:
+        """Segundos disponibles para una etapa, acotados por `limit`."""
+        remaining = self.remaining()
+        return remaining if limit is None else min(limit, remaining)
+
+    def child(self, limit=None, **kwargs):
+        """Sub-plazo para una etapa; hereda la última acción marcada."""
+        kwargs.setdefault("fast", self.fast)
+        kwargs.setdefault("slow", self.slow)
+        return WaitScheduler(self.budget(limit), parent=self, **kwargs)
+
+    def mark(self, action: str, expected=None):
+        """
+        Registra una acción (clic, envío de formulario) para volver a sondear rápido.
+
+        Args:
+            expected: Segundos que suele tardar en notarse su efecto
+        """
+        scheduler = self
+        now = time.monotonic()
+        while scheduler is not None:
+            scheduler.marked, scheduler.marked_at, scheduler.expected = action, now, expected
+            scheduler = scheduler.parent
+
+    def since_mark(self) -> float:
+        return time.monotonic() - self.marked_at
+
+    def interval(self) -> float:
+        """Intervalo de sondeo adaptativo, nunca mayor que el tiempo restante."""
+        since = self.since_mark()
+        interval = min(self.slow, self.fast + since * BACKOFF_RATE)
+        if self.expected is not None:
+            eta = self.expected - since
+            if -READY_WINDOW <= eta <= READY_WINDOW:
+                interval = min(interval, 2 * self.fast)
+            elif 0 < eta < interval + READY_WINDOW:
+                interval = min(interval, eta - READY_WINDOW)
+        return max(0.0, min(interval, self.remaining()))
+
+    def sleep(self) -> bool:
+        """Espera un intervalo; retorna False (sin esperar) si el plazo ya venció."""
+        if self.expired:
+            return False
+        time.sleep(self.interval())
+        return True
+
+    def until(self, condition, limit=None, ignored=()):
+        """
+        Evalúa `condition()` hasta que retorne un valor verdadero o se agote
+        el presupuesto.
+
+        Args:
+            limit: Presupuesto máximo de esta espera (por defecto, todo el restante)
+            ignored: Excepciones que se tratan como "aún no"
+
+        Returns:
+            El último valor de `condition()` (falso si venció el plazo)
+        """
+        scheduler = self.child(limit) if limit is not None else self
+        while True:
+            try:
+                result = condition()
+            except ignored:
+                result = None
+            if result or not scheduler.sleep():
+                return result
@@ -0,0 +1,70 @@
+# src/logawstudent/session.py
+import time
+import threading
+from .utils import CONFIG_DIR, load_json, save_json
+
+SESSIONS_FILE = CONFIG_DIR / "sessions.json"
+
+# Vida máxima de una sesión guardada cuando sus cookies no declaran expiración
+SESSION_TTL = 8 * 3600
+
+# Campos de cookie aceptados por Network.setCookies / Storage.setCookies
+COOKIE_FIELDS = ("name", "value", "domain", "path", "secure", "httpOnly", "sameSite", "expires")
+
+# Serializa lectura-modificación-escritura cuando varias cuentas corren en paralelo
+_lock = threading.Lock()
+
+
+def _session_expiry(cookies, saved_at):
+    """Calcula la expiración de la sesión a partir de las cookies guardadas."""
+    expiry = saved_at + SESSION_TTL
+    for cookie in cookies:
+        expires = cookie.get("expires", -1)
+        if expires and expires > 0:
+            expiry = min(expiry, expires)
+    return expiry
+
+
+def save_session(email: str, cookies: list):
+    """Guarda las cookies de una sesión exitosa asociadas al email."""
+    if not email or not cookies:
+        return
+    with _lock:
+        sessions = load_json(SESSIONS_FILE, {})
+        saved_at = time.time()
+        sessions[email] = {
+            "cookies": cookies,
+            "saved_at": saved_at,
+            "expires_at": _session_expiry(cookies, saved_at),
+        }
+        save_json(SESSIONS_FILE, sessions)
+
+
+def load_session(email: str):
+    """
+    Retorna las cookies guardadas para el email si la sesión no ha expirado.
+
+    Returns:
+        list | None: Cookies en formato CDP, o None si no hay sesión válida
+    """
+    sessions = load_json(SESSIONS_FILE, {})
+    entry = sessions.get(email)
+    if not entry:
+        return None
+    if entry.get("expires_at", 0) <= time.time():
+        clear_session(email)
+        return None
+    return entry.get("cookies") or None
+
+
+def clear_session(email: str = None):
+    """Elimina la sesión guardada de un email, o todas si no se indica."""
+    with _lock:
+        sessions = load_json(SESSIONS_FILE, {})
+        if email is None:
+            sessions = {}
+        elif email in sessions:
+            del sessions[email]
+        else:
+            return
+        save_json(SESSIONS_FILE, sessions)
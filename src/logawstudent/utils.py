@@ -1,11 +1,25 @@
 # src/logawstudent/utils.py
 import os
+import json
+import tempfile
+import threading
 from pathlib import Path
-from dotenv import load_dotenv
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+    import msvcrt
 
 # Rutas para archivos .env
 LOCAL_ENV = Path(".env")
-GLOBAL_ENV = Path.home() / ".config" / "logawstudent" / ".env"
+# Directorio de configuración y cachés; se puede aislar (p. ej. en el benchmark)
+CONFIG_DIR = Path(os.environ.get("LOGAWSTUDENT_CONFIG_DIR") or Path.home() / ".config" / "logawstudent")
+GLOBAL_ENV = CONFIG_DIR / ".env"
+CONFIG_LOCK = CONFIG_DIR / ".env.lock"
+
+# URL base de Canvas; se puede apuntar a un servidor local de pruebas
+CANVAS_URL = os.environ.get("LOGAWSTUDENT_CANVAS_URL", "https://awsacademy.instructure.com").rstrip("/")
 
 def get_env_file():
     """Retorna la ruta del archivo .env a usar (local tiene prioridad sobre global)."""
@@ -18,83 +32,200 @@ def ensure_global_config_dir():
     global_dir = GLOBAL_ENV.parent
     global_dir.mkdir(parents=True, exist_ok=True)
 
+def load_json(path, default=None):
+    """Lee un archivo JSON de caché; retorna `default` si no existe o está corrupto."""
+    try:
+        with open(path, "r") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return default
+
+def atomic_write(path, text):
+    """Escribe un archivo de forma atómica (temporal + rename) con permisos 0600."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.")
+    try:
+        with os.fdopen(fd, "w") as f:
+            f.write(text)
+        os.chmod(tmp_path, 0o600)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+def save_json(path, data):
+    """Escribe un archivo JSON de forma atómica y con permisos solo para el usuario."""
+    atomic_write(path, json.dumps(data))
+
+def update_json(path, update, default=None):
+    """
+    Lee, modifica con `update(data)` y reescribe un archivo JSON bajo un
+    FileLock, para que varios procesos no pisen sus escrituras.
+
+    Returns:
+        El valor escrito
+    """
+    path = Path(path)
+    with FileLock(path.with_name(f".{path.name}.lock")):
+        data = update(load_json(path, default))
+        save_json(path, data)
+    return data
+
+
+class FileLock:
+    """Lock exclusivo entre procesos basado en un archivo (fcntl o msvcrt)."""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self._file = None
+
+    def acquire(self, blocking=True) -> bool:
+        """Toma el lock; con blocking=False retorna False si otro proceso lo tiene."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        f = open(self.path, "a+")
+        try:
+            if fcntl:
+                fcntl.flock(f, fcntl.LOCK_EX | (0 if blocking else fcntl.LOCK_NB))
+            else:
+                msvcrt.locking(f.fileno(), msvcrt.LK_LOCK if blocking else msvcrt.LK_NBLCK, 1)
+        except OSError:
+            f.close()
+            return False
+        self._file = f
+        return True
+
+    def release(self):
+        if self._file:
+            try:
+                if fcntl:
+                    fcntl.flock(self._file, fcntl.LOCK_UN)
+                else:
+                    self._file.seek(0)
+                    msvcrt.locking(self._file.fileno(), msvcrt.LK_UNLCK, 1)
+            finally:
+                self._file.close()
+                self._file = None
+
+    def __enter__(self):
+        """Toma el lock bloqueando; nunca entra a la sección crítica sin tenerlo."""
+        if not self.acquire():
+            raise OSError(f"No se pudo tomar el lock {self.path}")
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
+
+
+class ConfigStore:
+    """
+    Acceso cacheado al archivo .env. Las lecturas reutilizan el último parseo
+    mientras no cambien ruta, mtime o tamaño del archivo; las escrituras
+    aplican varias claves en una sola reescritura atómica bajo lock.
+    """
+
+    KEYS = ("EMAIL", "PASSWORD", "LAB_URL")
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._signature = None
+        self._values = None
+
+    @staticmethod
+    def _file_signature(path):
+        try:
+            stat = path.stat()
+        except OSError:
+            return (str(path), None, None)
+        return (str(path), stat.st_mtime_ns, stat.st_size)
+
+    @staticmethod
+    def _parse(path):
+        env_data = {}
+        if path.exists():
+            with open(path, 'r') as f:
+                for line in f:
+                    line = line.strip()
+                    if line and not line.startswith('#') and '=' in line:
+                        key, value = line.split('=', 1)
+                        env_data[key.strip()] = value.strip()
+        return {key: env_data.get(key) for key in ConfigStore.KEYS}
+
+    def read(self) -> dict:
+        """Retorna una copia de las credenciales, releyendo solo si el archivo cambió."""
+        path = get_env_file()
+        signature = self._file_signature(path)
+        with self._lock:
+            if signature != self._signature:
+                self._values = self._parse(path)
+                self._signature = signature
+            return dict(self._values)
+
+    def update(self, values: dict, require_existing=False):
+        """
+        Aplica varias claves en una sola escritura atómica. Un valor None o
+        vacío elimina la clave.
+
+        Raises:
+            ValueError: Si require_existing y alguna clave no está configurada
+        """
+        with self._lock, FileLock(CONFIG_LOCK):
+            path = get_env_file()
+            env_data = self._parse(path)
+            if require_existing:
+                for key in values:
+                    if not env_data.get(key):
+                        raise ValueError(f"La credencial {key} no existe. Usa 'awstudent login' primero.")
+            env_data.update(values)
+
+            # Si no existe archivo local, usar el global
+            if not LOCAL_ENV.exists():
+                ensure_global_config_dir()
+                path = GLOBAL_ENV
+
+            atomic_write(path, "".join(f"{k}={v}\n" for k, v in env_data.items() if v))
+            self._signature = None
+
+    def invalidate(self):
+        with self._lock:
+            self._signature = None
+
+
+config = ConfigStore()
+
 def load_env():
     """Carga las variables de entorno desde el archivo .env apropiado."""
-    env_file = get_env_file()
-    
-    # Leer directamente del archivo para evitar problemas de caché
-    env_data = {}
-    if env_file.exists():
-        with open(env_file, 'r') as f:
-            for line in f:
-                line = line.strip()
-                if line and not line.startswith('#') and '=' in line:
-                    key, value = line.split('=', 1)
-                    env_data[key.strip()] = value.strip()
-    
-    return {
-        "EMAIL": env_data.get("EMAIL"),
-        "PASSWORD": env_data.get("PASSWORD"),
-        "LAB_URL": env_data.get("LAB_URL"),
-    }
+    return config.read()
 
 def set_env(key, value):
     """Establece una variable de entorno en el archivo .env apropiado."""
-    env_data = load_env()
-    env_data[key] = value
-    env_file = get_env_file()
-    
-    # Si no existe archivo local, usar el global
-    if not LOCAL_ENV.exists():
-        ensure_global_config_dir()
-        env_file = GLOBAL_ENV
-    
-    with open(env_file, "w") as f:
-        for k, v in env_data.items():
-            if v:
-                f.write(f"{k}={v}\n")
+    config.update({key: value})
+
+def set_envs(values: dict):
+    """Establece varias variables en una sola escritura del archivo .env."""
+    config.update(values)
 
 def update_env(key, value):
     """Actualiza una credencial existente."""
-    env_data = load_env()
-    if key not in env_data or not env_data[key]:
-        raise ValueError(f"La credencial {key} no existe. Usa 'awstudent login' primero.")
-    env_data[key] = value
-    env_file = get_env_file()
-    
-    # Si no existe archivo local, usar el global
-    if not LOCAL_ENV.exists():
-        ensure_global_config_dir()
-        env_file = GLOBAL_ENV
-    
-    with open(env_file, "w") as f:
-        for k, v in env_data.items():
-            if v:
-                f.write(f"{k}={v}\n")
-
-def unset_env(key):
-    """Elimina una variable de entorno del archivo .env."""
-    env_data = load_env()
-    if key in env_data:
-        env_data[key] = None
-    env_file = get_env_file()
-    
-    # Si no existe archivo local, usar el global
-    if not LOCAL_ENV.exists():
-        ensure_global_config_dir()
-        env_file = GLOBAL_ENV
-    
-    with open(env_file, "w") as f:
-        for k, v in env_data.items():
-            if v:
-                f.write(f"{k}={v}\n")
+    config.update({key: value}, require_existing=True)
+
+def update_envs(values: dict):
+    """Actualiza varias credenciales existentes en una sola escritura."""
+    config.update(values, require_existing=True)
+
+def unset_env(*keys):
+    """Elimina una o varias variables de entorno del archivo .env."""
+    config.update({key: None for key in keys})
 
 def clear_env():
     """Elimina todos los archivos .env (local y global)."""
-    if LOCAL_ENV.exists():
-        LOCAL_ENV.unlink()
-    if GLOBAL_ENV.exists():
-        GLOBAL_ENV.unlink()
+    with FileLock(CONFIG_LOCK):
+        if LOCAL_ENV.exists():
+            LOCAL_ENV.unlink()
+        if GLOBAL_ENV.exists():
+            GLOBAL_ENV.unlink()
+    config.invalidate()
 
 def validate_credentials():
     """Valida que todas las credenciales estén presentes."""
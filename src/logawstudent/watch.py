@@ -0,0 +1,191 @@
+# src/logawstudent/watch.py
+import signal
+import threading
+from selenium.common.exceptions import WebDriverException
+from .auth import authenticate_user, setup_driver, quit_driver, session_expired, relogin
+from .logs import log
+from .lab import (navigate_to_lab, check_lab_status, read_session_remaining, start_terminated_lab,
+                  handle_lab_initialization, extend_session, FIRST_READ_BUDGET)
+from .lab_state import record_lab_state, clear_lab_state
+from .utils import CONFIG_DIR, FileLock
+
+# Un solo 'awstudent watch' por máquina
+WATCH_LOCK = CONFIG_DIR / "watch.lock"
+
+# Segundos entre verificaciones con el lab listo
+WATCH_INTERVAL = 5 * 60
+
+# Tiempo restante de sesión por debajo del cual se extiende (Start Lab reinicia el temporizador)
+EXTEND_BELOW = 15 * 60
+
+# Espera mínima entre verificaciones y máxima tras fallos consecutivos
+MIN_INTERVAL = 15
+MAX_BACKOFF = 10 * 60
+
+
+class LabWatcher:
+    """
+    Mantiene un driver autenticado y verifica el lab cada cierto tiempo:
+    lo arranca si está Terminated, extiende la sesión si está por vencer y
+    relanza Chrome si dejó de responder. Entre verificaciones el navegador
+    queda en about:blank y el hilo bloqueado en un Event, sin consumir CPU.
+    """
+
+    def __init__(self, email, password, lab_url, interval=WATCH_INTERVAL,
+                 extend_below=EXTEND_BELOW, persist_profile=False):
+        self.email = email
+        self.password = password
+        self.lab_url = lab_url
+        self.interval = interval
+        self.extend_below = extend_below
+        self.persist_profile = persist_profile
+        self.driver = None
+        self.failures = 0
+        self.stopped = threading.Event()
+
+    def stop(self):
+        self.stopped.set()
+
+    def _driver_alive(self) -> bool:
+        try:
+            self.driver.current_url
+            return True
+        except Exception:
+            return False
+
+    def drop_driver(self):
+        if self.driver:
+            try:
+                quit_driver(self.driver)
+            except Exception:
+                pass
+            self.driver = None
+
+    def ensure_driver(self):
+        """Retorna el driver vivo y autenticado, relanzando Chrome si murió."""
+        if self.driver and self._driver_alive():
+            return self.driver
+        if self.driver:
+            log("Chrome dejó de responder, relanzando el navegador...", "wait")
+            self.drop_driver()
+        driver = setup_driver(self.persist_profile)
+        driver, success = authenticate_user(self.email, self.password, driver, lab_url=self.lab_url)
+        if not success:
+            quit_driver(driver)
+            return None
+        self.driver = driver
+        return driver
+
+    def open_lab(self, driver) -> bool:
+        """Recarga la página del lab (lectura fresca del estado y del temporizador)."""
+        if navigate_to_lab(driver, self.lab_url):
+            return True
+        if session_expired(driver) and relogin(driver, self.email, self.password):
+            return navigate_to_lab(driver, self.lab_url)
+        return False
+
+    def check(self) -> float:
+        """
+        Una verificación completa del lab.
+
+        Returns:
+            float: Segundos hasta la próxima verificación
+        """
+        driver = self.ensure_driver()
+        if driver is None or not self.open_lab(driver):
+            return self.backoff()
+
+        status = check_lab_status(driver, timeout=FIRST_READ_BUDGET)
+        if not status:
+            if not self._driver_alive():
+                raise WebDriverException("Chrome no responde")
+            log("No se pudo detectar el estado del laboratorio", "error")
+            return self.backoff()
+
+        if "Terminated" in status:
+            log("La sesión del laboratorio terminó, reiniciándola...", "wait")
+            ready = start_terminated_lab(driver)
+        elif "Initializing" in status:
+            ready = handle_lab_initialization(driver)
+        elif "Ready" in status:
+            ready = True
+        else:
+            log(f"Estado desconocido detectado: {status}", "info")
+            ready = False
+
+        remaining = read_session_remaining(driver) if ready else None
+        if ready and remaining is not None and remaining <= self.extend_below:
+            log(f"A la sesión le quedan {remaining // 60} min, extendiéndola...", "wait")
+            extended = extend_session(driver, self.lab_url)
+            if extended is None:
+                record_lab_state(self.email, self.lab_url, "Ready", read_session_remaining(driver))
+                return self.backoff()
+            remaining = extended
+
+        if not ready:
+            clear_lab_state(self.email, self.lab_url)
+            return self.backoff()
+
+        record_lab_state(self.email, self.lab_url, "Ready", remaining)
+        self.failures = 0
+        wait = self.interval
+        if remaining is not None:
+            wait = min(wait, remaining - self.extend_below)
+        ends = f", sesión restante {remaining // 60} min" if remaining is not None else ""
+        log(f"Laboratorio listo{ends}; próxima verificación en {max(wait, MIN_INTERVAL) / 60:.1f} min", "ok")
+        return max(wait, MIN_INTERVAL)
+
+    def backoff(self) -> float:
+        """Espera creciente tras fallos consecutivos, acotada por MAX_BACKOFF."""
+        self.failures += 1
+        return min(MAX_BACKOFF, MIN_INTERVAL * 2 ** (self.failures - 1))
+
+    def idle(self):
+        """Deja el navegador sin página activa hasta la próxima verificación."""
+        if self.driver:
+            try:
+                self.driver.get("about:blank")
+            except WebDriverException:
+                pass
+
+    def run(self):
+        while not self.stopped.is_set():
+            try:
+                wait = self.check()
+            except WebDriverException as e:
+                log(f"Error del navegador: {e.msg or e}", "error")
+                self.drop_driver()
+                wait = self.backoff()
+            except Exception as e:
+                log(f"Error inesperado: {e}", "error")
+                wait = self.backoff()
+            self.idle()
+            self.stopped.wait(wait)
+
+
+def watch_lab(email, password, lab_url, interval=WATCH_INTERVAL, extend_below=EXTEND_BELOW,
+              persist_profile=False) -> bool:
+    """
+    Mantiene el laboratorio listo hasta Ctrl+C o SIGTERM.
+
+    Returns:
+        bool: False si ya hay otro 'watch' en ejecución
+    """
+    lock = FileLock(WATCH_LOCK)
+    if not lock.acquire(blocking=False):
+        log("Ya hay un 'awstudent watch' en ejecución", "error")
+        return False
+
+    watcher = LabWatcher(email, password, lab_url, interval, extend_below, persist_profile)
+    previous = signal.signal(signal.SIGTERM, lambda *_: watcher.stop())
+    log(f"Vigilando el laboratorio cada {interval / 60:.0f} min (Ctrl+C para salir)", "info")
+    try:
+        watcher.run()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        signal.signal(signal.SIGTERM, previous)
+        watcher.drop_driver()
+        lock.release()
+        log("Vigilancia detenida", "done")
+    return True
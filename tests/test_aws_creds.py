@@ -0,0 +1,98 @@
+import configparser
+import threading
+import time
+
+import pytest
+
+from logawstudent import aws_creds
+
+KEY_ID = "ASIA" + "A" * 16
+SECRET = "s" * 40
+TOKEN = "t" * 120
+CREDENTIALS_TEXT = f"""
+[default]
+aws_access_key_id={KEY_ID}
+aws_secret_access_key = "{SECRET}"
+aws_session_token: {TOKEN}
+<a href="https://signin.aws.amazon.com/federation?Action=login&amp;Destination=x">Consola</a>
+"""
+
+
+@pytest.fixture
+def aws_files(tmp_path, monkeypatch):
+    """Redirige la caché y ~/.aws/credentials a tmp_path, con ana@example.com configurada."""
+    monkeypatch.setattr(aws_creds, "CREDS_CACHE_FILE", tmp_path / "aws_creds.json")
+    monkeypatch.setattr(aws_creds, "AWS_CREDENTIALS_FILE", tmp_path / "credentials")
+    monkeypatch.setattr(aws_creds, "AWS_CREDENTIALS_LOCK", tmp_path / ".aws_credentials.lock")
+    monkeypatch.setattr(aws_creds, "load_env", lambda: {"EMAIL": "ana@example.com"})
+    return tmp_path
+
+
+def creds_for(n):
+    return {"aws_access_key_id": f"ASIA{n:016d}", "aws_secret_access_key": SECRET, "aws_session_token": TOKEN}
+
+
+def test_parse_credentials_reads_keys_and_console_url():
+    found = aws_creds.parse_credentials(CREDENTIALS_TEXT)
+    assert found["aws_access_key_id"] == KEY_ID
+    assert found["aws_secret_access_key"] == SECRET
+    assert found["aws_session_token"] == TOKEN
+    assert found["console_url"] == "https://signin.aws.amazon.com/federation?Action=login&Destination=x"
+    assert aws_creds.has_keys(found)
+
+
+def test_parse_credentials_ignores_partial_or_unrelated_text():
+    found = aws_creds.parse_credentials(f"aws_access_key_id={KEY_ID}\naws_session_token=corto")
+    assert found == {"aws_access_key_id": KEY_ID}
+    assert not aws_creds.has_keys(found)
+    assert aws_creds.parse_credentials("nada que ver") == {}
+
+
+def test_credential_capture_completes_when_all_keys_are_seen():
+    capture = aws_creds.CredentialCapture()
+    capture.feed("https://lab/1", f"aws_access_key_id={KEY_ID}")
+    assert not capture.complete.is_set()
+    capture.feed("https://lab/2", f"aws_secret_access_key={SECRET} aws_session_token={TOKEN}")
+    assert capture.complete.is_set()
+    assert aws_creds.has_keys(capture.values)
+
+
+def test_profile_for_keeps_default_for_the_configured_account(aws_files):
+    assert aws_creds.profile_for("Ana@Example.com") == aws_creds.DEFAULT_PROFILE
+    assert aws_creds.profile_for("beto.r@uni.edu") == "awsacademy-beto-r-uni-edu"
+
+
+def test_concurrent_saves_keep_every_account(aws_files):
+    emails = [f"alumno{n}@uni.edu" for n in range(8)]
+    threads = [threading.Thread(target=aws_creds.save_credentials, args=(email, creds_for(n), 600))
+               for n, email in enumerate(emails)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    parser = configparser.RawConfigParser()
+    parser.read(aws_files / "credentials")
+    for n, email in enumerate(emails):
+        entry = aws_creds.load_cached(email)
+        assert entry["profile"] == aws_creds.profile_for(email)
+        assert parser[entry["profile"]]["aws_access_key_id"] == creds_for(n)["aws_access_key_id"]
+
+
+def test_load_cached_skips_entries_about_to_expire(aws_files):
+    aws_creds.save_credentials("ana@example.com", creds_for(1), remaining=aws_creds.EXPIRY_MARGIN - 1)
+    assert aws_creds.load_cached("ana@example.com") is None
+    aws_creds.save_credentials("ana@example.com", creds_for(1), remaining=3600)
+    entry = aws_creds.load_cached("ana@example.com")
+    assert entry["profile"] == aws_creds.DEFAULT_PROFILE
+    assert entry["expires_at"] > time.time() + 3000
+
+
+def test_clear_cached_forgets_one_account_or_all(aws_files):
+    for n, email in enumerate(["ana@example.com", "beto@uni.edu"]):
+        aws_creds.save_credentials(email, creds_for(n), 3600)
+    aws_creds.clear_cached("beto@uni.edu")
+    assert aws_creds.load_cached("beto@uni.edu") is None
+    assert aws_creds.load_cached("ana@example.com") is not None
+    aws_creds.clear_cached()
+    assert aws_creds.load_cached("ana@example.com") is None
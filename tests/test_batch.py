@@ -0,0 +1,62 @@
+import threading
+import time
+
+from logawstudent import batch
+
+ACCOUNT = {"email": "ana@example.com", "password": "x", "lab_url": "https://canvas.example/lab"}
+
+
+def fake_browser(monkeypatch, launch_seconds=0.0):
+    """Sustituye el navegador por un objeto que registra cuántas veces se cierra."""
+    quits = []
+    calls = []
+
+    def setup_driver():
+        time.sleep(launch_seconds)
+        return object()
+
+    def authenticate_user(email, password, driver, lab_url=None):
+        calls.append("auth")
+        return driver, True
+
+    def run_lab(driver, lab_url, email, password):
+        calls.append("lab")
+        return True
+
+    monkeypatch.setattr(batch, "setup_driver", setup_driver)
+    monkeypatch.setattr(batch, "quit_driver", quits.append)
+    monkeypatch.setattr(batch, "authenticate_user", authenticate_user)
+    monkeypatch.setattr(batch, "run_lab", run_lab)
+    return quits, calls
+
+
+def test_ready_account_quits_its_browser_once(monkeypatch):
+    quits, calls = fake_browser(monkeypatch)
+    result = batch.run_account(ACCOUNT, timeout=5)
+    assert result["status"] == "ready"
+    assert calls == ["auth", "lab"]
+    assert len(quits) == 1
+
+
+def test_timeout_during_launch_still_quits_the_browser(monkeypatch):
+    quits, calls = fake_browser(monkeypatch, launch_seconds=0.2)
+    result = batch.run_account(ACCOUNT, timeout=0.05)
+    assert result["status"] == "timeout"
+    assert calls == []
+    assert len(quits) == 1
+
+
+def test_timeout_during_login_skips_the_lab(monkeypatch):
+    quits, calls = fake_browser(monkeypatch)
+    released = threading.Event()
+
+    def slow_login(email, password, driver, lab_url=None):
+        calls.append("auth")
+        released.wait(0.3)
+        return driver, True
+
+    monkeypatch.setattr(batch, "authenticate_user", slow_login)
+    result = batch.run_account(ACCOUNT, timeout=0.05)
+    assert result["status"] == "timeout"
+    assert calls == ["auth"]
+    assert len(quits) == 1
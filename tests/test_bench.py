@@ -0,0 +1,22 @@
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+SRC = Path(__file__).resolve().parents[1] / "src"
+
+
+def test_e2e_bench_leaves_user_config_untouched(tmp_path):
+    env = dict(os.environ, HOME=str(tmp_path), PYTHONPATH=str(SRC))
+    env.pop("LOGAWSTUDENT_CONFIG_DIR", None)
+    env.pop("AWS_SHARED_CREDENTIALS_FILE", None)
+    output = subprocess.run(
+        [sys.executable, "-m", "logawstudent.bench", "e2e", "--engine", "http",
+         "--runs", "1", "--init-seconds", "0.2", "--json"],
+        capture_output=True, text=True, env=env, cwd=tmp_path, timeout=120,
+    ).stdout
+    report = json.loads(output.strip().splitlines()[-1])
+    assert report["succeeded"] == 1
+    assert not (tmp_path / ".config").exists()
+    assert not (tmp_path / ".aws").exists()
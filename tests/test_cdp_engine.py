@@ -0,0 +1,305 @@
+import asyncio
+import base64
+import hashlib
+import json
+import struct
+
+import pytest
+
+from logawstudent.cdp_engine import CdpConnection, CdpError, WebSocket, _mask
+
+_WS_GUID = b"258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+
+
+def frame(opcode, payload, fin=True):
+    """Frame sin máscara, como los que envía el servidor."""
+    header = bytes([(0x80 if fin else 0) | opcode])
+    length = len(payload)
+    if length < 126:
+        header += bytes([length])
+    elif length < 1 << 16:
+        header += bytes([126]) + struct.pack("!H", length)
+    else:
+        header += bytes([127]) + struct.pack("!Q", length)
+    return header + payload
+
+
+async def read_frame(reader):
+    first, second = await reader.readexactly(2)
+    assert second & 0x80, "el cliente debe enmascarar sus frames"
+    length = second & 0x7F
+    if length == 126:
+        length = struct.unpack("!H", await reader.readexactly(2))[0]
+    elif length == 127:
+        length = struct.unpack("!Q", await reader.readexactly(8))[0]
+    key = await reader.readexactly(4)
+    return first & 0x0F, _mask(await reader.readexactly(length), key)
+
+
+async def handshake(reader, writer):
+    head = await reader.readuntil(b"\r\n\r\n")
+    key = next(line.split(b": ", 1)[1] for line in head.split(b"\r\n")
+               if line.lower().startswith(b"sec-websocket-key"))
+    accept = base64.b64encode(hashlib.sha1(key + _WS_GUID).digest())
+    writer.write(b"HTTP/1.1 101 Switching Protocols\r\nUpgrade: websocket\r\n"
+                 b"Connection: Upgrade\r\nSec-WebSocket-Accept: " + accept + b"\r\n\r\n")
+    await writer.drain()
+
+
+def run_with_server(handler, client):
+    """Ejecuta `client(url)` contra un servidor WebSocket local que atiende `handler`."""
+    async def serve(reader, writer):
+        await handshake(reader, writer)
+        try:
+            await handler(reader, writer)
+        except asyncio.IncompleteReadError:
+            pass
+        finally:
+            writer.close()
+
+    async def main():
+        server = await asyncio.start_server(serve, "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        try:
+            return await asyncio.wait_for(client(f"ws://127.0.0.1:{port}/devtools/browser/x"), 5)
+        finally:
+            server.close()
+
+    return asyncio.run(main())
+
+
+async def echo(reader, writer):
+    while True:
+        opcode, payload = await read_frame(reader)
+        writer.write(frame(opcode, payload))
+        await writer.drain()
+
+
+async def cdp_server(reader, writer):
+    """Responde cada comando según su método; `Emit` envía antes un evento."""
+    while True:
+        _, payload = await read_frame(reader)
+        message = json.loads(payload)
+        method = message["method"]
+        if method == "Bad":
+            reply = {"id": message["id"], "error": {"message": "nope"}}
+        elif method == "Emit":
+            for event in message["params"]["events"]:
+                writer.write(frame(0x1, json.dumps(event).encode()))
+            reply = {"id": message["id"], "result": {}}
+        elif method == "Close":
+            writer.write(frame(0x8, b""))
+            await writer.drain()
+            return
+        else:
+            reply = {"id": message["id"], "result": {"method": method}}
+        writer.write(frame(0x1, json.dumps(reply).encode()))
+        await writer.drain()
+
+
+def test_mask_is_an_involution():
+    key = b"\x01\x02\x03\x04"
+    data = bytes(range(256)) * 3 + b"xy"
+    masked = _mask(data, key)
+    assert masked != data
+    assert masked[:4] == bytes(b ^ k for b, k in zip(data[:4], key))
+    assert _mask(masked, key) == data
+    assert _mask(b"", key) == b""
+
+
+@pytest.mark.parametrize("size", [0, 125, 126, 65535, 65536, 70000])
+def test_text_round_trip_for_every_length_encoding(size):
+    text = "á" * (size // 2) + "x" * (size % 2)
+
+    async def client(url):
+        websocket = await WebSocket.connect(url)
+        await websocket.send(text)
+        received = await websocket.recv()
+        websocket.close()
+        return received
+
+    assert run_with_server(echo, client) == text
+
+
+def test_fragmented_message_is_reassembled():
+    async def handler(reader, writer):
+        writer.write(frame(0x1, b"hola ", fin=False) + frame(0x0, b"mun", fin=False) + frame(0x0, b"do"))
+        await writer.drain()
+        await read_frame(reader)
+
+    async def client(url):
+        websocket = await WebSocket.connect(url)
+        received = await websocket.recv()
+        websocket.close()
+        return received
+
+    assert run_with_server(handler, client) == "hola mundo"
+
+
+def test_ping_is_answered_with_pong():
+    pongs = []
+
+    async def handler(reader, writer):
+        writer.write(frame(0x9, b"latido") + frame(0x1, b"despues"))
+        await writer.drain()
+        pongs.append(await read_frame(reader))
+
+    async def client(url):
+        websocket = await WebSocket.connect(url)
+        received = await websocket.recv()
+        await asyncio.sleep(0.05)
+        websocket.close()
+        return received
+
+    assert run_with_server(handler, client) == "despues"
+    assert pongs == [(0xA, b"latido")]
+
+
+def test_close_frame_raises_connection_error():
+    async def handler(reader, writer):
+        writer.write(frame(0x8, b""))
+        await writer.drain()
+
+    async def client(url):
+        websocket = await WebSocket.connect(url)
+        try:
+            with pytest.raises(ConnectionError):
+                await websocket.recv()
+        finally:
+            websocket.close()
+
+    run_with_server(handler, client)
+
+
+def test_out_of_order_replies_reach_their_callers():
+    async def handler(reader, writer):
+        first = json.loads((await read_frame(reader))[1])
+        second = json.loads((await read_frame(reader))[1])
+        for message in (second, first):
+            reply = {"id": message["id"], "result": {"method": message["method"]}}
+            writer.write(frame(0x1, json.dumps(reply).encode()))
+        await writer.drain()
+        await read_frame(reader)
+
+    async def client(url):
+        connection = CdpConnection(await WebSocket.connect(url))
+        try:
+            return await asyncio.gather(connection.send("A.first"), connection.send("B.second"))
+        finally:
+            await connection.close()
+
+    assert run_with_server(handler, client) == [{"method": "A.first"}, {"method": "B.second"}]
+
+
+def test_error_reply_raises_cdp_error():
+    async def client(url):
+        connection = CdpConnection(await WebSocket.connect(url))
+        try:
+            with pytest.raises(CdpError, match="nope"):
+                await connection.send("Bad")
+            return await connection.send("Still.alive")
+        finally:
+            await connection.close()
+
+    assert run_with_server(cdp_server, client) == {"method": "Still.alive"}
+
+
+def test_wait_event_filters_by_method_session_and_predicate():
+    events = [
+        {"method": "Other.event", "sessionId": "S", "params": {"payload": "Ready"}},
+        {"method": "Runtime.bindingCalled", "sessionId": "T", "params": {"payload": "Ready"}},
+        {"method": "Runtime.bindingCalled", "sessionId": "S", "params": {"payload": "Initializing"}},
+        {"method": "Runtime.bindingCalled", "sessionId": "S", "params": {"payload": "Ready"}},
+    ]
+
+    async def client(url):
+        connection = CdpConnection(await WebSocket.connect(url))
+        try:
+            waiting = asyncio.ensure_future(connection.wait_event(
+                "Runtime.bindingCalled", sessions={"S"},
+                predicate=lambda params: params["payload"] == "Ready", timeout=2))
+            await asyncio.sleep(0)
+            await connection.send("Emit", {"events": events})
+            found = await waiting
+            missing = await connection.wait_event("Never.sent", timeout=0.05)
+            return found, missing, connection.listeners
+        finally:
+            await connection.close()
+
+    found, missing, listeners = run_with_server(cdp_server, client)
+    assert found == {"payload": "Ready"}
+    assert missing is None
+    assert listeners == []
+
+
+def test_listener_exception_does_not_stop_the_reader():
+    seen = []
+
+    def broken(message):
+        raise RuntimeError("boom")
+
+    async def client(url):
+        connection = CdpConnection(await WebSocket.connect(url))
+        connection.on(broken)
+        connection.on(seen.append)
+        try:
+            await connection.send("Emit", {"events": [{"method": "A.event"}, {"method": "B.event"}]})
+            return await connection.send("Still.alive")
+        finally:
+            await connection.close()
+
+    assert run_with_server(cdp_server, client) == {"method": "Still.alive"}
+    assert [message["method"] for message in seen] == ["A.event", "B.event"]
+
+
+def test_closed_connection_fails_pending_commands():
+    async def client(url):
+        connection = CdpConnection(await WebSocket.connect(url))
+        try:
+            slow = asyncio.ensure_future(connection.send("Never.answered", timeout=5))
+            await asyncio.sleep(0)
+            with pytest.raises(ConnectionError):
+                await connection.send("Close", timeout=5)
+            with pytest.raises(ConnectionError):
+                await slow
+            with pytest.raises(ConnectionError):
+                await connection.send("After.close", timeout=5)
+        finally:
+            await connection.close()
+
+    async def handler(reader, writer):
+        await read_frame(reader)
+        await cdp_server(reader, writer)
+
+    run_with_server(handler, client)
+
+
+def test_batch_runs_at_most_workers_accounts_at_once(monkeypatch):
+    from logawstudent import cdp_engine
+
+    class FakeBrowser:
+        async def close(self):
+            pass
+
+    async def launch():
+        return FakeBrowser()
+
+    running = []
+    peak = []
+
+    async def run_account(browser, email, password, lab_url, blocked):
+        running.append(email)
+        peak.append(len(running))
+        await asyncio.sleep(0.02 if email != "lento" else 1)
+        running.remove(email)
+        return "ready"
+
+    monkeypatch.setattr(cdp_engine.CdpBrowser, "launch", staticmethod(launch))
+    monkeypatch.setattr(cdp_engine, "run_account", run_account)
+    accounts = [{"email": e, "password": "x", "lab_url": "u"} for e in ["a", "b", "lento", "c", "d"]]
+
+    results = cdp_engine.run_batch_cdp(accounts, workers=2, timeout=0.2)
+
+    assert max(peak) == 2
+    assert [r["status"] for r in results] == ["ready", "ready", "timeout", "ready", "ready"]
+    assert all(r["seconds"] < 0.5 for r in results)
@@ -0,0 +1,46 @@
+from logawstudent import contexts
+
+ACCOUNTS = [
+    {"email": "ana@uni.edu", "password": "x", "lab_url": "https://canvas.example/lab/1"},
+    {"email": "beto@uni.edu", "password": "x", "lab_url": "https://canvas.example/lab/2"},
+    {"email": "caro@uni.edu", "password": "x", "lab_url": "https://canvas.example/lab/3"},
+]
+
+
+class FakeDriver:
+    current_window_handle = "home"
+
+    class switch_to:
+        @staticmethod
+        def window(handle):
+            pass
+
+
+def test_shared_batch_records_ready_labs_and_clears_failed_ones(monkeypatch):
+    opened = {"ana@uni.edu": "Ready", "beto@uni.edu": "Initializing", "caro@uni.edu": None}
+    calls = []
+    driver = FakeDriver()
+
+    monkeypatch.setattr(contexts, "setup_driver", lambda: driver)
+    monkeypatch.setattr(contexts, "quit_driver", lambda d: calls.append(("quit",)))
+    monkeypatch.setattr(contexts, "create_context", lambda d: (object(), "tab"))
+    monkeypatch.setattr(contexts, "switch_to_context", lambda d, handle: None)
+    monkeypatch.setattr(contexts, "dispose_context", lambda d, context_id, home: None)
+    monkeypatch.setattr(contexts, "block_heavy_resources", lambda d: None)
+    monkeypatch.setattr(contexts, "_open_account", lambda d, account, deadline: opened[account["email"]])
+    monkeypatch.setattr(contexts, "check_lab_status", lambda d, timeout: "Ready")
+    monkeypatch.setattr(contexts, "finish_ready_lab",
+                        lambda d, email, lab_url: calls.append(("ready", email, lab_url)))
+    monkeypatch.setattr(contexts, "clear_lab_state", lambda email, lab_url: calls.append(("clear", email)))
+    monkeypatch.setattr(contexts, "log_interception_stats", lambda d: calls.append(("stats",)))
+
+    results = contexts.run_batch_shared(ACCOUNTS, timeout=30, poll_interval=0)
+
+    assert [r["status"] for r in results] == ["ready", "ready", "failed"]
+    assert calls == [
+        ("ready", "ana@uni.edu", "https://canvas.example/lab/1"),
+        ("clear", "caro@uni.edu"),
+        ("ready", "beto@uni.edu", "https://canvas.example/lab/2"),
+        ("stats",),
+        ("quit",),
+    ]
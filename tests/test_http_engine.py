@@ -0,0 +1,31 @@
+import urllib.parse
+
+import pytest
+
+from logawstudent import http_engine, schedule
+from logawstudent.mock_server import MockServer
+
+
+@pytest.fixture
+def server(tmp_path, monkeypatch):
+    """MockServer como Canvas, con el historial de arranque en tmp_path."""
+    with MockServer(init_seconds=0.3) as server:
+        monkeypatch.setattr(http_engine, "LOGIN_URL", server.url + "/login/canvas")
+        monkeypatch.setattr(http_engine, "CANVAS_HOST", urllib.parse.urlparse(server.url).netloc)
+        monkeypatch.setattr(schedule, "READY_HISTORY_FILE", tmp_path / "ready_history.json")
+        yield server
+
+
+def test_explicit_fields_are_kept_and_missing_ones_come_from_env(server, monkeypatch):
+    monkeypatch.setattr(http_engine, "validate_credentials", lambda: {
+        "EMAIL": "otra@example.com", "PASSWORD": server.password, "LAB_URL": server.url + "/no-existe",
+    })
+    assert http_engine.launch_lab_http(email=server.email, lab_url=server.lab_url) is True
+    assert server.lab.status == "Ready"
+
+
+def test_start_lab_wait_records_the_ready_time(server):
+    assert http_engine.launch_lab_http(server.email, server.password, server.lab_url) is True
+    history = schedule.ready_history()
+    assert len(history) == 1
+    assert 0.3 <= history[0] < 5
@@ -0,0 +1,60 @@
+import json
+
+import pytest
+
+from logawstudent import intercept
+from logawstudent.intercept import DEFAULT_POLICY, InterceptionPolicy, InterceptionStats
+
+
+@pytest.fixture
+def policy():
+    return InterceptionPolicy(**DEFAULT_POLICY)
+
+
+@pytest.mark.parametrize("url, resource_type, reason", [
+    ("https://awsacademy.instructure.com/courses/1", "Document", None),
+    ("https://awsacademy.instructure.com/logo.png", "Image", "type"),
+    ("https://labs.vocareum.com/main/main.php", "Document", None),
+    ("https://www.google-analytics.com/collect", "XHR", "domain"),
+    ("https://cdn.segment.com/analytics.js", "Script", "domain"),
+    ("https://evil-google-analytics.com/x.js", "Script", None),
+    ("https://example.org/widget.js", "Script", None),
+    ("data:image/png;base64,AAAA", "Image", None),
+    ("chrome-extension://abc/x.js", "Script", None),
+])
+def test_default_policy_decisions(policy, url, resource_type, reason):
+    assert policy.decide(url, resource_type) == reason
+
+
+def test_allowlist_wins_over_blocked_domains():
+    policy = InterceptionPolicy(block_domains=["amazonaws.com"], allow_domains=["s3.amazonaws.com"])
+    assert policy.decide("https://bucket.s3.amazonaws.com/lab.json", "XHR") is None
+    assert policy.decide("https://ec2.amazonaws.com/x", "XHR") == "domain"
+
+
+def test_block_third_party_spares_documents_and_allowed_hosts():
+    policy = InterceptionPolicy(allow_domains=["vocareum.com"], block_third_party=True)
+    assert policy.decide("https://example.org/widget.js", "Script") == "third-party"
+    assert policy.decide("https://example.org/embed", "Document") is None
+    assert policy.decide("https://labs.vocareum.com/api", "XHR") is None
+
+
+def test_load_merges_known_user_keys(tmp_path, monkeypatch):
+    path = tmp_path / "intercept.json"
+    path.write_text(json.dumps({"mode": "blocklist", "block_types": ["Font"], "unknown": 1}))
+    monkeypatch.setattr(intercept, "POLICY_FILE", path)
+    policy = InterceptionPolicy.load()
+    assert policy.mode == "blocklist"
+    assert policy.block_types == {"Font"}
+    assert policy.url_patterns()[:4] == ["*.woff", "*.woff2", "*.ttf", "*.otf"]
+    assert "*://doubleclick.net/*" in policy.url_patterns()
+
+
+def test_stats_take_resets_the_counters():
+    stats = InterceptionStats()
+    for reason in ("type", "type", "domain", None):
+        stats.count(reason)
+    stats.add_bytes(2048)
+    assert stats.take() == {"blocked": 3, "blocked_by": {"type": 2, "domain": 1},
+                            "allowed": 1, "allowed_bytes": 2048}
+    assert stats.take()["blocked"] == 0
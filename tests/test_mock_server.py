@@ -0,0 +1,157 @@
+import http.cookiejar
+import re
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+
+import pytest
+
+from logawstudent.mock_server import LAB_PATH, SESSION_SECONDS, LabState, MockServer
+
+
+class _NoRedirect(urllib.request.HTTPRedirectHandler):
+    def redirect_request(self, *args, **kwargs):
+        return None
+
+
+@pytest.fixture
+def server():
+    with MockServer(init_seconds=0.2) as server:
+        yield server
+
+
+def client(follow_redirects=True):
+    jar = http.cookiejar.CookieJar()
+    handlers = [urllib.request.HTTPCookieProcessor(jar)]
+    if not follow_redirects:
+        handlers.append(_NoRedirect())
+    return urllib.request.build_opener(*handlers)
+
+
+def fetch(opener, url, data=None):
+    """Retorna (status, location, body) sin lanzar por códigos 4xx/3xx."""
+    body = urllib.parse.urlencode(data).encode() if data is not None else None
+    try:
+        with opener.open(url, body) as response:
+            return response.status, response.headers.get("Location"), response.read().decode()
+    except urllib.error.HTTPError as e:
+        return e.code, e.headers.get("Location"), e.read().decode()
+
+
+def login(opener, server, password=None):
+    _, _, page = fetch(opener, server.url + "/login/canvas")
+    token = re.search(r'name="authenticity_token" value="(\w+)"', page).group(1)
+    return fetch(opener, server.url + "/login/canvas", {
+        "authenticity_token": token,
+        "pseudonym_session[unique_id]": server.email,
+        "pseudonym_session[password]": password or server.password,
+    })
+
+
+def launch_lab(opener, server):
+    fetch(opener, server.lab_url)
+    return fetch(opener, server.url + "/lti/launch", {"resource_link_id": "1"})
+
+
+def test_lab_state_transitions():
+    lab = LabState(init_seconds=0.1)
+    assert lab.status == "Terminated"
+    assert lab.remaining == 0
+    lab.start()
+    assert lab.status == "Initializing"
+    time.sleep(0.15)
+    assert lab.status == "Ready"
+    assert SESSION_SECONDS - 2 <= lab.remaining <= SESSION_SECONDS
+
+
+def test_start_on_ready_lab_restarts_the_session():
+    lab = LabState(initial="Ready")
+    lab.ready_at -= 3600
+    assert lab.remaining <= SESSION_SECONDS - 3600
+    lab.start()
+    assert lab.status == "Ready"
+    assert lab.remaining >= SESSION_SECONDS - 2
+
+
+def test_reset_restores_initial_state():
+    lab = LabState(initial="Initializing", init_seconds=60)
+    lab.reset("Ready")
+    assert lab.status == "Ready"
+    lab.reset()
+    assert lab.status == "Initializing"
+
+
+def test_lab_page_redirects_to_login_without_session(server):
+    status, location, _ = fetch(client(follow_redirects=False), server.lab_url)
+    assert status == 302
+    assert location == "/login/canvas"
+
+
+def test_login_rejects_wrong_password(server):
+    status, _, page = login(client(), server, password="wrong")
+    assert status == 400
+    assert "error_message" in page
+
+
+def test_login_rejects_unknown_token(server):
+    status, _, _ = fetch(client(), server.url + "/login/canvas", {
+        "authenticity_token": "forged",
+        "pseudonym_session[unique_id]": server.email,
+        "pseudonym_session[password]": server.password,
+    })
+    assert status == 400
+
+
+def test_login_sets_session_and_opens_lab_page(server):
+    opener = client(follow_redirects=False)
+    status, location, _ = login(opener, server)
+    assert (status, location) == (302, "/?login_success=1")
+    status, _, page = fetch(opener, server.lab_url)
+    assert status == 200
+    assert 'id="tool_content"' in page
+    _, _, tool = fetch(opener, server.url + "/courses/1/external_tools/1")
+    assert 'action="/lti/launch"' in tool
+
+
+def test_lti_launch_requires_canvas_session(server):
+    status, _, _ = fetch(client(), server.url + "/lti/launch", {"resource_link_id": "1"})
+    assert status == 401
+
+
+def test_lti_launch_serves_lab_frame(server):
+    opener = client()
+    login(opener, server)
+    status, _, page = launch_lab(opener, server)
+    assert status == 200
+    assert 'aria-label="Terminated"' in page
+    assert 'id="launchclabsbtn"' in page
+
+
+def test_lab_endpoints_require_lab_session(server):
+    opener = client()
+    login(opener, server)
+    for path in ("/lab", "/lab/state", "/lab/aws"):
+        assert fetch(opener, server.url + path)[0] == 401
+
+
+def test_start_lab_reaches_ready_and_serves_credentials(server):
+    opener = client()
+    login(opener, server)
+    launch_lab(opener, server)
+    assert fetch(opener, server.url + "/lab/aws")[0] == 409
+    fetch(opener, server.url + "/lab/start", {})
+    assert fetch(opener, server.url + "/lab/state")[2] == "Initializing"
+    time.sleep(0.25)
+    assert fetch(opener, server.url + "/lab/state")[2] == "Ready"
+    assert re.fullmatch(r"0[34]:\d{2}:\d{2}", fetch(opener, server.url + "/lab/session")[2])
+    status, _, details = fetch(opener, server.url + "/lab/aws")
+    assert status == 200
+    assert f"aws_access_key_id={server.aws['key']}" in details
+
+
+def test_reset_invalidates_sessions(server):
+    opener = client(follow_redirects=False)
+    login(opener, server)
+    server.reset()
+    assert fetch(opener, server.url + LAB_PATH)[0] == 302
@@ -0,0 +1,45 @@
+import datetime
+
+import pytest
+
+from logawstudent import prewarm
+
+
+def at(hour, minute, day=1):
+    return datetime.datetime(2026, 3, day, hour, minute).timestamp()
+
+
+def test_parse_target_picks_today_when_still_ahead():
+    assert prewarm.parse_target("09:30", now=at(8, 0)) == at(9, 30)
+    assert prewarm.parse_target(" 9:05 ", now=at(8, 0)) == at(9, 5)
+
+
+def test_parse_target_rolls_over_to_tomorrow():
+    assert prewarm.parse_target("07:00", now=at(8, 0)) == at(7, 0, day=2)
+    assert prewarm.parse_target("08:00", now=at(8, 0)) == at(8, 0, day=2)
+
+
+@pytest.mark.parametrize("text", ["", "9", "25:00", "12:60", "ab:cd", "10:00:00"])
+def test_parse_target_rejects_invalid_times(text):
+    with pytest.raises(ValueError, match="HH:MM"):
+        prewarm.parse_target(text, now=at(8, 0))
+
+
+def test_plan_launch_uses_defaults_without_history(tmp_path, monkeypatch):
+    monkeypatch.setattr(prewarm, "PREWARM_HISTORY_FILE", tmp_path / "prewarm_history.json")
+    monkeypatch.setattr(prewarm, "typical_ready_time", lambda: None)
+    plan = prewarm.plan_launch(at(9, 0))
+    lead = prewarm.DEFAULT_STARTUP + prewarm.DEFAULT_READY + prewarm.READY_MARGIN
+    assert plan == {"target": at(9, 0), "startup": prewarm.DEFAULT_STARTUP,
+                    "ready": prewarm.DEFAULT_READY, "lead": lead, "launch_at": at(9, 0) - lead}
+
+
+def test_plan_launch_follows_the_recorded_history(tmp_path, monkeypatch):
+    monkeypatch.setattr(prewarm, "PREWARM_HISTORY_FILE", tmp_path / "prewarm_history.json")
+    monkeypatch.setattr(prewarm, "typical_ready_time", lambda: 100)
+    for seconds in (10, 12, 50):
+        prewarm.record_startup_time(seconds)
+    plan = prewarm.plan_launch(at(9, 0))
+    assert plan["startup"] == 12
+    assert plan["ready"] == 100
+    assert plan["launch_at"] == at(9, 0) - (12 + 100 + prewarm.READY_MARGIN)
@@ -0,0 +1,91 @@
+import threading
+import time
+
+import pytest
+
+from logawstudent import schedule
+from logawstudent.schedule import READY_WINDOW, WaitScheduler
+
+
+@pytest.fixture
+def history_file(tmp_path, monkeypatch):
+    path = tmp_path / "ready_history.json"
+    monkeypatch.setattr(schedule, "READY_HISTORY_FILE", path)
+    return path
+
+
+def test_child_never_outlives_its_parent():
+    parent = WaitScheduler(1.0)
+    assert parent.child(10).deadline == parent.deadline
+    limited = parent.child(0.2)
+    assert limited.deadline < parent.deadline
+    assert 0.1 < limited.remaining() <= 0.2
+    assert limited.child().deadline == limited.deadline
+
+
+def test_mark_propagates_to_parents_and_children_inherit_it():
+    parent = WaitScheduler(5)
+    child = parent.child(2)
+    child.mark("start_lab", expected=30)
+    assert (parent.marked, parent.expected) == ("start_lab", 30)
+    grandchild = child.child(1)
+    assert grandchild.marked == "start_lab"
+    assert grandchild.marked_at == parent.marked_at
+
+
+def test_interval_backs_off_after_an_action():
+    scheduler = WaitScheduler(100, fast=0.1, slow=3)
+    assert scheduler.interval() == pytest.approx(0.1, abs=0.01)
+    scheduler.marked_at -= 10
+    assert scheduler.interval() == pytest.approx(1.1, abs=0.01)
+    scheduler.marked_at -= 100
+    assert scheduler.interval() == 3
+
+
+def test_interval_speeds_up_near_the_expected_time():
+    scheduler = WaitScheduler(100, fast=0.1, slow=3)
+    scheduler.mark("start_lab", expected=60)
+    scheduler.marked_at -= 60 - READY_WINDOW / 2
+    assert scheduler.interval() == pytest.approx(0.2)
+    # Antes de la ventana, no duerme más allá de su comienzo
+    scheduler.mark("start_lab", expected=60)
+    scheduler.marked_at -= 60 - READY_WINDOW - 1
+    assert scheduler.interval() == pytest.approx(1.0, abs=0.01)
+
+
+def test_interval_never_exceeds_the_remaining_budget():
+    scheduler = WaitScheduler(0.05, fast=1, slow=3)
+    assert scheduler.interval() <= 0.05
+
+
+def test_until_returns_the_first_truthy_value_or_gives_up():
+    values = iter([None, ValueError("aún no"), "Ready"])
+
+    def condition():
+        value = next(values)
+        if isinstance(value, Exception):
+            raise value
+        return value
+
+    assert WaitScheduler(1, fast=0.001).until(condition, ignored=(ValueError,)) == "Ready"
+    start = time.monotonic()
+    assert not WaitScheduler(5, fast=0.01).until(lambda: False, limit=0.1)
+    assert time.monotonic() - start < 0.5
+
+
+def test_ready_history_keeps_the_latest_entries(history_file):
+    for seconds in range(schedule.READY_HISTORY_SIZE + 5):
+        schedule.record_ready_time(seconds)
+    history = schedule.ready_history()
+    assert len(history) == schedule.READY_HISTORY_SIZE
+    assert history[-1] == schedule.READY_HISTORY_SIZE + 4
+    assert schedule.typical_ready_time() == pytest.approx(14.5)
+
+
+def test_concurrent_records_are_not_lost(history_file):
+    threads = [threading.Thread(target=schedule.record_ready_time, args=(n,)) for n in range(10)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert sorted(schedule.ready_history()) == list(range(10))
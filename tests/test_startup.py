@@ -0,0 +1,49 @@
+import json
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from logawstudent.bench import BROWSER_MODULES, IMPORT_BUDGET
+
+SRC = Path(__file__).resolve().parents[1] / "src"
+
+# Importa el CLI y ejecuta un comando solo de configuración en un intérprete nuevo
+_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import logawstudent.cli as cli
+try:
+    cli.app(sys.argv[1:], standalone_mode=False)
+except SystemExit:
+    pass
+elapsed = time.perf_counter() - start
+print(json.dumps({"seconds": elapsed, "modules": sorted(sys.modules)}))
+"""
+
+
+def run_probe(tmp_path, *args):
+    env = dict(os.environ, HOME=str(tmp_path), PYTHONPATH=str(SRC))
+    output = subprocess.run(
+        [sys.executable, "-c", _PROBE, *args],
+        capture_output=True, text=True, check=True, env=env, cwd=tmp_path,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def browser_modules(modules):
+    return sorted(m for m in modules if any(m == b or m.startswith(b + ".") for b in BROWSER_MODULES))
+
+
+@pytest.mark.parametrize("args", [["status"], ["url"], ["login", "--status"]])
+def test_config_command_skips_browser_modules(tmp_path, args):
+    result = run_probe(tmp_path, *args)
+    assert browser_modules(result["modules"]) == []
+
+
+def test_config_command_within_startup_budget(tmp_path):
+    samples = [run_probe(tmp_path, "status")["seconds"] for _ in range(3)]
+    assert statistics.median(samples) <= IMPORT_BUDGET
@@ -0,0 +1,106 @@
+import os
+import subprocess
+import sys
+import threading
+
+import pytest
+
+from logawstudent import utils
+from logawstudent.utils import ConfigStore, FileLock, update_json
+
+
+@pytest.fixture
+def env_paths(tmp_path, monkeypatch):
+    """Apunta los .env local y global y el lock de configuración a tmp_path."""
+    monkeypatch.setattr(utils, "LOCAL_ENV", tmp_path / "local.env")
+    monkeypatch.setattr(utils, "GLOBAL_ENV", tmp_path / "config" / ".env")
+    monkeypatch.setattr(utils, "CONFIG_LOCK", tmp_path / "config" / ".env.lock")
+    return tmp_path
+
+
+def test_read_reuses_the_parse_until_the_file_changes(env_paths, monkeypatch):
+    store = ConfigStore()
+    store.update({"EMAIL": "ana@example.com"})
+    parses = []
+    parse = ConfigStore._parse
+    monkeypatch.setattr(ConfigStore, "_parse", staticmethod(lambda path: parses.append(path) or parse(path)))
+
+    assert store.read()["EMAIL"] == "ana@example.com"
+    assert store.read()["EMAIL"] == "ana@example.com"
+    assert len(parses) == 1
+
+    # Otro proceso reescribe el archivo: cambia el tamaño y se vuelve a leer
+    (env_paths / "config" / ".env").write_text("EMAIL=beto@example.com\nLAB_URL=https://lab\n")
+    assert store.read() == {"EMAIL": "beto@example.com", "PASSWORD": None, "LAB_URL": "https://lab"}
+    assert len(parses) == 2
+
+
+def test_read_returns_a_copy(env_paths):
+    store = ConfigStore()
+    store.update({"EMAIL": "ana@example.com"})
+    store.read()["EMAIL"] = "otra"
+    assert store.read()["EMAIL"] == "ana@example.com"
+
+
+def test_update_writes_several_keys_at_once_and_removes_empty_ones(env_paths):
+    store = ConfigStore()
+    store.update({"EMAIL": "ana@example.com", "PASSWORD": "secreta", "LAB_URL": "https://lab"})
+    store.update({"PASSWORD": None, "LAB_URL": ""})
+    path = env_paths / "config" / ".env"
+    assert path.read_text() == "EMAIL=ana@example.com\n"
+    assert oct(path.stat().st_mode & 0o777) == "0o600"
+    assert store.read() == {"EMAIL": "ana@example.com", "PASSWORD": None, "LAB_URL": None}
+
+
+def test_update_require_existing_changes_nothing_if_a_key_is_missing(env_paths):
+    store = ConfigStore()
+    store.update({"EMAIL": "ana@example.com"})
+    with pytest.raises(ValueError, match="PASSWORD"):
+        store.update({"EMAIL": "beto@example.com", "PASSWORD": "x"}, require_existing=True)
+    assert store.read()["EMAIL"] == "ana@example.com"
+
+
+def test_local_env_takes_precedence(env_paths):
+    (env_paths / "local.env").write_text("EMAIL=local@example.com\n")
+    store = ConfigStore()
+    store.update({"PASSWORD": "x"})
+    assert store.read() == {"EMAIL": "local@example.com", "PASSWORD": "x", "LAB_URL": None}
+    assert not (env_paths / "config" / ".env").exists()
+
+
+def test_file_lock_excludes_other_processes(tmp_path):
+    path = tmp_path / "demo.lock"
+    probe = ("import sys; from logawstudent.utils import FileLock; "
+             "sys.exit(0 if FileLock(sys.argv[1]).acquire(blocking=False) else 3)")
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path))
+
+    def other_process_acquires():
+        return subprocess.run([sys.executable, "-c", probe, str(path)], env=env, timeout=30).returncode == 0
+
+    with FileLock(path):
+        assert not other_process_acquires()
+    assert other_process_acquires()
+
+
+def test_file_lock_release_is_idempotent(tmp_path):
+    lock = FileLock(tmp_path / "nested" / "demo.lock")
+    assert lock.acquire()
+    lock.release()
+    lock.release()
+    assert lock.acquire(blocking=False)
+    lock.release()
+
+
+def test_update_json_serializes_concurrent_writers(tmp_path):
+    path = tmp_path / "counter.json"
+
+    def increment():
+        for _ in range(20):
+            update_json(path, lambda data: {"n": (data or {}).get("n", 0) + 1}, {})
+
+    threads = [threading.Thread(target=increment) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert utils.load_json(path) == {"n": 100}